@@ -0,0 +1,90 @@
+# api/export.py
+
+import csv
+import io
+import json
+import os
+from datetime import datetime
+
+import anyio
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+EXPORT_CHUNK_ROWS = int(os.getenv('EXPORT_CHUNK_ROWS', '500'))  # Rows per chunk written to the socket
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def ndjson_chunks(rows, columns, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Encodes row tuples as newline-delimited JSON, yielding a few hundred rows at a time."""
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False))
+        if len(buffer) >= chunk_rows:
+            buffer.append('')
+            yield '\n'.join(buffer)
+            buffer = []
+    if buffer:
+        buffer.append('')
+        yield '\n'.join(buffer)
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return '; '.join(str(item) for item in value)
+    return value
+
+
+def csv_chunks(rows, columns, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Encodes row tuples as CSV (header first), yielding a few hundred rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+EXPORT_ENCODERS = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+}
+
+
+class ExportResponse(StreamingResponse):
+    """A StreamingResponse over a sync generator that is closed however the response ends.
+
+    Starlette abandons the iterator when the client disconnects, leaving the
+    generator (and the connection it holds) to the garbage collector; closing
+    it here runs its `finally`/`with` blocks as soon as the response is done.
+    """
+
+    def __init__(self, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self._generator = content
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Shielded so a cancelled (disconnected) request still finishes the close
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(self._generator.close)
@@ -1,15 +1,33 @@
 # api/news_routes.py
 
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from starlette.concurrency import run_in_threadpool
 
 # Import database functions and schema model
 import sys, os
 # Adjust path to import from the 'database' folder in the project root
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from database.db_connector import connect, fetch_latest_news 
-from .schemas import NewsArticle 
+from database.db_connector import (
+    init_pool, close_pool, borrow_connection, fetch_latest_news, fetch_ingest_generation, next_page_cursor,
+    iter_articles, search_news, fetch_daily_stats, ARTICLE_COLUMNS,
+)
+from database import async_connector
+from database.pagination import decode_cursor
+from collectors.normalize import utcnow
+from .schemas import NewsArticle, NewsSearchResult, NewsStats
+from .cache import response_cache, make_etag, etag_matches
+from .export import EXPORT_ENCODERS, EXPORT_MEDIA_TYPES, ExportResponse
+from utils.logging_config import configure_logging
+from utils.metrics import instrument_app
+
+configure_logging()
+
+# --- CONFIGURATION ---
+# The news listings run on asyncpg by default; false serves them through the
+# psycopg2 pool on the threadpool (kept for comparison, see benchmarks/bench_pipeline.py)
+API_ASYNC_DB = os.getenv('API_ASYNC_DB', 'true').lower() in ('1', 'true', 'yes')
 
 # --- FastAPI App Setup ---
 app = FastAPI(
@@ -18,43 +36,262 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Dependency to handle DB connection/closure per request
+# Request latency per endpoint and a Prometheus /metrics endpoint
+instrument_app(app)
+
+# Create the shared connection pool (and verify the schema) once per process
+@app.on_event("startup")
+async def open_db_pool():
+    await run_in_threadpool(init_pool)  # Also applies pending migrations
+    if API_ASYNC_DB:
+        await async_connector.init_async_pool()
+
+@app.on_event("shutdown")
+async def close_db_pool():
+    await async_connector.close_async_pool()
+    close_pool()
+
+# Dependency to borrow a pooled DB connection per request
 def get_db_connection():
-    """Connects to the database and ensures the connection is closed."""
-    conn = connect()
-    if conn is None:
-        raise HTTPException(status_code=503, detail="Database service unavailable. Check config.")
-    try:
+    """Borrows a connection from the shared pool and returns it after the request."""
+    with borrow_connection() as conn:
+        if conn is None:
+            raise HTTPException(status_code=503, detail="Database service unavailable. Check config.")
         yield conn
-    finally:
-        if conn:
-            conn.close()
+
+MAX_PAGE_SIZE = 100 # Limit to 100 to prevent overload
+MAX_STATS_DAYS = 366 # Longest date range /api/news/stats serves in one response
+
+def parse_page_cursor(cursor: Optional[str], *types):
+    """Decodes a client-supplied cursor, turning bad input into a 400."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, *types)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def lookup_page(request: Request, cache_key, generation):
+    """Checks the response cache: returns (headers, cached page or None, 304 response or None)."""
+    if generation is None:
+        return {}, None, None
+    etag = make_etag(cache_key, generation)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_cache.record_not_modified()
+        return headers, None, Response(status_code=304, headers=headers)
+    return headers, response_cache.get(cache_key, generation), None
+
+def require_result(result):
+    """Turns a failed query (None) into a 503, before anything is cached or tagged with an ETag."""
+    if result is None:
+        raise HTTPException(status_code=503, detail="Database query failed. Try again later.")
+    return result
+
+def serve_page(request: Request, response: Response, headers, page):
+    """Advertises the next page via X-Next-Cursor / Link headers and returns the items."""
+    items, next_cursor = page
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    response.headers.update(headers)
+    return items
+
+def cached_page(conn, request: Request, response: Response, cache_key, fetch_page):
+    """Serves one page through the response cache.
+
+    `fetch_page()` returns (items, next_cursor) and raises (require_result)
+    when the query fails, so an error is never cached or served with an ETag.
+    Pages are cached per key and ingest generation; clients revalidating with
+    a current ETag get a 304.
+    """
+    generation = fetch_ingest_generation(conn)
+    headers, page, not_modified = lookup_page(request, cache_key, generation)
+    if not_modified:
+        return not_modified
+
+    if page is None:
+        page = fetch_page()
+        if generation is not None:
+            response_cache.put(cache_key, generation, page)
+    return serve_page(request, response, headers, page)
+
+async def cached_page_async(conn, request: Request, response: Response, cache_key, fetch_page):
+    """cached_page() for an asyncpg connection; `fetch_page` is a coroutine function."""
+    generation = await async_connector.fetch_ingest_generation(conn)
+    headers, page, not_modified = lookup_page(request, cache_key, generation)
+    if not_modified:
+        return not_modified
+
+    if page is None:
+        page = await fetch_page()
+        if generation is not None:
+            response_cache.put(cache_key, generation, page)
+    return serve_page(request, response, headers, page)
+
+def fetch_news_page_sync(request: Request, response: Response, cache_key, limit: int, after,
+                         category_filter: Optional[str], representatives_only: bool):
+    """psycopg2 path of fetch_news_page (runs on the threadpool)."""
+    with borrow_connection() as conn:
+        if conn is None:
+            raise HTTPException(status_code=503, detail="Database service unavailable. Check config.")
+
+        def fetch_page():
+            articles = require_result(fetch_latest_news(conn, limit, category_filter=category_filter, after=after,
+                                                        representatives_only=representatives_only))
+            return articles, next_page_cursor(articles, limit)
+
+        return cached_page(conn, request, response, cache_key, fetch_page)
+
+async def fetch_news_page(request: Request, response: Response, limit: int, cursor: Optional[str],
+                          category_filter: Optional[str] = None, representatives_only: bool = False):
+    """Fetches one keyset page of the latest news (cached, see cached_page)."""
+    after = parse_page_cursor(cursor, datetime, int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cache_key = (request.url.path, category_filter, limit, cursor, representatives_only)
+
+    if not API_ASYNC_DB:
+        return await run_in_threadpool(fetch_news_page_sync, request, response, cache_key, limit, after,
+                                       category_filter, representatives_only)
+
+    async with async_connector.acquire_connection() as conn:
+        if conn is None:
+            raise HTTPException(status_code=503, detail="Database service unavailable. Check config.")
+
+        async def fetch_page():
+            articles = require_result(await async_connector.fetch_latest_news(
+                conn, limit, category_filter=category_filter, after=after, representatives_only=representatives_only
+            ))
+            return articles, next_page_cursor(articles, limit)
+
+        return await cached_page_async(conn, request, response, cache_key, fetch_page)
 
 # --- Endpoint 1: Get all latest news (Unfiltered) ---
 @app.get("/api/news", response_model=List[NewsArticle]) 
-def get_latest_news(
-    conn = Depends(get_db_connection),
-    limit: int = Query(20, description="Number of articles to return (max 100)")
+async def get_latest_news(
+    request: Request,
+    response: Response,
+    limit: int = Query(20, description="Number of articles to return (max 100)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    representatives_only: bool = Query(False, description="Return one article per near-duplicate story cluster")
 ):
     """Retrieves the latest collected news articles (Default: 20)."""
-    # Fetch results using the function you added to db_connector
-    return fetch_latest_news(conn, min(limit, 100)) # Limit to 100 to prevent overload
+    return await fetch_news_page(request, response, limit, cursor, representatives_only=representatives_only)
 
 # --- Endpoint 2: Filter by Social Sources (X/Twitter) ---
 @app.get("/api/news/social", response_model=List[NewsArticle])
-def get_social_news(
-    conn = Depends(get_db_connection),
-    limit: int = Query(20, description="Number of social media articles to return (max 100)")
+async def get_social_news(
+    request: Request,
+    response: Response,
+    limit: int = Query(20, description="Number of social media articles to return (max 100)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    representatives_only: bool = Query(False, description="Return one article per near-duplicate story cluster")
 ):
     """Retrieves the latest news from social media sources (X/Twitter)."""
-    return fetch_latest_news(conn, min(limit, 100), category_filter="Social")
+    return await fetch_news_page(request, response, limit, cursor, category_filter="Social",
+                           representatives_only=representatives_only)
 
 
 # --- Endpoint 3: Filter by External Sources (Google News) ---
 @app.get("/api/news/external", response_model=List[NewsArticle])
-def get_external_news(
-    conn = Depends(get_db_connection),
-    limit: int = Query(20, description="Number of external/aggregator articles to return (max 100)")
+async def get_external_news(
+    request: Request,
+    response: Response,
+    limit: int = Query(20, description="Number of external/aggregator articles to return (max 100)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    representatives_only: bool = Query(False, description="Return one article per near-duplicate story cluster")
 ):
     """Retrieves the latest news from external aggregators (Google News)."""
-    return fetch_latest_news(conn, min(limit, 100), category_filter="External")
\ No newline at end of file
+    return await fetch_news_page(request, response, limit, cursor, category_filter="External",
+                           representatives_only=representatives_only)
+
+
+# --- Endpoint 4: Full-text search ---
+@app.get("/api/news/search", response_model=List[NewsSearchResult])
+def search_news_articles(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=2, description='Search terms, e.g. circular licensing or "foreign exchange" -crypto'),
+    conn = Depends(get_db_connection),
+    category: Optional[str] = Query(None, description="Category prefix, e.g. Social or External"),
+    start_date: Optional[datetime] = Query(None, description="Only articles published on/after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only articles published before this time"),
+    limit: int = Query(20, description="Number of results to return (max 100)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    representatives_only: bool = Query(False, description="Return one article per near-duplicate story cluster")
+):
+    """Ranked full-text search over article titles and content."""
+    after = parse_page_cursor(cursor, float, int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    def fetch_page():
+        results = require_result(search_news(conn, q, limit, category_filter=category,
+                                             start_date=start_date, end_date=end_date, after=after,
+                                             representatives_only=representatives_only))
+        return results, next_page_cursor(results, limit, sort_key=('rank', 'id'))
+
+    cache_key = (request.url.path, q, category, start_date, end_date, limit, cursor, representatives_only)
+    return cached_page(conn, request, response, cache_key, fetch_page)
+
+
+# --- Endpoint 5: Bulk export (streamed) ---
+@app.get("/api/news/export")
+def export_news(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    start_date: Optional[datetime] = Query(None, description="Only articles published on/after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only articles published before this time"),
+    category: Optional[str] = Query(None, description="Category prefix, e.g. Social or External")
+):
+    """Streams every matching article as NDJSON or CSV with constant memory."""
+    if init_pool() is None:
+        raise HTTPException(status_code=503, detail="Database service unavailable. Check config.")
+
+    # The connection is held for the whole stream, so it is borrowed by the
+    # generator itself: nothing is taken if the response never starts, and
+    # ExportResponse closes the generator (returning it) however the stream ends
+    def stream():
+        with borrow_connection() as conn:
+            if conn is None:
+                raise RuntimeError("No database connection available for export")
+            rows = iter_articles(conn, start_date=start_date, end_date=end_date, category_filter=category)
+            yield from EXPORT_ENCODERS[format](rows, ARTICLE_COLUMNS)
+
+    filename = f"news_export_{utcnow().strftime('%Y%m%d_%H%M%S')}.{format}"
+    return ExportResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+# --- Endpoint 6: Daily aggregates for dashboards ---
+@app.get("/api/news/stats", response_model=NewsStats)
+def get_news_stats(
+    request: Request,
+    response: Response,
+    conn = Depends(get_db_connection),
+    start_date: Optional[date] = Query(None, description="First day (default: 29 days before end_date)"),
+    end_date: Optional[date] = Query(None, description="Last day, inclusive (default: today)"),
+    category: Optional[str] = Query(None, description="Category prefix, e.g. Social or External")
+):
+    """Articles per source category per day and per matched keyword per day."""
+    end_date = end_date or utcnow().date()
+    start_date = start_date or end_date - timedelta(days=29)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if (end_date - start_date).days >= MAX_STATS_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_STATS_DAYS} days")
+
+    def fetch_page():
+        stats = require_result(fetch_daily_stats(conn, start_date, end_date, category_filter=category))
+        return {"start_date": start_date, "end_date": end_date, "category": category, **stats}, None
+
+    cache_key = (request.url.path, start_date, end_date, category)
+    return cached_page(conn, request, response, cache_key, fetch_page)
+
+
+# --- Cache metrics ---
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    """Hit/miss counters for the response cache."""
+    return response_cache.stats()
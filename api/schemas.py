@@ -1,8 +1,8 @@
 # api/schemas.py
 
 from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional # Use Optional for fields that might be null
+from datetime import date, datetime
+from typing import List, Optional # Use Optional for fields that might be null
 
 class NewsArticle(BaseModel):
     """Defines the structure of a news article returned by the API."""
@@ -15,8 +15,46 @@ class NewsArticle(BaseModel):
     content: Optional[str] = None
     source_category: str
     created_at: Optional[datetime] = None
+    relevance_score: float = 0.0
+    matched_keywords: List[str] = []
+    cluster_id: Optional[int] = None  # Articles sharing a cluster_id are the same story
+    is_representative: bool = True
 
     class Config:
         # Allows FastAPI to read data from database objects (ORM mode) 
         # which is useful when mapping database results (like DictCursor) to this model.
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class NewsSearchResult(NewsArticle):
+    """A news article matched by full-text search, with its relevance rank."""
+
+    rank: float
+
+
+class CategoryDayStats(BaseModel):
+    """Articles collected for one source category on one day."""
+
+    day: date
+    source_category: str
+    articles: int
+    representatives: int  # One per near-duplicate story cluster
+
+
+class KeywordDayStats(BaseModel):
+    """Articles matching one relevance keyword on one day."""
+
+    day: date
+    keyword: str
+    articles: int
+    representatives: int
+
+
+class NewsStats(BaseModel):
+    """Daily aggregates for a date range, read from the precomputed rollup."""
+
+    start_date: date
+    end_date: date
+    category: Optional[str] = None
+    categories: List[CategoryDayStats]
+    keywords: List[KeywordDayStats]
@@ -1,8 +1,18 @@
 from fastapi import FastAPI, Header, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 import os
 from scheduler import run_all_collectors
+from database.db_connector import init_pool, close_pool, borrow_connection, fetch_run
+from utils.run_coordinator import start_run
+from utils.pipeline_jobs import enqueue_collection
+from utils.logging_config import configure_logging
+from utils.metrics import instrument_app
 from typing import Optional
+import logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Financial News Scraper API",
@@ -10,9 +20,21 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Request latency per endpoint and a Prometheus /metrics endpoint
+instrument_app(app)
+
 # Secret token for authentication
 SECRET_TOKEN = os.getenv('CRON_SECRET_TOKEN', 'your-secret-token-here')
 
+@app.on_event("startup")
+def open_db_pool():
+    """Create the shared connection pool and verify the schema once at startup"""
+    init_pool()
+
+@app.on_event("shutdown")
+def close_db_pool():
+    close_pool()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -21,6 +43,9 @@ async def root():
         "status": "healthy",
         "endpoints": {
             "trigger_scraper": "/run-scraper?token=YOUR_TOKEN",
+            "enqueue_collection": "/enqueue-collection?token=YOUR_TOKEN",
+            "run_status": "/runs/{run_id}?token=YOUR_TOKEN",
+            "metrics": "/metrics",
             "health": "/health"
         }
     }
@@ -55,17 +80,34 @@ async def trigger_scraper(
             detail="Unauthorized: Invalid or missing authentication token"
         )
     
+    # Single flight: join the in-flight run instead of starting another one
+    run_id, in_flight_id = await run_in_threadpool(start_run, "http")
+    if run_id is None:
+        if in_flight_id is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Database service unavailable. Could not register the run."
+            )
+        return {
+            "status": "already_running",
+            "run_id": in_flight_id,
+            "status_url": f"/runs/{in_flight_id}",
+            "message": "A scraper run is already in progress; joined it instead of starting another"
+        }
+    
     try:
         # Run scraper in background to avoid timeout on cold start
-        background_tasks.add_task(run_all_collectors)
+        background_tasks.add_task(run_all_collectors, run_id=run_id)
         
         return {
             "status": "started",
+            "run_id": run_id,
+            "status_url": f"/runs/{run_id}",
             "message": "News scraper started successfully in background"
         }
         
     except Exception as e:
-        print(f"Error starting scraper: {e}")
+        logger.exception("Error starting scraper: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error starting scraper: {str(e)}"
@@ -90,22 +132,107 @@ async def trigger_scraper_sync(
             detail="Unauthorized: Invalid or missing authentication token"
         )
     
+    run_id, in_flight_id = await run_in_threadpool(start_run, "http-sync")
+    if run_id is None:
+        if in_flight_id is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Database service unavailable. Could not register the run."
+            )
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "A scraper run is already in progress",
+                "run_id": in_flight_id,
+                "status_url": f"/runs/{in_flight_id}"
+            }
+        )
+    
     try:
-        print("Scraper triggered via web endpoint (synchronous)")
-        run_all_collectors()
+        logger.info("Scraper triggered via web endpoint (synchronous)")
+        # The pipeline is blocking I/O: run it in the threadpool, not on the event loop
+        await run_in_threadpool(run_all_collectors, run_id=run_id)
+        run = await run_in_threadpool(get_run, run_id)
         
         return {
-            "status": "success",
-            "message": "News scraper completed successfully"
+            "status": "success" if run and run["status"] == "succeeded" else "failed",
+            "run_id": run_id,
+            "message": "News scraper completed successfully" if run and run["status"] == "succeeded"
+                       else "News scraper finished with errors",
+            "run": run
         }
         
     except Exception as e:
-        print(f"Error running scraper: {e}")
+        logger.exception("Error running scraper: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error running scraper: {str(e)}"
         )
 
+@app.post("/enqueue-collection")
+@app.get("/enqueue-collection")
+async def trigger_enqueue_collection(
+    token: Optional[str] = None,
+    x_cron_token: Optional[str] = Header(None)
+):
+    """
+    Queues a collection round for the job queue workers (python worker.py run)
+    instead of running the pipeline in this process.
+    """
+    
+    provided_token = token or x_cron_token
+    
+    if provided_token != SECRET_TOKEN:
+        raise HTTPException(
+            status_code=401,
+            detail="Unauthorized: Invalid or missing authentication token"
+        )
+    
+    def enqueue():
+        with borrow_connection() as conn:
+            if conn is None:
+                return None, None
+            return enqueue_collection(conn)
+
+    batch, job_ids = await run_in_threadpool(enqueue)
+    if job_ids is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Database service unavailable. Could not queue the collection round."
+        )
+    return {
+        "status": "queued",
+        "batch": batch,
+        "jobs": len(job_ids),
+        "message": "Collection round queued for the workers"
+    }
+
+def get_run(run_id: int):
+    """Loads a scraper run (status, per-stage timings, summary) from the database."""
+    with borrow_connection() as conn:
+        return fetch_run(conn, run_id)
+
+@app.get("/runs/{run_id}")
+async def run_status(
+    run_id: int,
+    token: Optional[str] = None,
+    x_cron_token: Optional[str] = Header(None)
+):
+    """Status and per-stage timings of a scraper run (same token as /run-scraper)"""
+    
+    provided_token = token or x_cron_token
+    
+    if provided_token != SECRET_TOKEN:
+        raise HTTPException(
+            status_code=401,
+            detail="Unauthorized: Invalid or missing authentication token"
+        )
+    
+    run = await run_in_threadpool(get_run, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    return run
+
 # Optional: Add a manual trigger endpoint (no auth needed for testing)
 @app.get("/test")
 async def test_endpoint():
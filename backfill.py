@@ -0,0 +1,189 @@
+# backfill.py
+"""
+Historical backfill for the collectors.
+
+Expands every Google News search query into one query per date window
+(Google News' after:/before: operators), downloads the raw feeds
+concurrently, parses and normalizes them in a process pool (feedparser and
+date handling are CPU-bound, so threads would serialize on the GIL) and
+streams the compact Article records back to a single writer that bulk-inserts
+them through the normal ingest path (seen-URL filter, near-duplicate
+clustering, batched INSERTs).
+
+Conditional GETs and incremental watermarks are bypassed and left untouched.
+
+Usage:
+    python backfill.py --since 2024-01-01 --window-days 7 --workers 8
+    python backfill.py --since 2024-06-01 --query "CBN circular" --no-nitter --dry-run
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from database.db_connector import connect
+from collectors.feed_fetcher import FeedRequest, iter_feeds
+from collectors.normalize import utcnow
+from collectors.external_api import (
+    SEARCH_QUERIES, NITTER_HANDLES, google_news_search_url, nitter_feed_url, parse_feed_body, ingest_articles,
+)
+from collectors.source_health import get_source_health
+from utils.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# --- BACKFILL CONFIGURATION ---
+BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', str(os.cpu_count() or 1)))  # Parser processes
+BACKFILL_FLUSH_ROWS = int(os.getenv('BACKFILL_FLUSH_ROWS', '2000'))              # Parsed rows per ingest call
+
+
+def parse_job(source, key, body):
+    """Process-pool task: parses one feed and reports the CPU time it took."""
+    started = time.process_time()
+    key, articles, error = parse_feed_body(source, key, body)
+    return source, key, articles, error, time.process_time() - started
+
+
+def backfill_requests(queries, handles, since, until, window_days):
+    """Yields (source, FeedRequest) for every query/window and every handle."""
+    window = timedelta(days=window_days)
+    start = since
+    while start < until:
+        end = min(start + window, until)
+        for query in queries:
+            windowed = f"{query} after:{start:%Y-%m-%d} before:{end:%Y-%m-%d}"
+            yield 'google', FeedRequest(windowed, google_news_search_url(windowed))
+        start = end
+    # Nitter RSS only serves the recent timeline, so each handle is fetched once
+    for handle in handles:
+        yield 'nitter', FeedRequest(handle, nitter_feed_url(handle))
+
+
+class BackfillWriter:
+    """Single writer: buffers parsed rows and bulk-ingests them in large chunks."""
+
+    def __init__(self, conn, flush_rows: int = BACKFILL_FLUSH_ROWS, dry_run: bool = False):
+        self.conn = conn
+        self.flush_rows = flush_rows
+        self.dry_run = dry_run
+        self._buffer = []
+        self.totals = {'parsed': 0, 'known_skipped': 0, 'batch_duplicates': 0, 'near_duplicates': 0,
+                       'inserted': 0, 'skipped': 0, 'failed': 0}
+        self.insert_seconds = 0.0
+
+    def add(self, articles):
+        self._buffer.extend(articles)
+        self.totals['parsed'] += len(articles)
+        if len(self._buffer) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer or self.dry_run:
+            self._buffer = []
+            return
+        started = time.monotonic()
+        summary = ingest_articles(self.conn, self._buffer, source='backfill')
+        self.insert_seconds += time.monotonic() - started
+        self._buffer = []
+
+        self.totals['known_skipped'] += summary['known_skipped']
+        self.totals['batch_duplicates'] += summary['batch_duplicates']
+        self.totals['near_duplicates'] += summary['near_duplicates']
+        for stats in summary['batches']:
+            for field in ('inserted', 'skipped', 'failed'):
+                self.totals[field] += stats[field]
+
+
+def run_backfill(conn, feed_requests, workers: int = BACKFILL_WORKERS,
+                 flush_rows: int = BACKFILL_FLUSH_ROWS, dry_run: bool = False):
+    """Fetches feeds with threads, parses them in `workers` processes and writes from this one.
+
+    Downloads go through the per-host rate limits and circuit breakers, so a
+    long backfill slows down when Google News starts throttling.
+    """
+    sources = dict((request.key, source) for source, request in feed_requests)
+    health = get_source_health()
+    health.load(conn)
+    writer = BackfillWriter(conn, flush_rows, dry_run)
+    stats = {'feeds': len(sources), 'fetch_errors': 0, 'parse_errors': 0, 'parse_cpu_seconds': 0.0}
+    pending = set()
+
+    def collect(done):
+        for future in done:
+            source, key, articles, error, cpu_seconds = future.result()
+            stats['parse_cpu_seconds'] += cpu_seconds
+            if error:
+                stats['parse_errors'] += 1
+                logger.error("Error parsing %s feed '%s': %s", source, key, error)
+            writer.add(articles)
+
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for response in iter_feeds((request for _, request in feed_requests), health=health):
+            if response.error or response.body is None:
+                stats['fetch_errors'] += 1
+                logger.error("Error fetching '%s': %s", response.key, response.error)
+                continue
+            pending.add(pool.submit(parse_job, sources[response.key], response.key, response.body))
+            # Write whatever has been parsed already while downloads continue
+            done = {future for future in pending if future.done()}
+            pending -= done
+            collect(done)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    writer.flush()
+    health.save(conn)
+
+    stats.update(writer.totals)
+    stats['wall_seconds'] = time.monotonic() - started
+    stats['insert_seconds'] = writer.insert_seconds
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--since', type=datetime.fromisoformat, required=True, help="first day to backfill (YYYY-MM-DD)")
+    parser.add_argument('--until', type=datetime.fromisoformat, default=None, help="last day, exclusive (default: today)")
+    parser.add_argument('--window-days', type=int, default=7, help="days covered by each windowed query")
+    parser.add_argument('--query', action='append', help="search query (repeatable; default: SEARCH_QUERIES)")
+    parser.add_argument('--no-nitter', action='store_true', help="skip the Nitter handles")
+    parser.add_argument('--workers', type=int, default=BACKFILL_WORKERS, help="parser processes")
+    parser.add_argument('--flush-rows', type=int, default=BACKFILL_FLUSH_ROWS, help="parsed rows per bulk ingest")
+    parser.add_argument('--dry-run', action='store_true', help="fetch and parse only, insert nothing")
+    args = parser.parse_args()
+    configure_logging()
+
+    until = args.until or utcnow()
+    feed_requests = list(backfill_requests(
+        args.query or SEARCH_QUERIES, [] if args.no_nitter else NITTER_HANDLES, args.since, until, args.window_days
+    ))
+    print(f"--- Backfill: {len(feed_requests)} feeds from {args.since:%Y-%m-%d} to {until:%Y-%m-%d}, "
+          f"{args.workers} parser processes ---")
+
+    conn = None if args.dry_run else connect()
+    if conn is None and not args.dry_run:
+        sys.exit("❌ No database connection, backfill aborted")
+    try:
+        stats = run_backfill(conn, feed_requests, args.workers, args.flush_rows, args.dry_run)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    print(f"📊 Backfill: {stats['feeds']} feeds ({stats['fetch_errors']} fetch errors, "
+          f"{stats['parse_errors']} parse errors), {stats['parsed']} entries parsed, "
+          f"{stats['known_skipped']} known URLs filtered, {stats['batch_duplicates']} repeated URLs dropped, "
+          f"{stats['near_duplicates']} near-duplicates clustered, "
+          f"{stats['inserted']} inserted, {stats['skipped']} skipped, {stats['failed']} failed")
+    print(f"⏱️  {stats['wall_seconds']:.1f}s wall, {stats['parse_cpu_seconds']:.1f}s parse CPU across workers, "
+          f"{stats['insert_seconds']:.1f}s inserting")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/bench_article_record.py
+"""
+Article record and normalization layer: memory and throughput.
+
+Generates --rows synthetic news_article rows and reports:
+
+  * memory:  bytes per record (tracemalloc) held as the old ad-hoc tuple
+             (write path), as dict(row) (read path) and as a slotted Article
+  * build:   records per second for dict(zip(ARTICLE_COLUMNS, row)), the
+             stand-in for DictCursor + dict(row), versus Article.from_row
+  * dates:   RFC-822 / ISO strings per second through normalize_date,
+             uncached and cached (feeds repeat a small set of timestamps)
+  * urls:    canonical_url per second, uncached and cached (feeds are
+             re-read every run, so most links were seen before)
+
+No database needed.
+
+Usage:
+    python benchmarks/bench_article_record.py --rows 50000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.db_connector import ARTICLE_COLUMNS
+from database.records import Article
+from collectors.normalize import normalize_date, canonical_url, _parse_date_string
+
+SOURCES = ['External-GoogleNews', 'Social-X']
+TRACKING = ['', '?utm_source=google&utm_medium=rss', '?fbclid=abc123', '?id=42&utm_campaign=digest']
+
+
+def build_rows(count, rng):
+    """Rows in ARTICLE_COLUMNS order, as the listing queries return them."""
+    now = datetime(2024, 6, 1)
+    return [
+        (i, f"CBN issues circular {i} on FX limits", f"https://news.example.com/{i}",
+         now - timedelta(minutes=rng.randrange(30 * 24 * 60)), "Summary " * 20, rng.choice(SOURCES),
+         now, round(rng.uniform(0, 5), 1), ['cbn', 'circular'], rng.randrange(1 << 40), True)
+        for i in range(count)
+    ]
+
+
+def measure_bytes(build):
+    """Bytes allocated (and kept) by build(), per record."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(records)
+
+
+def rate(fn, items):
+    start = time.perf_counter()
+    fn(items)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000, help="synthetic articles")
+    parser.add_argument('--distinct-dates', type=int, default=500, help="distinct timestamps among the dates")
+    parser.add_argument('--distinct-urls', type=int, default=2_000, help="distinct links among the URLs")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = build_rows(args.rows, rng)
+
+    # Record fields only: the strings and datetimes are shared, so the delta is the container itself
+    print("Memory (bytes per record)")
+    memory = {
+        'tuple': measure_bytes(lambda: [(r[1], r[2], r[3], r[4], r[5], r[7], r[8]) for r in rows]),
+        'dict': measure_bytes(lambda: [dict(zip(ARTICLE_COLUMNS, r)) for r in rows]),
+        'Article': measure_bytes(lambda: [Article.from_row(r) for r in rows]),
+    }
+    for label, size in memory.items():
+        print(f"  {label:<8} {size:>8.0f}")
+
+    print("\nThroughput (per second)")
+    build = {
+        'dict(row)': rate(lambda items: [dict(zip(ARTICLE_COLUMNS, r)) for r in items], rows),
+        'from_row': rate(lambda items: [Article.from_row(r) for r in items], rows),
+    }
+    for label, per_second in build.items():
+        print(f"  build {label:<14} {per_second:>12.0f}")
+
+    stamps = [datetime(2024, 6, 1) - timedelta(minutes=rng.randrange(30 * 24 * 60))
+              for _ in range(args.distinct_dates)]
+    texts = [format_datetime(stamp.replace(tzinfo=timezone.utc)) if rng.random() < 0.5 else stamp.isoformat()
+             for stamp in stamps]
+    dates = [rng.choice(texts) for _ in range(args.rows)]
+    _parse_date_string.cache_clear()
+    uncached = rate(lambda items: [_parse_date_string.__wrapped__(value) for value in items], dates)
+    cached = rate(lambda items: [normalize_date(value) for value in items], dates)
+    print(f"  dates uncached       {uncached:>12.0f}")
+    print(f"  dates cached         {cached:>12.0f}  ({cached / uncached:.1f}x)")
+
+    links = [r[2] + rng.choice(TRACKING) for r in rows[:args.distinct_urls]]
+    urls = [rng.choice(links) for _ in range(args.rows)]
+    canonical_url.cache_clear()
+    uncached = rate(lambda items: [canonical_url.__wrapped__(value) for value in items], urls)
+    cached = rate(lambda items: [canonical_url(value) for value in items], urls)
+    print(f"  urls uncached        {uncached:>12.0f}")
+    print(f"  urls cached          {cached:>12.0f}  ({cached / uncached:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
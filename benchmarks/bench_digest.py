@@ -0,0 +1,163 @@
+# benchmarks/bench_digest.py
+"""
+Digest rendering: utils.digest_renderer.render_digest versus the previous
+implementation (per-article `html +=` in scheduler.format_news_to_html, then
+a regex pass over the HTML to derive the plain-text part).
+
+Generates synthetic articles (titles with characters that need escaping)
+and reports the median time for both the HTML and text bodies at each size.
+No database needed.
+
+Usage:
+    python benchmarks/bench_digest.py --sizes 50 500 5000 20000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.records import Article
+from utils.digest_renderer import render_digest
+from utils.email_sender import create_plain_text_version
+
+
+def legacy_format_news_to_html(news_list: list) -> str:
+    """Creates a professional HTML email that avoids spam filters."""
+    if not news_list:
+        return """
+        <!DOCTYPE html>
+        <html lang="en">
+        <head><meta charset="UTF-8"></head>
+        <body style="font-family: Arial, sans-serif; padding: 10px;">
+            <h3>No new regulatory news found in this period.</h3>
+        </body>
+        </html>
+        """
+    
+    # Professional HTML structure with proper DOCTYPE
+    html = """
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Regulatory News Digest</title>
+    </head>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; background-color: #f4f4f4; margin: 0; padding: 20px;">
+        
+            
+            <!-- Header -->
+            <div style="border-bottom: 3px solid #3498db; padding-bottom: 15px; margin-bottom: 25px;">
+                <h2 style="color: #2c3e50; margin: 0; font-size: 24px;">📰 Regulatory News Digest</h2>
+                <p style="color: #7f8c8d; margin: 5px 0 0 0; font-size: 14px;">Latest financial regulatory updates</p>
+            </div>
+            
+            <!-- Introduction -->
+            <p style="font-size: 12px; color: #555; margin-bottom: 20px;">
+                Here are the latest regulatory news articles from the past week:
+            </p>
+            
+            <!-- News Items -->
+    """
+    
+    for item in news_list:
+        title = item.get('title', 'No Title')
+        source = item.get('source_category', 'Unknown Source')
+        url = item.get('source_url', '#')
+        
+        # Format date nicely
+        pub_date = item.get('publication_date')
+        if pub_date:
+            pub_date_str = pub_date.strftime('%B %d, %Y')
+        else:
+            pub_date_str = 'Date unknown'
+
+        html += f"""
+            <div style="border: 1px solid #e0e0e0; padding: 17px; margin-bottom: 15px; border-radius: 5px; background-color: #fafafa;">
+                <div style="margin-bottom: 8px;">
+                    <a href="{url}" target="_blank" style="color: #2980b9; text-decoration: none; font-weight: bold; font-size: 14px; line-height: 1.4;">
+                        {title}
+                    </a>
+                </div>
+                <div style="font-size: 12px; color: #666;">
+                    <span style="color: #e74c3c; font-weight: 300;">📌 {source}</span>
+                    <span style="color: #95a5a6;"> • </span>
+                    <span style="color: #27ae60;"> {pub_date_str}</span>
+                </div>
+            </div>
+        """
+    
+    html += f"""
+            <!-- Footer -->
+            <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #e0e0e0; text-align: center;">
+                <p style="font-size: 12px; color: #999; margin: 5px 0;">
+                    This is an automated regulatory news digest
+                </p>
+                <p style="font-size: 12px; color: #999; margin: 5px 0;">
+                    You are receiving this because you subscribed to financial news updates
+                </p>
+                <p style="font-size: 11px; color: #bbb; margin: 15px 0 0 0;">
+                    Total articles: {len(news_list)} | Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
+                </p>
+            </div>
+            
+        
+    </body>
+    </html>
+    """
+    return html
+
+
+def legacy_render(news_list):
+    html = legacy_format_news_to_html(news_list)
+    return html, create_plain_text_version(html)
+
+
+def build_articles(count, rng):
+    now = datetime.now()
+    sources = ['External-GoogleNews', 'Social-X']
+    return [
+        Article(
+            title=f"CBN <circular> #{i} on FX & \"cash\" limits for {rng.choice(['banks', 'PSBs', 'fintechs'])}",
+            source_url=f"https://news.example.com/{i}?ref=digest&id={rng.randrange(1 << 30)}",
+            publication_date=now - timedelta(minutes=rng.randrange(7 * 24 * 60)),
+            content=None,
+            source_category=rng.choice(sources),
+        )
+        for i in range(count)
+    ]
+
+
+def median_ms(func, news, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(news)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 5000, 20000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'articles':>9} {'legacy ms':>11} {'renderer ms':>12} {'speedup':>8}")
+    for size in args.sizes:
+        news = build_articles(size, rng)
+        legacy = median_ms(legacy_render, [asdict(article) for article in news], args.repeat)  # It read dict rows
+        renderer = median_ms(render_digest, news, args.repeat)
+        print(f"{size:>9} {legacy:>11.2f} {renderer:>12.2f} {legacy / renderer:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
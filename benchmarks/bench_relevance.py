@@ -0,0 +1,114 @@
+# benchmarks/bench_relevance.py
+"""
+Relevance matcher throughput versus one re.search per keyword.
+
+Builds a keyword set of --keywords terms (the built-in list padded with
+synthetic regulator circular references), generates --entries synthetic
+headlines + summaries, and reports entries per second for:
+
+  * naive:    re.search(term, text, re.IGNORECASE) for every term, like the
+              old Nitter filter but over the full keyword list
+  * matcher:  RelevanceMatcher, one tokenizing pass with a first-word index
+
+No database needed.
+
+Usage:
+    python benchmarks/bench_relevance.py --keywords 500 --entries 20000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from collectors.relevance import DEFAULT_KEYWORDS, RelevanceMatcher
+
+FILLER = [
+    'bank', 'capital', 'market', 'naira', 'exchange', 'rate', 'inflation', 'deposit', 'insurance',
+    'pension', 'bond', 'treasury', 'liquidity', 'reserve', 'lending', 'credit', 'payment', 'digital',
+    'customer', 'investor', 'board', 'governor', 'committee', 'meeting', 'report', 'quarter',
+    'growth', 'economy', 'lagos', 'abuja', 'stock', 'shares', 'dividend', 'audit', 'review',
+]
+
+
+def build_keywords(count, rng):
+    keywords = dict(DEFAULT_KEYWORDS)
+    regulators = ['cbn', 'sec', 'ndic', 'naicom', 'pencom', 'firs']
+    while len(keywords) < count:
+        reference = f"{rng.choice(regulators)} circular {rng.choice('ABCDEFG')}{rng.randint(100, 999)}"
+        keywords[reference] = round(rng.uniform(1, 3), 1)
+    return keywords
+
+
+def build_entries(count, keywords, rng):
+    terms = list(keywords)
+    entries = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=60)
+        # Roughly a third of entries mention one or two keywords
+        for _ in range(rng.choice([0, 0, 1, 2])):
+            words.insert(rng.randrange(len(words)), rng.choice(terms).upper())
+        entries.append((' '.join(words[:12]).capitalize(), ' '.join(words[12:])))
+    return entries
+
+
+def run_naive(entries, keywords):
+    matched = 0
+    for title, content in entries:
+        text = f"{title} {content}"
+        score = sum(weight for term, weight in keywords.items()
+                    if re.search(term.rstrip('*'), text, re.IGNORECASE))
+        matched += score > 0
+    return matched
+
+
+def run_matcher(entries, matcher):
+    matched = 0
+    for title, content in entries:
+        matched += matcher.match(title, content).score > 0
+    return matched
+
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    matched = fn(*args)
+    elapsed = time.perf_counter() - start
+    return label, elapsed, matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keywords', type=int, default=500, help="keyword set size")
+    parser.add_argument('--entries', type=int, default=20_000, help="synthetic entries to score")
+    parser.add_argument('--naive-entries', type=int, default=2_000,
+                        help="entries for the (slow) naive baseline")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    keywords = build_keywords(args.keywords, rng)
+    entries = build_entries(args.entries, keywords, rng)
+
+    start = time.perf_counter()
+    matcher = RelevanceMatcher(keywords)
+    compile_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(keywords)} keywords, compiled in {compile_ms:.1f} ms")
+
+    results = [
+        timed("naive", run_naive, entries[:args.naive_entries], keywords),
+        timed("matcher", run_matcher, entries, matcher),
+    ]
+    sizes = {"naive": min(args.naive_entries, len(entries)), "matcher": len(entries)}
+
+    print("\nThroughput")
+    for label, elapsed, matched in results:
+        count = sizes[label]
+        print(f"  {label:<8} {count:>7} entries {elapsed:>8.3f} s  {count / elapsed:>10.0f} entries/s  "
+              f"({matched} relevant)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/common.py
+
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import psycopg2
+
+
+def bench_connect():
+    """Connects to the scratch database named by BENCH_DATABASE_URL (or DATABASE_URL)."""
+    database_url = os.getenv('BENCH_DATABASE_URL') or os.getenv('DATABASE_URL')
+    if not database_url:
+        sys.exit("Set BENCH_DATABASE_URL (or DATABASE_URL) to a scratch database")
+    result = urlparse(database_url)
+    return psycopg2.connect(host=result.hostname, port=result.port, user=result.username,
+                            password=result.password, database=result.path[1:])
+
+
+@contextmanager
+def scratch_schema(conn, name, keep=False):
+    """Creates an empty schema, points search_path at it and drops it afterwards."""
+    cur = conn.cursor()
+    cur.execute(f"DROP SCHEMA IF EXISTS {name} CASCADE; CREATE SCHEMA {name}")
+    cur.execute(f"SET search_path TO {name}")
+    conn.commit()
+    try:
+        yield cur
+    finally:
+        if not keep:
+            conn.rollback()
+            cur.execute(f"DROP SCHEMA IF EXISTS {name} CASCADE")
+            conn.commit()
+        cur.close()
+
+
+@contextmanager
+def throwaway_database(keep=False):
+    """Creates an empty database next to BENCH_DATABASE_URL's and yields its URL.
+
+    The role needs CREATEDB. The database is dropped afterwards unless `keep`.
+    """
+    admin = bench_connect()
+    admin.autocommit = True
+    name = f"bench_{os.getpid()}_{int(time.time())}"
+    cur = admin.cursor()
+    cur.execute(f"CREATE DATABASE {name}")
+    result = urlparse(os.getenv('BENCH_DATABASE_URL') or os.getenv('DATABASE_URL'))
+    try:
+        yield result._replace(path=f"/{name}").geturl()
+    finally:
+        if not keep:
+            cur.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        cur.close()
+        admin.close()
+
+
+def explain(cur, sql, params):
+    """EXPLAIN (ANALYZE, BUFFERS) output as one string."""
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, params)
+    return "\n".join(row[0] for row in cur.fetchall())
+
+
+def median_ms(cur, sql, params, repeat):
+    """Median wall-clock time of executing and fetching `sql`, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
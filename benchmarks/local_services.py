@@ -0,0 +1,197 @@
+# benchmarks/local_services.py
+"""
+Local stand-ins for the external services the pipeline talks to.
+
+LocalServices is one threaded HTTP server that answers:
+
+  GET  /rss/search?q=...      synthetic Google News search feed (per query)
+  GET  /<handle>/rss          synthetic Nitter timeline (per handle)
+  POST /v3/mail/send          fake SendGrid: records the payload, answers 202
+
+Feeds are deterministic for a given seed, support ETag revalidation (so a
+second collector run exercises the 304 path) and contain a configurable
+share of duplicate stories: `dup_ratio` entries reuse a story (same URL)
+that also appears in other feeds, `near_dup_ratio` entries reword a shared
+story under a fresh URL. `delay` (or `delays`, per request path) stalls
+GETs to stand in for slow origins; `max_in_flight` records the most
+concurrent GETs seen.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+SUBJECTS = ['CBN', 'SEC Nigeria', 'NDIC', 'NAICOM', 'FIRS', 'PenCom', 'FCCPC']
+ACTIONS = ['issues circular on', 'releases guidelines for', 'announces enforcement against',
+           'publishes exposure draft on', 'updates licensing rules for', 'sanctions operators over']
+TOPICS = ['foreign exchange trading', 'cash withdrawal limits', 'fintech licensing', 'open banking',
+          'payment service banks', 'crypto assets', 'capital market operators', 'microfinance banks',
+          'insurance recapitalisation', 'tax on digital services', 'AML and KYC checks', 'bank deposits']
+PUBLISHERS = ['Punch', 'Vanguard', 'BusinessDay', 'Premium Times', 'Nairametrics', 'TheCable', 'Reuters']
+REWORDINGS = {'issues': 'releases fresh', 'on': 'about', 'rules': 'regulations', 'for': 'covering'}
+
+
+def story_title(rng):
+    return f"{rng.choice(SUBJECTS)} {rng.choice(ACTIONS)} {rng.choice(TOPICS)}"
+
+
+def reword(title):
+    return ' '.join(REWORDINGS.get(word, word) for word in title.split())
+
+
+class FeedFactory:
+    """Builds deterministic RSS bodies; shared stories are common to every feed."""
+
+    def __init__(self, entries_per_feed=100, dup_ratio=0.3, near_dup_ratio=0.1, seed=7):
+        self.entries_per_feed = entries_per_feed
+        self.dup_ratio = dup_ratio
+        self.near_dup_ratio = near_dup_ratio
+        self.seed = seed
+        rng = random.Random(seed)
+        self.now = datetime.now().astimezone().replace(microsecond=0)
+        self.shared = [
+            (f"https://news.example.com/shared/{i}", story_title(rng), self.now - timedelta(minutes=37 * i))
+            for i in range(max(10, entries_per_feed))
+        ]
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def _rng(self, key):
+        return random.Random(int.from_bytes(hashlib.sha1(f"{self.seed}:{key}".encode()).digest()[:8], 'little'))
+
+    def _entries(self, key):
+        rng = self._rng(key)
+        for i in range(self.entries_per_feed):
+            roll = rng.random()
+            if roll < self.dup_ratio:
+                yield rng.choice(self.shared)
+            elif roll < self.dup_ratio + self.near_dup_ratio:
+                url, title, published = rng.choice(self.shared)
+                yield f"https://news.example.com/{rng.randrange(1 << 30)}", reword(title), published
+            else:
+                yield (f"https://news.example.com/{key_slug(key)}/{i}", story_title(rng),
+                       self.now - timedelta(minutes=rng.randrange(7 * 24 * 60)))
+
+    def google(self, query):
+        items = []
+        for url, title, published in self._entries(f"google:{query}"):
+            publisher = PUBLISHERS[stable_hash(url) % len(PUBLISHERS)]
+            description = f'<a href="{url}">{title}</a>&nbsp;&nbsp;<font color="#6f6f6f">{publisher}</font>'
+            items.append(
+                f"<item><title>{escape(title)} - {publisher}</title><link>{escape(url)}</link>"
+                f"<pubDate>{format_datetime(published)}</pubDate>"
+                f"<description>{escape(description)}</description></item>"
+            )
+        return rss(f"\"{query}\" - Google News", items)
+
+    def nitter(self, handle):
+        items = []
+        for i, (url, title, published) in enumerate(self._entries(f"nitter:{handle}")):
+            status = f"https://nitter.example/{handle}/status/{stable_hash(f'{url}:{i}') % 10 ** 12}"
+            items.append(
+                f"<item><title>{escape(title)} {url}</title><link>{status}</link>"
+                f"<pubDate>{format_datetime(published)}</pubDate></item>"
+            )
+        return rss(f"{handle} / X", items)
+
+    def body(self, kind, key):
+        with self._lock:
+            if (kind, key) not in self._bodies:
+                text = self.google(key) if kind == 'google' else self.nitter(key)
+                self._bodies[(kind, key)] = text.encode('utf-8')
+            return self._bodies[(kind, key)]
+
+
+def key_slug(key):
+    return hashlib.sha1(key.encode()).hexdigest()[:10]
+
+
+def stable_hash(text):
+    """hash() is salted per process; feeds must be identical across runs."""
+    return int.from_bytes(hashlib.sha1(text.encode()).digest()[:8], 'little')
+
+
+def rss(title, items):
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f'<title>{escape(title)}</title><lastBuildDate>{format_datetime(datetime.now().astimezone())}'
+            f'</lastBuildDate>{"".join(items)}</channel></rss>')
+
+
+class LocalServices:
+    """Synthetic RSS origin plus SendGrid sink on 127.0.0.1 (random port)."""
+
+    def __init__(self, feeds: FeedFactory):
+        self.feeds = feeds
+        self.emails = []  # (path, payload bytes) per send
+        self.requests = 0
+        self.delay = 0.0
+        self.delays = {}  # request path -> seconds to stall before answering
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=b'', headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                with services._lock:
+                    services.requests += 1
+                    services.in_flight += 1
+                    services.max_in_flight = max(services.max_in_flight, services.in_flight)
+                try:
+                    time.sleep(services.delays.get(url.path, services.delay))
+                    self._get(url)
+                finally:
+                    with services._lock:
+                        services.in_flight -= 1
+
+            def _get(self, url):
+                if url.path == '/rss/search':
+                    body = services.feeds.body('google', parse_qs(url.query).get('q', [''])[0])
+                elif url.path.endswith('/rss'):
+                    body = services.feeds.body('nitter', url.path.strip('/').split('/')[0])
+                else:
+                    return self._reply(404)
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    return self._reply(304, headers={'ETag': etag})
+                self._reply(200, body, {'Content-Type': 'application/rss+xml', 'ETag': etag})
+
+            def do_POST(self):
+                payload = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path.startswith('/v3/mail/send'):
+                    services.emails.append((self.path, payload))
+                    return self._reply(202, headers={'X-Message-Id': f"bench-{len(services.emails)}"})
+                self._reply(404)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
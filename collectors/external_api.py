@@ -1,15 +1,25 @@
 # collectors/external_api.py
 
 import feedparser 
-import re # For smart filtering
-from pygooglenews import GoogleNews
-import time
-from datetime import datetime
+import logging
+from urllib.parse import quote_plus
 import sys, os
 
 # This path modification allows importing from the database folder
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from database.db_connector import connect, insert_article 
+from database.db_connector import borrow_connection, insert_articles, ensure_partitions
+from database.records import Article
+from collectors.feed_fetcher import FeedRequest, iter_feeds
+from collectors.feed_cache import FeedCache, FEED_ERROR
+from collectors.normalize import canonical_url, canonical_tweet_url, entry_date, utcnow
+from collectors.source_health import get_source_health
+from collectors.seen_urls import get_seen_filter
+from collectors.watermarks import WatermarkStore
+from collectors.relevance import get_matcher, RELEVANCE_MIN_SCORE
+from collectors.near_duplicates import get_clusterer
+from utils.metrics import count_entries
+
+logger = logging.getLogger(__name__)
 
 # --- CONFIGURATION ---
 # Use advanced search operators (AND, OR, NOT) to maximize relevance and coverage
@@ -21,55 +31,138 @@ SEARCH_QUERIES = [
 ]
 SOURCE_CATEGORY = "External-GoogleNews"
 
+# Google News RSS search endpoint, localised for Nigeria (NG) and English (en)
+GOOGLE_NEWS_RSS_URL = os.getenv('GOOGLE_NEWS_RSS_URL', 'https://news.google.com/rss/search')
+GOOGLE_NEWS_LOCALE = 'hl=en-NG&gl=NG&ceid=NG:en'
+
+def ingest_articles(conn, articles, feed_cache=None, watermarks=None, source='collector'):
+    """Drops already-stored URLs, clusters near-duplicate stories, bulk-inserts
+    the rest and commits the feed cache and watermarks with them.
+
+    Backfills pass neither: they bypass conditional GETs and must not move
+    the incremental watermarks.
+    """
+    seen_filter = get_seen_filter(conn)
+    new_articles, known_count, duplicate_count = seen_filter.filter_new(conn, articles)
+    clusterer = get_clusterer(conn)
+    new_articles, near_duplicates = clusterer.assign(new_articles)
+    # Missing monthly partitions are created (and committed) before anything is written
+    ensure_partitions(conn, {article.publication_date for article in new_articles})
+
+    summary = {'feeds': {}, 'cache_hits': 0, 'cache_misses': 0, 'errors': 0}
+    if feed_cache:
+        feed_cache.save()
+        summary = feed_cache.summary()
+    summary['watermark_skipped'] = 0
+    if watermarks:
+        watermarks.save()
+        summary['watermark_skipped'] = watermarks.skipped
+    summary['known_skipped'] = known_count
+    summary['batch_duplicates'] = duplicate_count
+    summary['near_duplicates'] = near_duplicates
+    summary['new_articles'] = len(new_articles)
+    summary['batches'] = insert_articles(conn, new_articles)
+
+    count_entries(source, 'known', known_count)
+    count_entries(source, 'batch_duplicate', duplicate_count)
+    count_entries(source, 'near_duplicate', near_duplicates)
+    for outcome in ('inserted', 'skipped', 'failed'):
+        count_entries(source, outcome, sum(stats[outcome] for stats in summary['batches']))
+
+    inserted_urls = {url for stats in summary['batches'] for url in stats['inserted_urls']}
+    seen_filter.add(inserted_urls)
+    clusterer.add(article for article in new_articles if article.source_url in inserted_urls)
+    return summary
+
+def google_news_search_url(query):
+    """Builds the Google News RSS URL for a search query."""
+    return f"{GOOGLE_NEWS_RSS_URL}?q={quote_plus(query)}&{GOOGLE_NEWS_LOCALE}"
+
+def parse_google_news_entries(feed, watermark=None):
+    """Normalizes the entries of a parsed Google News feed into Article records.
+
+    Entries at or below the query's `watermark` are skipped. Search results
+    are ordered by relevance, not date, so the whole feed is still read.
+    Every entry is scored against the keyword set but none are dropped: the
+    search queries already did the filtering.
+    """
+    matcher = get_matcher()
+    articles = []
+    entries = feed.get('entries', [])
+    below_watermark = failed = 0
+    for entry in entries:
+        # --- START: Initialize variables here ---
+        title = None
+        url = None
+        pub_date = None
+        content = None
+        # --- END: Initialize variables ---
+
+        try:
+            # 1. Extract structured data
+            title = entry.get('title', 'N/A')
+            url = canonical_url(entry.get('link', 'N/A'))
+            
+            # Extract content/summary if available
+            content = entry.get('summary', None)
+
+            # struct_time, RFC-822 or ISO, whichever the entry carries (None if unparseable)
+            pub_date = entry_date(entry)
+
+            if watermark and not watermark.is_new(pub_date, url):
+                below_watermark += 1
+                continue
+
+            relevance = matcher.match(title, content)
+            articles.append(Article(title, url, pub_date, content, SOURCE_CATEGORY, relevance.score, relevance.terms))
+                
+        except Exception as e:
+            # Now, 'title' is guaranteed to be defined (even if None or 'N/A')
+            failed += 1
+            logger.warning("Error processing Google News entry '%s': %s", title or url, e)
+
+    count_entries('google', 'parsed', len(entries))
+    count_entries('google', 'watermark', below_watermark)
+    count_entries('google', 'error', failed)
+    return articles
+
 def scrape_google_news(conn):
-    """Fetches news using defined search queries from Google News RSS feeds."""
-    print("Starting Google News scrape...")
+    """Fetches news using defined search queries from Google News RSS feeds.
+
+    All query feeds are downloaded concurrently with conditional GETs; feeds
+    that answer 304 or return an unchanged body are not parsed again. Entries
+    are parsed as each feed arrives; URLs already stored are dropped and the
+    rest are written with one bulk insert.
+    Returns a summary with per-feed cache results and per-batch insert stats.
+    """
+    logger.info("Starting Google News scrape")
     
-    # Initialize GoogleNews for Nigeria (ng) and English (en)
-    gn = GoogleNews(lang='en', country='NG') 
+    feed_cache = FeedCache(conn)
+    feed_requests = feed_cache.conditional(
+        FeedRequest(query, google_news_search_url(query)) for query in SEARCH_QUERIES
+    )
+    watermarks = WatermarkStore(conn)
+    watermarks.load([f"google:{query}" for query in SEARCH_QUERIES])
+    health = get_source_health()
+    health.load(conn)
+    articles = []
     
-    for query in SEARCH_QUERIES:
+    for response in iter_feeds(feed_requests, health=health):
+        if response.error:
+            logger.error("Error searching Google News for query '%s': %s", response.key, response.error)
+        if not feed_cache.is_changed(response):
+            continue
+        source_key = f"google:{response.key}"
         try:
-            search_result = gn.search(query)
-            for entry in search_result.get('entries', []):
-                # --- START: Initialize variables here ---
-                title = None
-                url = None
-                pub_date = None
-                content = None
-                # --- END: Initialize variables ---
-    
-                try:
-                    # 1. Extract structured data
-                    title = entry.get('title', 'N/A')
-                    url = entry.get('link', 'N/A')
-                    
-                    # Extract content/summary if available
-                    content = entry.get('summary', None)
-    
-                    # Try to parse published date in various available formats
-                    try:
-                        if entry.get('published_parsed'):
-                            pub_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-                        elif entry.get('published'):
-                            # fallback if published is an ISO string
-                            try:
-                                pub_date = datetime.fromisoformat(entry.published)
-                            except Exception:
-                                pub_date = None
-                        else:
-                            pub_date = None
-                    except Exception:
-                        pub_date = None
-    
-                    data = (title, url, pub_date, content, SOURCE_CATEGORY)
-                    insert_article(conn, data)
-                        
-                except Exception as e:
-                    # Now, 'title' is guaranteed to be defined (even if None or 'N/A')
-                    print(f"Error processing Google News entry '{title or url}': {e}")
+            feed = feedparser.parse(response.body)
+            articles.extend(parse_google_news_entries(feed, watermarks.get(source_key)))
         except Exception as e:
-            print(f"Error searching Google News for query '{query}': {e}")
+            feed_cache.reject(response)
+            watermarks.discard(source_key)
+            logger.error("Error searching Google News for query '%s': %s", response.key, e)
+
+    health.save(conn)
+    return ingest_articles(conn, articles, feed_cache, watermarks, source='google')
 
 
 # --- CONFIGURATION ---
@@ -80,63 +173,156 @@ NITTER_HANDLES = [
     'NdicNigeria',  # NDIC
     'NAICOM_Nigeria' # NAICOM (FIRS TBD)
 ]
-NITTER_BASE_URL = "https://nitter.net/" # A common Nitter instance (may need local host if blocked)
+NITTER_BASE_URL = os.getenv('NITTER_BASE_URL', "https://nitter.net/") # A common Nitter instance (may need local host if blocked)
+# Comma-separated mirrors to fail over between (defaults to NITTER_BASE_URL alone)
+NITTER_INSTANCES = [
+    instance.strip().rstrip('/') + '/'
+    for instance in os.getenv('NITTER_INSTANCES', NITTER_BASE_URL).split(',') if instance.strip()
+]
+NITTER_FAILOVER_ATTEMPTS = int(os.getenv('NITTER_FAILOVER_ATTEMPTS', '3'))  # Instances tried per handle and run
 TWITTER_SOURCE_CATEGORY = "Social-X"
 
-# Keywords for Smart Filtering
-REGULATORY_KEYWORDS = r'(circular|policy|regulation|fintech|licensing|enforcement|fraud|tax|directive)'
+def nitter_feed_url(handle, instance=None):
+    """RSS URL of a handle's timeline on `instance`, or on a healthy, fast one picked from NITTER_INSTANCES."""
+    instance = instance or get_source_health().pick(NITTER_INSTANCES) or NITTER_INSTANCES[0]
+    return f"{instance}{handle}/rss"
 
-def scrape_twitter_nitter(conn):
-    """Fetches tweets from regulatory accounts via Nitter RSS and filters them."""
-    print("Starting X/Twitter Nitter scrape...")
+def parse_nitter_entries(handle, feed, watermark=None):
+    """Filters and normalizes the tweets of a parsed Nitter feed into Article records.
 
-    for handle in NITTER_HANDLES:
-        rss_url = f"{NITTER_BASE_URL}{handle}/rss"
+    Timelines are newest first, so reading stops once entries reach the
+    handle's `watermark`. Tweets scoring below RELEVANCE_MIN_SCORE, or
+    matching only regulator names, are dropped.
+    """
+    matcher = get_matcher()
+    articles = []
+    examined = below_watermark = irrelevant = 0
+    for entry in feed.entries:
+        examined += 1
+        tweet_text = entry.get('title', '').strip()
+        # Status links point at whichever mirror served the feed; stored as x.com URLs
+        tweet_url = canonical_tweet_url(entry.get('link', 'N/A'))
+        pub_date = entry_date(entry)
+
+        # Undated tweets are always processed but never move the watermark
+        if watermark and not watermark.is_new(pub_date, tweet_url):
+            below_watermark += 1
+            if watermark.reached:
+                break
+            continue
         
-        try:
-            # 1. Fetch and Parse the RSS Feed
-            feed = feedparser.parse(rss_url)
-            
-            for entry in feed.entries:
-                tweet_text = entry.get('title', '').strip()
-                tweet_url = entry.get('link', 'N/A')
-                
-                # 2. Smart Filtering: Check if the tweet text is relevant
-                if not re.search(REGULATORY_KEYWORDS, tweet_text, re.IGNORECASE):
-                    # print(f"Skipping non-regulatory tweet: {tweet_text[:30]}...")
-                    continue
-                
-                # 3. Normalize Data
-                # Use the first 100 characters as the title for easy display
-                title = f"[{handle}] {tweet_text[:100]}..." 
-                pub_date = datetime.fromisoformat(entry.published) if entry.get('published') else datetime.now()
-                
-                # Content is the full tweet text
-                content = tweet_text 
-                category = TWITTER_SOURCE_CATEGORY
-                
-                data = (title, tweet_url, pub_date, content, category)
-                
-                # 4. Insert into Database
-                insert_article(conn, data)
+        # 2. Smart Filtering: Check if the tweet text is relevant (a bare
+        # regulator mention, with no regulatory topic, is not)
+        relevance = matcher.match(tweet_text)
+        if relevance.score < RELEVANCE_MIN_SCORE or not relevance.topical:
+            irrelevant += 1
+            continue
+        
+        # 3. Normalize Data
+        # Use the first 100 characters as the title for easy display
+        title = f"[{handle}] {tweet_text[:100]}..." 
+        
+        # Content is the full tweet text
+        content = tweet_text 
+        category = TWITTER_SOURCE_CATEGORY
+        
+        articles.append(Article(title, tweet_url, pub_date or utcnow(), content, category,
+                                relevance.score, relevance.terms))
 
-        except Exception as e:
-            print(f"Error scraping X/Twitter for handle @{handle}: {e}")
+    count_entries('nitter', 'parsed', examined)
+    count_entries('nitter', 'watermark', below_watermark)
+    count_entries('nitter', 'irrelevant', irrelevant)
+    return articles
 
-# --- FINAL TEST RUNNER (Replace the temporary one) ---
-if __name__ == '__main__':
-    db_conn = connect()
-    if db_conn:
-        scrape_google_news(db_conn)
-        scrape_twitter_nitter(db_conn)
-        db_conn.close()
-    print("External collector run complete.")
+def scrape_twitter_nitter(conn):
+    """Fetches tweets from regulatory accounts via Nitter RSS and filters them.
 
+    All handle feeds are downloaded concurrently with conditional GETs and
+    unchanged feeds are skipped; relevant tweets are written with one bulk
+    insert. Each handle goes to a Nitter instance picked by latency among
+    those whose circuit breaker is closed; if the download fails it is
+    retried on another instance, up to NITTER_FAILOVER_ATTEMPTS instances.
+    Returns a summary with per-feed cache results and per-batch insert stats.
+    """
+    logger.info("Starting X/Twitter Nitter scrape")
+
+    feed_cache = FeedCache(conn)
+    watermarks = WatermarkStore(conn)
+    watermarks.load([f"nitter:{handle}" for handle in NITTER_HANDLES])
+    health = get_source_health()
+    health.load(conn)
+    tried = {handle: set() for handle in NITTER_HANDLES}
+    pending = list(NITTER_HANDLES)
+    articles = []
+
+    for _ in range(NITTER_FAILOVER_ATTEMPTS):
+        # 1. Pick an untried, healthy instance per handle
+        feed_requests = []
+        for handle in pending:
+            instance = health.pick(NITTER_INSTANCES, exclude=tried[handle])
+            if instance is None:
+                logger.error("No Nitter instance available for handle @%s (tried %d)", handle, len(tried[handle]))
+                feed_cache.results[handle] = FEED_ERROR
+                continue
+            tried[handle].add(instance)
+            feed_requests.append(FeedRequest(handle, nitter_feed_url(handle, instance)))
+
+        # 2. Fetch the RSS feeds concurrently, parsing each changed one as it arrives
+        pending = []
+        for response in iter_feeds(feed_cache.conditional(feed_requests), health=health):
+            handle = response.key
+            if response.error:
+                logger.error("Error scraping X/Twitter for handle @%s: %s", handle, response.error)
+                pending.append(handle)
+            if not feed_cache.is_changed(response):
+                continue
+            source_key = f"nitter:{handle}"
+            try:
+                feed = feedparser.parse(response.body)
+                articles.extend(parse_nitter_entries(handle, feed, watermarks.get(source_key)))
+            except Exception as e:
+                feed_cache.reject(response)
+                watermarks.discard(source_key)
+                logger.error("Error scraping X/Twitter for handle @%s: %s", handle, e)
+
+        # 3. Handles whose download failed move on to another instance
+        if not pending:
+            break
+
+    health.save(conn)
+    # 4. Insert new tweets into Database (feed cache and watermarks commit with it)
+    return ingest_articles(conn, articles, feed_cache, watermarks, source='nitter')
+
+# Entry parsers and feed URLs by source, for callers that hold raw feed
+# bodies (backfill.py) or fetch one feed at a time (the job queue)
+FEED_PARSERS = {
+    'google': lambda key, feed, watermark=None: parse_google_news_entries(feed, watermark),
+    'nitter': parse_nitter_entries,
+}
+FEED_URLS = {
+    'google': google_news_search_url,
+    'nitter': nitter_feed_url,
+}
+
+def parse_feed_body(source, key, body):
+    """Parses one downloaded feed body into Article records.
+
+    A module-level function of plain arguments, so it can run in a process
+    pool. Returns (key, articles, error); error is None on success.
+    """
+    try:
+        feed = feedparser.parse(body)
+        return key, FEED_PARSERS[source](key, feed), None
+    except Exception as e:
+        return key, [], str(e)
 
-    
 if __name__ == '__main__':
-    db_conn = connect()
-    if db_conn:
-        scrape_google_news(db_conn)
-        db_conn.close()
-    print("Google News scrape finished.")
\ No newline at end of file
+    # Usage: python -m collectors.external_api (one collection pass, no digest)
+    from utils.logging_config import configure_logging
+
+    configure_logging()
+    with borrow_connection() as db_conn:
+        if db_conn:
+            scrape_google_news(db_conn)
+            scrape_twitter_nitter(db_conn)
+    print("External collector run complete.")
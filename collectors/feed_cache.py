@@ -0,0 +1,88 @@
+# collectors/feed_cache.py
+
+import hashlib
+import re
+import sys, os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.db_connector import fetch_feed_cache, save_feed_cache
+
+# The channel build timestamp changes on every request even when the items don't
+# (Google News stamps lastBuildDate per response), so it's left out of the hash
+VOLATILE_FEED_TAGS = re.compile(rb'<lastBuildDate>[^<]*</lastBuildDate>', re.IGNORECASE)
+
+FEED_CACHE_HIT = 'hit'
+FEED_CACHE_MISS = 'miss'
+FEED_ERROR = 'error'
+
+
+def feed_content_hash(body: bytes) -> str:
+    """Hashes a feed body, ignoring channel timestamps that change per request."""
+    return hashlib.sha256(VOLATILE_FEED_TAGS.sub(b'', body)).hexdigest()
+
+
+class FeedCache:
+    """Per-run view of the persistent feed cache (ETag, Last-Modified, body hash).
+
+    Usage: `conditional()` adds stored validators to the outgoing requests,
+    `is_changed()` classifies each response as a cache hit (304 or identical
+    body) or miss, and `save()` writes the new validators back.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.results = {}   # feed key -> 'hit' | 'miss' | 'error'
+        self._stored = {}
+        self._updates = {}
+
+    def conditional(self, feed_requests):
+        """Returns the requests with the stored ETag/Last-Modified filled in."""
+        feed_requests = list(feed_requests)
+        self._stored.update(fetch_feed_cache(self.conn, [feed_request.url for feed_request in feed_requests]))
+        conditional_requests = []
+        for feed_request in feed_requests:
+            etag, last_modified, _ = self._stored.get(feed_request.url, (None, None, None))
+            conditional_requests.append(feed_request._replace(etag=etag, last_modified=last_modified))
+        return conditional_requests
+
+    def is_changed(self, response):
+        """True when the response carries new content that needs parsing."""
+        if response.error:
+            self.results[response.key] = FEED_ERROR
+            return False
+
+        if response.status == 304:
+            self.results[response.key] = FEED_CACHE_HIT
+            return False
+
+        content_hash = feed_content_hash(response.body)
+        self._updates[response.url] = (response.url, response.etag, response.last_modified, content_hash)
+        _, _, stored_hash = self._stored.get(response.url, (None, None, None))
+        if content_hash == stored_hash:
+            self.results[response.key] = FEED_CACHE_HIT
+            return False
+
+        self.results[response.key] = FEED_CACHE_MISS
+        return True
+
+    def reject(self, response):
+        """Drops the staged update for a feed whose new content failed to parse."""
+        self._updates.pop(response.url, None)
+        self.results[response.key] = FEED_ERROR
+
+    def save(self):
+        """Stages the new validators; committed together with the article insert."""
+        save_feed_cache(self.conn, self._updates.values())
+        self._updates = {}
+
+    def summary(self):
+        """Per-feed results plus hit/miss/error totals for the run summary."""
+        counts = {FEED_CACHE_HIT: 0, FEED_CACHE_MISS: 0, FEED_ERROR: 0}
+        for result in self.results.values():
+            counts[result] += 1
+        return {
+            'feeds': dict(self.results),
+            'cache_hits': counts[FEED_CACHE_HIT],
+            'cache_misses': counts[FEED_CACHE_MISS],
+            'errors': counts[FEED_ERROR],
+        }
@@ -0,0 +1,127 @@
+# collectors/feed_fetcher.py
+
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from collectors.source_health import CIRCUIT_OPEN_ERROR, RATE_LIMITED_ERROR, parse_retry_after
+from utils.metrics import FEED_FETCH_SECONDS
+
+# --- CONFIGURATION ---
+FETCH_MAX_WORKERS = int(os.getenv('FETCH_MAX_WORKERS', '8'))        # Feeds downloaded in parallel overall
+FETCH_PER_HOST_LIMIT = int(os.getenv('FETCH_PER_HOST_LIMIT', '2'))  # ...and at most this many per host
+FETCH_TIMEOUT = float(os.getenv('FETCH_TIMEOUT', '15'))             # Seconds (connect + read)
+USER_AGENT = os.getenv('FETCH_USER_AGENT', 'Mozilla/5.0 (compatible; RegulatoryNewsBot/1.0)')
+
+# One feed to download; `key` is the query or handle the caller wants back.
+# `etag`/`last_modified` are the validators from a previous fetch (conditional GET).
+FeedRequest = namedtuple('FeedRequest', ['key', 'url', 'etag', 'last_modified'], defaults=(None, None))
+
+# Outcome of a download; `error` is None on success and `body` is None on a 304
+FeedResponse = namedtuple('FeedResponse', ['key', 'url', 'status', 'body', 'error', 'elapsed',
+                                           'etag', 'last_modified'], defaults=(None, None))
+
+# FeedResponse plus the throttling hint the rate limiter needs
+_Attempt = namedtuple('_Attempt', FeedResponse._fields + ('retry_after',), defaults=(None, None, None))
+
+_thread_local = threading.local()
+
+
+def _session(per_host_limit):
+    """One requests.Session per worker thread (Session objects aren't thread-safe)."""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=per_host_limit, pool_maxsize=per_host_limit)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['User-Agent'] = USER_AGENT
+        _thread_local.session = session
+    return session
+
+
+def _fetch_one(feed_request, host_slots, per_host_limit, timeout, health=None):
+    host = urlparse(feed_request.url).netloc
+    if health is not None:
+        # Open breaker or a long Retry-After: fail now rather than block this
+        # worker; otherwise respect the host's rate
+        reservation = health.reserve(feed_request.url)
+        if reservation.error:
+            return FeedResponse(feed_request.key, feed_request.url, None, None, reservation.error, 0.0)
+        if reservation.wait:
+            time.sleep(reservation.wait)
+    response = _request(feed_request, host_slots, host, per_host_limit, timeout)
+    if health is not None:
+        health.record(feed_request.url, response.status, response.error, response.elapsed,
+                      response.retry_after)
+    return FeedResponse(*response[:-1])
+
+
+def _request(feed_request, host_slots, host, per_host_limit, timeout):
+    """The GET itself; returns a FeedResponse plus the Retry-After seconds, if any."""
+    started = time.monotonic()
+    headers = {}
+    if feed_request.etag:
+        headers['If-None-Match'] = feed_request.etag
+    if feed_request.last_modified:
+        headers['If-Modified-Since'] = feed_request.last_modified
+    try:
+        with host_slots[host]:
+            response = _session(per_host_limit).get(feed_request.url, headers=headers, timeout=timeout)
+        elapsed = time.monotonic() - started
+        if response.status_code >= 400:
+            return _Attempt(feed_request.key, feed_request.url, response.status_code, None,
+                            f"HTTP {response.status_code}", elapsed,
+                            retry_after=parse_retry_after(response.headers.get('Retry-After')))
+        body = None if response.status_code == 304 else response.content
+        return _Attempt(feed_request.key, feed_request.url, response.status_code, body, None, elapsed,
+                        response.headers.get('ETag', feed_request.etag),
+                        response.headers.get('Last-Modified', feed_request.last_modified))
+    except requests.RequestException as e:
+        return _Attempt(feed_request.key, feed_request.url, None, None, str(e), time.monotonic() - started)
+
+
+def iter_feeds(feed_requests, max_workers: int = FETCH_MAX_WORKERS,
+               per_host_limit: int = FETCH_PER_HOST_LIMIT, timeout: float = FETCH_TIMEOUT, health=None):
+    """Downloads feeds concurrently and yields a FeedResponse as each one completes.
+
+    At most `max_workers` downloads run at once, and at most `per_host_limit`
+    of them against the same host, so a long list of queries doesn't hammer a
+    single source. Run time stays close to the slowest feed rather than the sum
+    of all of them. With a SourceHealth (`health`), requests are also paced
+    by each host's rate limit, and hosts with an open circuit breaker are
+    answered at once with a CIRCUIT_OPEN_ERROR response (RATE_LIMITED_ERROR
+    when the host's next slot is more than FETCH_MAX_WAIT_SECONDS away).
+    """
+    feed_requests = list(feed_requests)
+    if not feed_requests:
+        return
+
+    host_slots = {}
+    for feed_request in feed_requests:
+        host = urlparse(feed_request.url).netloc
+        host_slots.setdefault(host, threading.BoundedSemaphore(per_host_limit))
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(feed_requests))) as pool:
+        futures = [
+            pool.submit(_fetch_one, feed_request, host_slots, per_host_limit, timeout, health)
+            for feed_request in feed_requests
+        ]
+        for future in as_completed(futures):
+            response = future.result()
+            if response.error == CIRCUIT_OPEN_ERROR:
+                outcome = 'circuit_open'
+            elif response.error == RATE_LIMITED_ERROR:
+                outcome = 'rate_limited'
+            else:
+                outcome = 'error' if response.error else 'not_modified' if response.status == 304 else 'ok'
+            FEED_FETCH_SECONDS.labels(urlparse(response.url).netloc, outcome).observe(response.elapsed)
+            yield response
@@ -0,0 +1,233 @@
+# collectors/near_duplicates.py
+
+import hashlib
+import html
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.db_connector import iter_recent_fingerprints
+from collectors.normalize import utcnow
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# Two stories are the same cluster when the estimated Jaccard similarity of
+# their word sets reaches this; the LSH bands below are tuned to it
+NEAR_DUP_THRESHOLD = float(os.getenv('NEAR_DUP_THRESHOLD', '0.5'))
+NEAR_DUP_WINDOW_DAYS = int(os.getenv('NEAR_DUP_WINDOW_DAYS', '14'))  # Articles kept in the index (by publication date)
+NEAR_DUP_PRUNE_SECONDS = float(os.getenv('NEAR_DUP_PRUNE_SECONDS', '3600'))  # Eviction interval for the window
+
+# 64 MinHash values split into 16 bands of 4: pairs at Jaccard 0.5 share a band
+# ~64% of the time, at 0.8 ~100%, at 0.2 ~3% (candidates are then verified)
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+# Hash family h(x) = (a*x + b) mod p; values fit a Postgres INTEGER.
+# Derived from fixed seeds, never change them: stored signatures depend on it.
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def _hash32(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+PERMUTATIONS = [
+    (_hash32(f"minhash-a-{i}") % (MERSENNE_PRIME - 1) + 1, _hash32(f"minhash-b-{i}") % MERSENNE_PRIME)
+    for i in range(MINHASH_PERMUTATIONS)
+]
+
+TAG = re.compile(r'<font[^>]*>.*?</font>|<[^>]+>')  # Google News summaries end with <font>Publisher</font>
+URL = re.compile(r'https?://\S+')
+TOKEN = re.compile(r'\w+')
+NITTER_PREFIX = re.compile(r'^\[[^\]]+\]\s*')         # "[cenbank] ..." titles from parse_nitter_entries
+PUBLISHER_SUFFIX = re.compile(r'\s+-\s+[^-]{1,60}$')  # "Headline - Punch Newspapers" from Google News
+STOPWORDS = frozenset(
+    "a an and are as at be been by for from has have in into is it its of on or over that the this "
+    "to was were will with new says said".split()
+)
+
+
+def shingles(title, content):
+    """Distinct content words of an article, with markup, links and source decoration removed."""
+    title = PUBLISHER_SUFFIX.sub('', NITTER_PREFIX.sub('', title or '')).rstrip('. ')
+    text = f"{title} {TAG.sub(' ', html.unescape(content or ''))}"
+    return {word for word in TOKEN.findall(URL.sub(' ', text).lower()) if word not in STOPWORDS}
+
+
+def minhash_signature(words):
+    """MINHASH_PERMUTATIONS minimum hash values over a word set (None if it is empty)."""
+    if not words:
+        return None
+    values = [_hash32(word) for word in words]
+    return [min((a * value + b) % MERSENNE_PRIME for value in values) for a, b in PERMUTATIONS]
+
+
+def estimated_similarity(signature, other) -> float:
+    """Fraction of agreeing MinHash values, an unbiased estimate of Jaccard similarity."""
+    return sum(x == y for x, y in zip(signature, other)) / len(signature)
+
+
+def cluster_key(url) -> int:
+    """Stable signed 64-bit id for a cluster, derived from its representative's URL."""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+
+
+class MinHashIndex:
+    """Banded LSH index over MinHash signatures.
+
+    Each signature is cut into LSH_BANDS bands of LSH_ROWS values and
+    bucketed per band. A lookup only compares against the signatures sharing
+    at least one bucket, so its cost tracks the number of similar stories
+    rather than the size of the index. Entries carry their publication date
+    so prune() can evict those that fell out of the clustering window.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD):
+        self.threshold = threshold
+        self._buckets = [{} for _ in range(LSH_BANDS)]  # band values -> [(signature, cluster_id, published_at)]
+        self.size = 0
+
+    @staticmethod
+    def _bands(signature):
+        return [tuple(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]) for band in range(LSH_BANDS)]
+
+    def find(self, signature):
+        """Returns the cluster_id of the most similar indexed signature above the threshold, or None."""
+        best = None
+        seen = set()
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            for candidate, cluster_id, _ in buckets.get(band, ()):
+                if id(candidate) in seen:
+                    continue
+                seen.add(id(candidate))
+                similarity = estimated_similarity(signature, candidate)
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, cluster_id)
+        return best[1] if best else None
+
+    def add(self, signature, cluster_id, published_at=None):
+        """Indexes a signature; entries without a date are never pruned."""
+        entry = (signature, cluster_id, published_at)
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            buckets.setdefault(band, []).append(entry)
+        self.size += 1
+
+    def prune(self, cutoff) -> int:
+        """Drops the entries published before `cutoff`; returns how many were dropped."""
+        removed = 0
+        for band_number, buckets in enumerate(self._buckets):
+            for band in list(buckets):
+                kept = [entry for entry in buckets[band] if entry[2] is None or entry[2] >= cutoff]
+                if band_number == 0:
+                    removed += len(buckets[band]) - len(kept)  # Every entry sits in exactly one bucket per band
+                if kept:
+                    buckets[band] = kept
+                else:
+                    del buckets[band]
+        self.size -= removed
+        return removed
+
+
+class StoryClusterer:
+    """Assigns ingested articles to near-duplicate clusters.
+
+    An article that matches nothing starts a cluster (keyed by its URL) and
+    is flagged as the representative; later near-duplicates, from the index
+    or from earlier in the same batch, join that cluster. Articles are added
+    to the index only once they have been inserted. In long-lived processes
+    (API, workers) entries published more than `window_days` ago are evicted
+    every NEAR_DUP_PRUNE_SECONDS, so the index stays the size warm() loads.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, window_days: int = NEAR_DUP_WINDOW_DAYS,
+                 prune_seconds: float = NEAR_DUP_PRUNE_SECONDS):
+        self.threshold = threshold
+        self.window = timedelta(days=window_days)
+        self.prune_seconds = prune_seconds
+        self._index = MinHashIndex(threshold)
+        self._pruned_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def warm(self, conn):
+        """Loads the fingerprints of articles published within the window."""
+        index = MinHashIndex(self.threshold)
+        for signature, cluster_id, published_at in iter_recent_fingerprints(conn, utcnow() - self.window):
+            index.add(signature, cluster_id, published_at)
+        with self._lock:
+            self._index = index
+            self._pruned_at = time.monotonic()
+        logger.info("Near-duplicate index warmed with %d fingerprints (%d days)", index.size, self.window.days)
+
+    def _prune_if_due(self):
+        # Called with the lock held
+        if time.monotonic() - self._pruned_at < self.prune_seconds:
+            return
+        removed = self._index.prune(utcnow() - self.window)
+        self._pruned_at = time.monotonic()
+        if removed:
+            logger.info("Near-duplicate index: evicted %d fingerprints older than %d days (%d left)",
+                        removed, self.window.days, self._index.size)
+
+    def assign(self, articles):
+        """Sets minhash, cluster_id and is_representative on each Article; returns (articles, duplicate_count).
+
+        Articles without any words are left unclustered.
+        """
+        batch_index = MinHashIndex(self.threshold)
+        duplicates = 0
+        with self._lock:
+            self._prune_if_due()
+            for article in articles:
+                signature = minhash_signature(shingles(article.title, article.content))
+                article.minhash = signature
+                if signature is None:
+                    article.cluster_id, article.is_representative = None, True
+                    continue
+                cluster_id = self._index.find(signature)
+                if cluster_id is None:
+                    cluster_id = batch_index.find(signature)
+                is_representative = cluster_id is None
+                if is_representative:
+                    cluster_id = cluster_key(article.source_url)
+                else:
+                    duplicates += 1
+                batch_index.add(signature, cluster_id)
+                article.cluster_id, article.is_representative = cluster_id, is_representative
+        return articles, duplicates
+
+    def add(self, articles):
+        """Indexes clustered articles (from assign()) that were stored."""
+        with self._lock:
+            for article in articles:
+                if article.minhash is not None:
+                    # Stored undated articles get the insert time (COALESCE in the INSERT)
+                    self._index.add(article.minhash, article.cluster_id, article.publication_date or utcnow())
+
+
+_clusterer = None
+_clusterer_lock = threading.Lock()
+
+
+def get_clusterer(conn):
+    """Returns the process-wide clusterer, warming it from news_article on first use."""
+    global _clusterer
+    with _clusterer_lock:
+        if _clusterer is not None:
+            return _clusterer
+
+        clusterer = StoryClusterer()
+        try:
+            clusterer.warm(conn)
+            _clusterer = clusterer
+        except Exception as e:
+            # An empty index only means fewer duplicates are caught; retry next run
+            logger.error("Error warming near-duplicate index: %s", e)
+            conn.rollback()
+        return clusterer
@@ -0,0 +1,182 @@
+# collectors/normalize.py
+"""
+Date and URL normalization shared by the feed parsers.
+
+normalize_date() turns whatever a feed carries (feedparser struct_time,
+RFC-822 strings as RSS uses them, ISO 8601 strings, datetimes) into a naive
+UTC datetime, the form publication dates are stored in. String parsing is
+cached: a feed is re-read every run and its entries repeat the same few
+timestamps.
+
+canonical_url() gives the same story the same URL however it was linked:
+tracking parameters and fragments are dropped, scheme and host lowercased
+and Google redirect links unwrapped, so the seen-URL filter and the
+article_url registry catch more duplicates.
+"""
+
+import base64
+import binascii
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, unquote_plus
+
+# --- CONFIGURATION ---
+NORMALIZE_CACHE_SIZE = int(os.getenv('NORMALIZE_CACHE_SIZE', '8192'))  # Distinct dates/URLs kept per process
+
+# Query parameters that only track the click, never select the content
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', '_ga', '_gl', 'ocid', 'cmpid', 'ref_src',
+})
+TRACKING_PREFIXES = ('utm_',)
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+GOOGLE_REDIRECT_HOSTS = {'google.com', 'www.google.com'}
+GOOGLE_NEWS_HOST = 'news.google.com'
+# Prefix of the protobuf wrapped in older Google News article ids; newer ids
+# are opaque and only resolvable through Google, so they are kept as they are
+GOOGLE_NEWS_ID_PREFIX = b'\x08\x13\x22'
+
+
+def normalize_date(value, default=None):
+    """A naive UTC datetime from a struct_time, datetime, RFC-822 or ISO string; `default` if unparseable."""
+    if value is None:
+        return default
+    if isinstance(value, time.struct_time):
+        return datetime(*value[:6])  # feedparser's *_parsed fields are already UTC
+    if isinstance(value, datetime):
+        return _to_naive_utc(value)
+    if isinstance(value, str):
+        parsed = _parse_date_string(value.strip())
+        return parsed if parsed is not None else default
+    return default
+
+
+def utcnow() -> datetime:
+    """The current time as a naive UTC datetime, like every date normalize_date() returns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def entry_date(entry, default=None):
+    """Publication date of a feedparser entry (published, then updated), normalized."""
+    for key in ('published_parsed', 'updated_parsed', 'published', 'updated'):
+        value = entry.get(key)
+        if value:
+            parsed = normalize_date(value)
+            if parsed is not None:
+                return parsed
+    return default
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _parse_date_string(value: str):
+    if not value:
+        return None
+    try:
+        return _to_naive_utc(datetime.fromisoformat(value))
+    except ValueError:
+        pass
+    try:
+        return _to_naive_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def canonical_url(url):
+    """The canonical form of an article URL (anything that isn't http(s) is returned unchanged)."""
+    if not url:
+        return url
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port  # Raises on a malformed or out-of-range port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url
+
+    host = (parts.hostname or '').rstrip('.')
+    target = _unwrap_redirect(host, parts)
+    if target and target != url:
+        return canonical_url(target)
+
+    netloc = host
+    if port is not None and str(port) != DEFAULT_PORTS[scheme]:
+        netloc = f"{host}:{port}"
+    if parts.username:
+        netloc = f"{parts.username}{':' + parts.password if parts.password else ''}@{netloc}"
+
+    # Parameters are dropped as raw "key=value" segments: the kept ones are
+    # never re-encoded, so a link canonicalizes the same with or without trackers
+    query = '&'.join(
+        segment for segment in parts.query.split('&')
+        if segment and not _is_tracking(unquote_plus(segment.split('=', 1)[0]))
+    )
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+def _is_tracking(key: str) -> bool:
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def _unwrap_redirect(host, parts):
+    """The destination of a Google redirect link, or None."""
+    if host in GOOGLE_REDIRECT_HOSTS and parts.path == '/url':
+        params = dict(parse_qsl(parts.query))
+        target = params.get('url') or params.get('q')
+        return target if target and target.startswith(('http://', 'https://')) else None
+    if host == GOOGLE_NEWS_HOST:
+        segments = parts.path.rstrip('/').split('/')
+        if len(segments) >= 3 and segments[-2] == 'articles':
+            return decode_google_news_id(segments[-1])
+    return None
+
+
+def decode_google_news_id(article_id: str):
+    """Publisher URL embedded in a (legacy) Google News article id, or None."""
+    try:
+        data = base64.urlsafe_b64decode(article_id + '=' * (-len(article_id) % 4))
+    except (binascii.Error, ValueError):
+        return None
+    if not data.startswith(GOOGLE_NEWS_ID_PREFIX):
+        return None
+
+    # Protobuf varint length, then the URL itself
+    position, length, shift = len(GOOGLE_NEWS_ID_PREFIX), 0, 0
+    while position < len(data):
+        byte = data[position]
+        position += 1
+        length |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            break
+    raw = data[position:position + length]
+    if len(raw) != length or not raw.startswith((b'http://', b'https://')):
+        return None
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+
+def canonical_tweet_url(url):
+    """A Nitter status link as its x.com URL, so every mirror yields the same URL for a tweet."""
+    url = canonical_url(url)
+    try:
+        parts = urlsplit(url)
+    except (TypeError, ValueError):
+        return url
+    segments = parts.path.strip('/').split('/')
+    if len(segments) >= 3 and segments[1] == 'status' and segments[2].isdigit():
+        return f"https://x.com/{segments[0]}/status/{segments[2]}"
+    return url
@@ -0,0 +1,191 @@
+# collectors/relevance.py
+
+import os
+import re
+from collections import namedtuple
+
+# --- CONFIGURATION ---
+# Optional keyword list: one "term<TAB or comma>weight" per line, '#' starts a comment.
+# A trailing "*" matches any word starting with the term ("fraud*" matches
+# "fraudulent"); a third column "entity" marks names (regulators) that don't
+# count as a topic on their own. Replaces the built-in list below when set.
+RELEVANCE_KEYWORDS_FILE = os.getenv('RELEVANCE_KEYWORDS_FILE')
+RELEVANCE_MIN_SCORE = float(os.getenv('RELEVANCE_MIN_SCORE', '1'))  # Social posts below this are dropped
+
+# Built-in keyword weights: regulators and named instruments outrank generic terms.
+# Regulators are entities: a post only passes the social filter with a topical term too.
+REGULATOR_KEYWORDS = {
+    'central bank of nigeria': 3.0,
+    'cbn': 3.0,
+    'securities and exchange commission': 3.0,
+    'sec nigeria': 3.0,
+    'ndic': 3.0,
+    'nigeria deposit insurance corporation': 3.0,
+    'naicom': 3.0,
+    'national insurance commission': 3.0,
+    'firs': 3.0,
+    'federal inland revenue service': 3.0,
+    'fccpc': 3.0,
+    'pencom': 3.0,
+}
+TOPIC_KEYWORDS = {
+    # Instruments
+    'circular': 2.0,
+    'directive': 2.0,
+    'guideline': 2.0,
+    'framework': 1.5,
+    'exposure draft': 2.0,
+    'regulation': 2.0,
+    'licensing': 2.0,
+    'licence': 1.5,
+    'license': 1.5,
+    'enforcement': 2.0,
+    'sanction*': 2.0,
+    'penalty': 1.5,
+    # Topics
+    'policy': 1.0,
+    'fintech': 1.0,
+    'fraud*': 1.0,
+    'tax*': 1.0,
+    'aml': 1.5,
+    'kyc': 1.5,
+    'open banking': 1.5,
+    'payment service bank': 1.5,
+}
+DEFAULT_KEYWORDS = {**REGULATOR_KEYWORDS, **TOPIC_KEYWORDS}
+DEFAULT_ENTITIES = frozenset(REGULATOR_KEYWORDS)
+
+# Outcome of scoring one entry; `terms` are the distinct keywords found, in
+# first-seen order, and `topical` is False when every term found is an entity
+RelevanceMatch = namedtuple('RelevanceMatch', ['score', 'terms', 'topical'])
+
+
+def load_keywords(path):
+    """Reads a keyword file into ({term: weight}, entity terms); a missing weight counts as 1."""
+    keywords, entities = {}, set()
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            separator = ',' if ',' in line else '\t'
+            head, _, kind = line.rpartition(separator)
+            is_entity = bool(head) and kind.strip().lower() == 'entity'
+            if is_entity:
+                line = head.strip()
+            term, _, weight = line.rpartition(separator)
+            if not term:
+                term, weight = weight, ''
+            keywords[term.strip()] = float(weight.strip() or 1)
+            if is_entity:
+                entities.add(term.strip())
+    return keywords, entities
+
+
+TOKEN = re.compile(r'\w+')
+
+
+class RelevanceMatcher:
+    """Scores text against a weighted keyword set in a single pass.
+
+    Keywords are compiled once into an index keyed by their first word, so
+    text is tokenized once and each token costs one dict lookup however
+    many keywords there are (a word-level Aho-Corasick without the failure
+    links, which phrases this short don't need). Matching ignores case,
+    punctuation and spacing ("CBN/BSD/DIR" matches "cbn bsd dir") and
+    accepts a plural suffix on the last word of a term. Terms ending in "*"
+    match any word starting with their last word; single-word ones are kept
+    in a separate index keyed by the shortest prefix length, so each token
+    costs one more lookup however many prefix terms there are.
+
+    `entities` are terms (regulator names) that score but don't make a
+    match topical on their own.
+    """
+
+    def __init__(self, keywords, entities=()):
+        self.weights = {}
+        self.entities = set()
+        self._index = {}     # first word -> [(words, term, last word is a prefix)], longest phrase first
+        prefixes = {}        # single-word prefix -> term
+        entities = {' '.join(TOKEN.findall(term.lower())) for term in entities}
+        for term, weight in keywords.items():
+            is_prefix = term.rstrip().endswith('*')
+            words = tuple(TOKEN.findall(term.lower()))
+            if not words:
+                continue
+            term = ' '.join(words)
+            self.weights[term] = float(weight)
+            if term in entities:
+                self.entities.add(term)
+            if is_prefix and len(words) == 1:
+                prefixes[words[0]] = term
+                continue
+            for variant_last in self._variants(words[-1]) if not is_prefix else (words[-1],):
+                variant = words[:-1] + (variant_last,)
+                self._index.setdefault(variant[0], []).append((variant, term, is_prefix))
+        for candidates in self._index.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+        self._head_length = min(map(len, prefixes), default=0)
+        self._prefix_heads = {}  # first _head_length characters -> [(prefix, term)], longest first
+        for prefix, term in sorted(prefixes.items(), key=lambda item: len(item[0]), reverse=True):
+            self._prefix_heads.setdefault(prefix[:self._head_length], []).append((prefix, term))
+
+    @staticmethod
+    def _variants(word):
+        """The word and its plurals ("circulars", "taxes", "penalties")."""
+        variants = [word, word + 's', word + 'es']
+        if word.endswith('y') and len(word) > 2:
+            variants.append(word[:-1] + 'ies')
+        return variants
+
+    @staticmethod
+    def _match_phrase(tokens, position, candidates):
+        for words, term, is_prefix in candidates:
+            if len(words) == 1:
+                return term
+            window = tuple(tokens[position:position + len(words)])
+            if window == words:
+                return term
+            if (is_prefix and len(window) == len(words) and window[:-1] == words[:-1]
+                    and window[-1].startswith(words[-1])):
+                return term
+        return None
+
+    def match(self, *texts) -> RelevanceMatch:
+        """Returns the summed weight of the distinct keywords found in `texts`."""
+        terms = {}
+        index, prefix_heads, head_length = self._index, self._prefix_heads, self._head_length
+        for text in texts:
+            if not text:
+                continue
+            tokens = TOKEN.findall(text.lower())
+            for position, token in enumerate(tokens):
+                candidates = index.get(token)
+                heads = prefix_heads.get(token[:head_length]) if prefix_heads else None
+                if candidates is None and heads is None:
+                    continue
+                term = self._match_phrase(tokens, position, candidates) if candidates else None
+                if term is None and heads:
+                    for prefix, prefix_term in heads:
+                        if token.startswith(prefix):
+                            term = prefix_term
+                            break
+                if term is not None and term not in terms:
+                    terms[term] = self.weights[term]
+        topical = any(term not in self.entities for term in terms)
+        return RelevanceMatch(round(sum(terms.values()), 3), list(terms), topical)
+
+
+_matcher = None
+
+
+def get_matcher() -> RelevanceMatcher:
+    """Process-wide matcher, compiled on first use."""
+    global _matcher
+    if _matcher is None:
+        if RELEVANCE_KEYWORDS_FILE:
+            keywords, entities = load_keywords(RELEVANCE_KEYWORDS_FILE)
+        else:
+            keywords, entities = DEFAULT_KEYWORDS, DEFAULT_ENTITIES
+        _matcher = RelevanceMatcher(keywords, entities)
+    return _matcher
@@ -0,0 +1,127 @@
+# collectors/seen_urls.py
+
+import hashlib
+import logging
+import math
+import os
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.db_connector import count_articles, iter_source_urls, fetch_existing_urls
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# Expected number of stored URLs and acceptable false-positive rate; together
+# they fix the filter's memory (about 1.8 bytes per URL at 0.1%)
+SEEN_FILTER_CAPACITY = int(os.getenv('SEEN_FILTER_CAPACITY', '200000'))
+SEEN_FILTER_FP_RATE = float(os.getenv('SEEN_FILTER_FP_RATE', '0.001'))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)."""
+
+    def __init__(self, capacity: int, fp_rate: float):
+        capacity = max(capacity, 1)
+        self.num_bits = max(8, math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+
+class SeenUrlFilter:
+    """Drops already-stored articles before they reach the insert path.
+
+    A Bloom filter miss means the URL is certainly new, so it goes straight to
+    insert_articles(). A hit means "probably stored": those URLs are confirmed
+    with a single batched lookup, so a false positive never drops a new
+    article. URLs are added to the filter as they are inserted.
+    """
+
+    def __init__(self, capacity: int = SEEN_FILTER_CAPACITY, fp_rate: float = SEEN_FILTER_FP_RATE):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self._bloom = BloomFilter(capacity, fp_rate)
+        self._lock = threading.Lock()
+        self.warmed = False
+
+    def warm(self, conn):
+        """Loads every stored source_url; the filter is resized to fit the table."""
+        stored = count_articles(conn)
+        bloom = BloomFilter(max(self.capacity, stored * 2), self.fp_rate)
+        loaded = 0
+        for url in iter_source_urls(conn):
+            bloom.add(url)
+            loaded += 1
+        with self._lock:
+            self._bloom = bloom
+            self.warmed = True
+        logger.info("Seen-URL filter warmed with %d URLs (%.0f KiB, %d hashes)",
+                    loaded, bloom.memory_bytes / 1024, bloom.num_hashes)
+
+    def add(self, urls):
+        with self._lock:
+            for url in urls:
+                self._bloom.add(url)
+
+    def filter_new(self, conn, articles):
+        """Returns (new_articles, known_count, duplicate_count) for a list of Article records.
+
+        A URL repeated within the batch (the same story returned by several
+        queries in one run) is kept once and counted in duplicate_count, not
+        as known: only URLs already stored count as known.
+        """
+        unique = {}
+        for article in articles:
+            unique.setdefault(article.source_url, article)
+        duplicate_count = len(articles) - len(unique)
+
+        certainly_new, maybe_known = [], []
+        for url, article in unique.items():
+            (maybe_known if url in self._bloom else certainly_new).append(article)
+
+        # Exact check for the filter's positives, in one round trip
+        existing = fetch_existing_urls(conn, [article.source_url for article in maybe_known])
+        false_positives = [article for article in maybe_known if article.source_url not in existing]
+        known_count = len(maybe_known) - len(false_positives)
+        return certainly_new + false_positives, known_count, duplicate_count
+
+
+_seen_filter = None
+_seen_filter_lock = threading.Lock()
+
+
+def get_seen_filter(conn):
+    """Returns the process-wide filter, warming it from news_article on first use."""
+    global _seen_filter
+    with _seen_filter_lock:
+        if _seen_filter is not None:
+            return _seen_filter
+
+        seen_filter = SeenUrlFilter()
+        try:
+            seen_filter.warm(conn)
+            _seen_filter = seen_filter
+        except Exception as e:
+            # An empty filter is still correct (everything goes to the insert); retry next run
+            logger.error("Error warming seen-URL filter: %s", e)
+            conn.rollback()
+        return seen_filter
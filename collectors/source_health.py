@@ -0,0 +1,252 @@
+# collectors/source_health.py
+"""
+Per-host rate limiting and circuit breaking for feed downloads.
+
+Every feed host gets a token bucket and a circuit breaker (HostHealth):
+
+- The bucket starts at FETCH_RATE_PER_HOST requests/second and adapts (AIMD):
+  each success adds FETCH_RATE_STEP, each throttling answer (429/503) halves
+  the rate and honours Retry-After. A request that would have to wait more
+  than FETCH_MAX_WAIT_SECONDS for its slot is refused (RATE_LIMITED_ERROR)
+  rather than holding a fetch worker; the caller skips or defers the feed.
+- The breaker opens after BREAKER_FAILURE_THRESHOLD consecutive failures
+  (network errors, timeouts, 5xx, 403/429). While open, requests to the host
+  fail at once instead of waiting for a timeout. After the open period one
+  probe request is let through (half-open); success closes the breaker,
+  failure reopens it for twice as long (up to BREAKER_MAX_OPEN_SECONDS).
+
+State lives in a process-wide SourceHealth and is persisted in the
+`source_health` table, so the next run (or another worker process) starts
+from what this one learned. pick() spreads requests over mirror hosts (the
+Nitter instances) by observed latency, skipping hosts whose breaker is open.
+"""
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.db_connector import fetch_source_health, save_source_health
+from utils.metrics import CIRCUIT_OPEN
+from collectors.normalize import utcnow
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+FETCH_RATE_PER_HOST = float(os.getenv('FETCH_RATE_PER_HOST', '2'))       # Initial requests/second per host
+FETCH_RATE_BURST = float(os.getenv('FETCH_RATE_BURST', '4'))             # Requests a rested host may receive at once
+FETCH_RATE_MIN = float(os.getenv('FETCH_RATE_MIN', '0.05'))              # Floor after repeated throttling (1 per 20s)
+FETCH_RATE_MAX = float(os.getenv('FETCH_RATE_MAX', '10'))
+FETCH_RATE_STEP = float(os.getenv('FETCH_RATE_STEP', '0.1'))            # Added to the rate per successful request
+FETCH_MAX_WAIT_SECONDS = float(os.getenv('FETCH_MAX_WAIT_SECONDS', '60'))  # Longer waits (e.g. Retry-After) skip the feed
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '3'))
+BREAKER_OPEN_SECONDS = float(os.getenv('BREAKER_OPEN_SECONDS', '300'))   # First open period, doubled per failed probe
+BREAKER_MAX_OPEN_SECONDS = float(os.getenv('BREAKER_MAX_OPEN_SECONDS', '21600'))
+LATENCY_SMOOTHING = 0.3  # Weight of the newest sample in the latency moving average
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+CIRCUIT_OPEN_ERROR = "circuit open"
+RATE_LIMITED_ERROR = "rate limited"
+
+# Outcome of HostHealth.reserve(): sleep `wait` seconds and send, unless `error` is set
+Reservation = namedtuple('Reservation', ['wait', 'error'])
+
+THROTTLE_STATUSES = {429, 503}
+
+
+def is_failure(status, error) -> bool:
+    """Whether a response counts against the host's breaker (the host is down or refusing us)."""
+    if status is None:
+        return bool(error)
+    return status >= 500 or status in (403, 429)
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostHealth:
+    """Token bucket, circuit breaker and latency average of one host (thread-safe)."""
+
+    def __init__(self, host, rate=FETCH_RATE_PER_HOST, state=CLOSED, failures=0, opened_until=None,
+                 open_seconds=BREAKER_OPEN_SECONDS, latency_ms=None, last_error=None):
+        self.host = host
+        self.rate = rate
+        self.state = state
+        self.failures = failures
+        self.opened_until = opened_until
+        self.open_seconds = open_seconds
+        self.latency_ms = latency_ms
+        self.last_error = last_error
+        self.dirty = False
+        self._tokens = FETCH_RATE_BURST
+        self._refilled = time.monotonic()
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def available(self, now: datetime) -> bool:
+        """True unless the breaker is open and its open period hasn't run out."""
+        return self.state != OPEN or self.opened_until is None or now >= self.opened_until
+
+    def reserve(self, max_wait: float = FETCH_MAX_WAIT_SECONDS) -> Reservation:
+        """Takes a request slot unless the breaker is open or the slot is more than `max_wait` seconds away."""
+        with self._lock:
+            if self.state == OPEN:
+                if not self.available(utcnow()):
+                    return Reservation(None, CIRCUIT_OPEN_ERROR)
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and self._probing:
+                # One probe at a time; the others fail fast until it reports back
+                return Reservation(None, CIRCUIT_OPEN_ERROR)
+
+            self._refill()
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                # Nothing is taken, so the refused request doesn't push later ones back further
+                return Reservation(wait, RATE_LIMITED_ERROR)
+            if self.state == HALF_OPEN:
+                self._probing = True
+            self._tokens -= 1
+            return Reservation(wait, None)
+
+    def wait_seconds(self) -> float:
+        """Seconds until the bucket has a request slot (without taking it)."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(FETCH_RATE_BURST, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def record(self, status, error, elapsed: float, retry_after=None):
+        """Feeds one response (or network error) back into the bucket and the breaker."""
+        with self._lock:
+            self._probing = False
+            self.dirty = True
+            if status in THROTTLE_STATUSES:
+                self.rate = max(FETCH_RATE_MIN, self.rate / 2)
+                if retry_after:
+                    # Nothing more for this host until Retry-After has passed
+                    self._tokens = min(self._tokens, -retry_after * self.rate)
+            if is_failure(status, error):
+                self.failures += 1
+                self.last_error = error or f"HTTP {status}"
+                if self.state == HALF_OPEN:
+                    self.open_seconds = min(BREAKER_MAX_OPEN_SECONDS, self.open_seconds * 2)
+                    self._open(retry_after)
+                elif self.state == CLOSED and self.failures >= BREAKER_FAILURE_THRESHOLD:
+                    self._open(retry_after)
+                return
+
+            self.rate = min(FETCH_RATE_MAX, self.rate + FETCH_RATE_STEP)
+            latency_ms = elapsed * 1000
+            self.latency_ms = latency_ms if self.latency_ms is None else (
+                LATENCY_SMOOTHING * latency_ms + (1 - LATENCY_SMOOTHING) * self.latency_ms)
+            self.failures = 0
+            if self.state != CLOSED:
+                logger.info("Circuit for %s closed again", self.host)
+                self.open_seconds = BREAKER_OPEN_SECONDS
+                self._set_state(CLOSED)
+
+    def _open(self, retry_after=None):
+        open_for = max(self.open_seconds, retry_after or 0)
+        self.opened_until = utcnow() + timedelta(seconds=open_for)
+        self._set_state(OPEN)
+        logger.warning("Circuit for %s opened for %.0fs after %d consecutive failures (last: %s)",
+                       self.host, open_for, self.failures, self.last_error,
+                       extra={'host': self.host, 'failures': self.failures})
+
+    def _set_state(self, state):
+        self.state = state
+        CIRCUIT_OPEN.labels(self.host).set(0 if state == CLOSED else 1)
+
+    def row(self):
+        """(host, state, consecutive_failures, opened_until, open_seconds, rate_per_second, latency_ms, last_error)."""
+        with self._lock:
+            return (self.host, self.state, self.failures, self.opened_until, self.open_seconds,
+                    self.rate, self.latency_ms, self.last_error)
+
+
+class SourceHealth:
+    """Process-wide HostHealth registry, loaded from and saved to `source_health`."""
+
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host(self, host: str) -> HostHealth:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostHealth(host)
+            return self._hosts[host]
+
+    def load(self, conn):
+        """Replaces the in-memory state with the persisted one (other processes may have updated it)."""
+        stored = fetch_source_health(conn)
+        with self._lock:
+            for host, row in stored.items():
+                state, failures, opened_until, open_seconds, rate, latency_ms, last_error = row
+                health = HostHealth(host, rate, state, failures, opened_until, open_seconds, latency_ms, last_error)
+                if state != CLOSED:
+                    CIRCUIT_OPEN.labels(host).set(1)
+                self._hosts[host] = health
+
+    def save(self, conn):
+        """Persists the hosts that saw traffic since the last load/save (commits)."""
+        with self._lock:
+            changed = [health for health in self._hosts.values() if health.dirty]
+        if changed:
+            save_source_health(conn, [health.row() for health in changed])
+            for health in changed:
+                health.dirty = False
+
+    def reserve(self, url: str, max_wait: float = FETCH_MAX_WAIT_SECONDS) -> Reservation:
+        return self.host(urlparse(url).netloc).reserve(max_wait)
+
+    def record(self, url: str, status, error, elapsed: float, retry_after=None):
+        self.host(urlparse(url).netloc).record(status, error, elapsed, retry_after)
+
+    def pick(self, base_urls, exclude=()):
+        """One of `base_urls` (mirrors of the same source), weighted by inverse latency.
+
+        Hosts with an open breaker and `exclude`d URLs are skipped; None if
+        nothing is left. Hosts without a latency sample yet get the average
+        weight, so new mirrors are tried too.
+        """
+        now = utcnow()
+        candidates = [url for url in base_urls
+                      if url not in exclude and self.host(urlparse(url).netloc).available(now)]
+        if not candidates:
+            return None
+        latencies = [self.host(urlparse(url).netloc).latency_ms for url in candidates]
+        known = [latency for latency in latencies if latency]
+        default = sum(known) / len(known) if known else 1000.0
+        weights = [1.0 / (latency or default) for latency in latencies]
+        return random.choices(candidates, weights=weights)[0]
+
+
+_source_health = SourceHealth()
+
+
+def get_source_health() -> SourceHealth:
+    return _source_health
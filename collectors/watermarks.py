@@ -0,0 +1,85 @@
+# collectors/watermarks.py
+
+import os
+import sys
+from datetime import timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.db_connector import fetch_watermarks, save_watermarks
+
+# --- CONFIGURATION ---
+# Entries up to this much older than the watermark are still processed, to
+# pick up late edits and feeds that publish slightly out of order
+WATERMARK_OVERLAP = timedelta(hours=float(os.getenv('WATERMARK_OVERLAP_HOURS', '6')))
+
+# Newest-first feeds stop being read after this many consecutive old entries
+# (more than one, so a pinned old tweet at the top doesn't end the scan)
+WATERMARK_STOP_AFTER = int(os.getenv('WATERMARK_STOP_AFTER', '3'))
+
+
+class SourceWatermark:
+    """High-water mark of one source (a search query or a Nitter handle)."""
+
+    def __init__(self, source_key, last_published_at=None, last_url=None, overlap=WATERMARK_OVERLAP):
+        self.source_key = source_key
+        self.cutoff = last_published_at - overlap if last_published_at else None
+        self.last_published_at = last_published_at
+        self.last_url = last_url
+        self.advanced = False
+        self.skipped = 0
+        self._consecutive_old = 0
+
+    def is_new(self, pub_date, url) -> bool:
+        """Records the entry and says whether it is newer than the watermark (minus overlap).
+
+        Undated entries are always processed.
+        """
+        if pub_date is None:
+            return True
+        if self.last_published_at is None or pub_date > self.last_published_at:
+            self.last_published_at, self.last_url = pub_date, url
+            self.advanced = True
+        if self.cutoff is None or pub_date > self.cutoff:
+            self._consecutive_old = 0
+            return True
+        self.skipped += 1
+        self._consecutive_old += 1
+        return False
+
+    @property
+    def reached(self) -> bool:
+        """True once a newest-first feed has clearly run into already-collected entries."""
+        return self._consecutive_old >= WATERMARK_STOP_AFTER
+
+
+class WatermarkStore:
+    """Per-run view of the persisted watermarks, mirroring FeedCache."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._watermarks = {}
+
+    def load(self, source_keys):
+        stored = fetch_watermarks(self.conn, source_keys)
+        for source_key in source_keys:
+            self._watermarks[source_key] = SourceWatermark(source_key, *stored.get(source_key, (None, None)))
+
+    def get(self, source_key) -> SourceWatermark:
+        if source_key not in self._watermarks:
+            self._watermarks[source_key] = SourceWatermark(source_key)
+        return self._watermarks[source_key]
+
+    def discard(self, source_key):
+        """Leaves a source's watermark untouched (its feed failed to parse)."""
+        self._watermarks.pop(source_key, None)
+
+    def save(self):
+        """Stages advanced watermarks; committed together with the article insert."""
+        save_watermarks(self.conn, [
+            (watermark.source_key, watermark.last_published_at, watermark.last_url)
+            for watermark in self._watermarks.values() if watermark.advanced
+        ])
+
+    @property
+    def skipped(self) -> int:
+        return sum(watermark.skipped for watermark in self._watermarks.values())
@@ -0,0 +1,176 @@
+# database/async_connector.py
+"""
+asyncpg data access for the async API endpoints.
+
+Mirrors the read functions of db_connector (same SQL, same keyset paging)
+on an asyncpg pool of its own, so `async def` handlers never block the event
+loop or hold a threadpool worker while Postgres works. Rows come back as
+the same Article records the sync path returns, built positionally from
+asyncpg records.
+
+The schema is still migrated by the sync pool (db_connector.init_pool) at
+startup.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List
+
+import asyncpg
+
+from .db_connector import ARTICLE_COLUMNS
+from .records import Article
+from .instrumented_cursor import statement_type
+from .models import SELECT_INGEST_GENERATION_QUERY
+from utils.metrics import DB_QUERY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# --- ASYNC POOL CONFIGURATION ---
+ASYNC_POOL_MIN_SIZE = int(os.getenv('DB_ASYNC_POOL_MIN_SIZE', '2'))
+ASYNC_POOL_MAX_SIZE = int(os.getenv('DB_ASYNC_POOL_MAX_SIZE', '20'))
+ASYNC_POOL_ACQUIRE_TIMEOUT = float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', '10'))  # Same knob as the sync pool
+ASYNC_POOL_IDLE_TIMEOUT = float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))
+
+
+SELECT_ARTICLES = f"SELECT {', '.join(ARTICLE_COLUMNS)} FROM news_article"
+
+
+_pool = None
+# create_pool() awaits, so concurrent first requests would each build a pool
+_pool_lock = asyncio.Lock()
+
+
+async def init_async_pool():
+    """Creates the process-wide asyncpg pool (None, logged, if the database is unreachable)."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        if _pool is None:
+            database_url = os.getenv('DATABASE_URL')
+            if not database_url:
+                logger.error("DATABASE_URL environment variable not set!")
+                return None
+            try:
+                _pool = await asyncpg.create_pool(
+                    database_url,
+                    min_size=ASYNC_POOL_MIN_SIZE,
+                    max_size=ASYNC_POOL_MAX_SIZE,
+                    max_inactive_connection_lifetime=ASYNC_POOL_IDLE_TIMEOUT,
+                )
+                logger.info("Async connection pool ready (min=%d, max=%d)", ASYNC_POOL_MIN_SIZE, ASYNC_POOL_MAX_SIZE)
+            except (Exception, asyncpg.PostgresError) as error:
+                logger.error("Error creating async connection pool: %s", error)
+    return _pool
+
+
+async def close_async_pool():
+    """Closes the asyncpg pool (e.g. on application shutdown)."""
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
+
+
+@asynccontextmanager
+async def acquire_connection(timeout: float = ASYNC_POOL_ACQUIRE_TIMEOUT):
+    """Async counterpart of borrow_connection(); yields None when the database is unavailable."""
+    pool = await init_async_pool()
+    conn = None
+    if pool is not None:
+        try:
+            conn = await pool.acquire(timeout=timeout)
+        except (Exception, asyncpg.PostgresError) as error:
+            logger.error("Error acquiring async database connection: %s", error)
+    try:
+        yield conn
+    finally:
+        if conn is not None:
+            await pool.release(conn)
+
+
+async def _fetch(conn, query: str, *args):
+    """conn.fetch() timed in DB_QUERY_SECONDS like the sync cursors."""
+    started = time.perf_counter()
+    try:
+        return await conn.fetch(query, *args)
+    finally:
+        DB_QUERY_SECONDS.labels(statement_type(query)).observe(time.perf_counter() - started)
+
+
+async def fetch_ingest_generation(conn):
+    """Returns the ingest generation counter, or None if it can't be read."""
+    if conn is None:
+        return None
+    try:
+        rows = await _fetch(conn, SELECT_INGEST_GENERATION_QUERY)
+        return rows[0][0] if rows else None
+    except (Exception, asyncpg.PostgresError) as error:
+        logger.error("Error reading ingest generation: %s", error)
+        return None
+
+
+def _latest_news_query(start_date=None, category_filter=None, after=None, representatives_only=False, limit=20):
+    """SQL and $n arguments shared by the two listing functions."""
+    conditions = []
+    args = []
+
+    def param(value):
+        args.append(value)
+        return f"${len(args)}"
+
+    if start_date:
+        conditions.append(f"publication_date >= {param(start_date)}")
+    if category_filter:
+        conditions.append(f"source_category LIKE {param(f'{category_filter}%')}")
+    if representatives_only:
+        conditions.append("is_representative")
+    if after:
+        # The plain bound lets the planner skip newer partitions
+        bound = param(after[0])
+        conditions.append(f"publication_date <= {bound} AND (publication_date, id) < ({bound}, {param(after[1])})")
+
+    query = SELECT_ARTICLES
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY publication_date DESC, id DESC LIMIT {param(limit)}"
+    return query, args
+
+
+async def fetch_latest_news(conn, limit: int = 20, category_filter=None, after=None,
+                            representatives_only=False) -> List[Article]:
+    """Async db_connector.fetch_latest_news: one keyset page, newest first (None if the query fails)."""
+    if conn is None:
+        logger.error("No database connection provided to fetch_latest_news")
+        return []
+    query, args = _latest_news_query(category_filter=category_filter, after=after,
+                                     representatives_only=representatives_only, limit=limit)
+    try:
+        results = [Article.from_row(record) for record in await _fetch(conn, query, *args)]
+        logger.debug("Fetched %d articles from database", len(results))
+        return results
+    except (Exception, asyncpg.PostgresError) as error:
+        logger.error("Error fetching news: %s", error)
+        return None
+
+
+async def fetch_news_by_date_range(conn, start_date, limit: int = 50, after=None,
+                                   representatives_only=False) -> List[Article]:
+    """Async db_connector.fetch_news_by_date_range: articles published since `start_date` (None if the query fails)."""
+    if conn is None:
+        logger.error("No database connection provided to fetch_news_by_date_range")
+        return []
+    query, args = _latest_news_query(start_date=start_date, after=after,
+                                     representatives_only=representatives_only, limit=limit)
+    try:
+        results = [Article.from_row(record) for record in await _fetch(conn, query, *args)]
+        logger.debug("Fetched %d articles from %s onwards", len(results), start_date.strftime('%Y-%m-%d'))
+        return results
+    except (Exception, asyncpg.PostgresError) as error:
+        logger.error("Error fetching news: %s", error)
+        return None
@@ -2,101 +2,1230 @@
 
 import psycopg2.extras
 import psycopg2
+import json
+import logging
+import psycopg2.extensions
+import psycopg2.sql
 import os
+import threading
+import time
+from contextlib import contextmanager
+from psycopg2.pool import PoolError
 from urllib.parse import urlparse
-from .models import CREATE_TABLE_QUERY, INSERT_ARTICLE_QUERY
+from .migrations import apply_migrations
+from .pagination import encode_cursor
+from .instrumented_cursor import InstrumentedCursor, InstrumentedDictCursor
+from .records import Article
+from .models import (
+    INSERT_ARTICLE_QUERY, INSERT_ARTICLES_BATCH_QUERY, INSERT_ARTICLES_BATCH_TEMPLATE,
+    PROMOTE_CLUSTER_REPRESENTATIVES_QUERY,
+    SELECT_FEED_CACHE_QUERY, UPSERT_FEED_CACHE_QUERY,
+    COUNT_ARTICLES_QUERY, SELECT_SOURCE_URLS_QUERY, SELECT_EXISTING_URLS_QUERY, SELECT_RECENT_FINGERPRINTS_QUERY,
+    SELECT_INGEST_GENERATION_QUERY, BUMP_INGEST_GENERATION_QUERY,
+    EXPIRE_RUN_LEASES_QUERY, CLAIM_RUN_QUERY, SELECT_RUNNING_RUN_QUERY, RECORD_RUN_STAGE_QUERY, RENEW_RUN_LEASE_QUERY,
+    FINISH_RUN_QUERY, SELECT_RUN_QUERY, SELECT_WATERMARKS_QUERY, UPSERT_WATERMARKS_QUERY,
+    UPSERT_SUBSCRIBER_QUERY, DEACTIVATE_SUBSCRIBER_QUERY, PENDING_DELIVERIES_QUERY, RECORD_DELIVERIES_QUERY,
+    COUNT_ACTIVE_SUBSCRIBERS_QUERY, SELECT_SENT_SUBSCRIBERS_QUERY,
+    ENSURE_PARTITIONS_QUERY, ENSURE_FUTURE_PARTITIONS_QUERY, SELECT_PARTITIONS_QUERY, TABLE_NAME,
+    UPDATE_DAILY_STATS_QUERY, SELECT_CATEGORY_STATS_QUERY, SELECT_KEYWORD_STATS_QUERY,
+    ENQUEUE_JOBS_QUERY, ENQUEUE_JOBS_TEMPLATE, EXPIRE_JOB_LEASES_QUERY, CLAIM_JOBS_QUERY, COMPLETE_JOB_QUERY,
+    RETRY_JOB_QUERY, DEFER_JOB_QUERY, COUNT_UNFINISHED_BATCH_JOBS_QUERY, SELECT_JOB_COUNTS_QUERY,
+    SELECT_DEAD_JOBS_QUERY, REQUEUE_DEAD_JOBS_QUERY, PURGE_SUCCEEDED_JOBS_QUERY,
+    SELECT_SOURCE_HEALTH_QUERY, UPSERT_SOURCE_HEALTH_QUERY,
+)
+
+logger = logging.getLogger(__name__)
+
+# --- CONNECTION POOL CONFIGURATION ---
+POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+POOL_ACQUIRE_TIMEOUT = float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', '10'))  # Seconds to wait for a free connection
+POOL_IDLE_TIMEOUT = float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))  # Idle connections above the minimum are closed after this
+POOL_HEALTH_CHECK_AFTER = float(os.getenv('DB_POOL_HEALTH_CHECK_AFTER', '30'))  # Ping connections idle longer than this before reuse
+
+# --- EXPORT CONFIGURATION ---
+EXPORT_ITERSIZE = int(os.getenv('EXPORT_ITERSIZE', '2000'))  # Rows per round trip of the export cursor
+ARTICLE_COLUMNS = ('id', 'title', 'source_url', 'publication_date', 'content', 'source_category', 'created_at',
+                   'relevance_score', 'matched_keywords', 'cluster_id', 'is_representative')
+
+# --- PARTITION CONFIGURATION ---
+PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', '3'))  # Monthly partitions created ahead of time
+
+# --- BULK INGESTION CONFIGURATION ---
+INSERT_BATCH_SIZE = int(os.getenv('INSERT_BATCH_SIZE', '500'))  # Rows per multi-row INSERT statement
+
+
+def _open_connection():
+    """Opens a raw PostgreSQL connection from DATABASE_URL (raises on failure)."""
+    # Get DATABASE_URL from environment (Render provides this)
+    database_url = os.getenv('DATABASE_URL')
+
+    if not database_url:
+        raise RuntimeError("DATABASE_URL environment variable not set!")
+
+    # Parse the DATABASE_URL
+    result = urlparse(database_url)
+
+    # Connect to PostgreSQL
+    return psycopg2.connect(
+        host=result.hostname,
+        port=result.port,
+        user=result.username,
+        password=result.password,
+        database=result.path[1:],  # Remove leading '/'
+        cursor_factory=InstrumentedCursor  # Times every round trip (utils/metrics.py)
+    )
+
+
+def ensure_schema(conn):
+    """Applies pending schema migrations and creates upcoming partitions. Run once per process, not per checkout."""
+    apply_migrations(conn)
+    ensure_future_partitions(conn)
+
 
 def connect():
     """Connects to PostgreSQL using DATABASE_URL environment variable."""
     conn = None
     try:
-        # Get DATABASE_URL from environment (Render provides this)
-        database_url = os.getenv('DATABASE_URL')
-        
-        if not database_url:
-            print("ERROR: DATABASE_URL environment variable not set!")
-            return None
-        
-        # Parse the DATABASE_URL
-        result = urlparse(database_url)
-        
-        # Connect to PostgreSQL
-        conn = psycopg2.connect(
-            host=result.hostname,
-            port=result.port,
-            user=result.username,
-            password=result.password,
-            database=result.path[1:]  # Remove leading '/'
-        )
-        
-        print(f"✅ Connected to PostgreSQL database: {result.hostname}")
-        
-        # Create table if it doesn't exist
+        conn = _open_connection()
+
+        logger.info("Connected to PostgreSQL database: %s", urlparse(os.getenv('DATABASE_URL')).hostname)
+
+        # Bring the schema up to date
+        ensure_schema(conn)
+
+        logger.info("Schema migrations verified")
+        return conn
+
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error connecting to PostgreSQL: %s", error)
+        return None
+
+
+class ConnectionPool:
+    """Thread-safe PostgreSQL connection pool shared by the API and the scheduler.
+
+    Unlike psycopg2's built-in pools it waits (up to a timeout) for a connection
+    instead of failing immediately, pings connections that sat idle for a while
+    before handing them out, and closes surplus idle connections.
+    """
+
+    def __init__(self, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE,
+                 acquire_timeout=POOL_ACQUIRE_TIMEOUT, idle_timeout=POOL_IDLE_TIMEOUT,
+                 health_check_after=POOL_HEALTH_CHECK_AFTER):
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.acquire_timeout = acquire_timeout
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+
+        self._idle = []  # (conn, last_used) pairs, most recently used last
+        self._size = 0   # Open connections, idle + checked out
+        self._closed = False
+        self._cond = threading.Condition()
+
+        for _ in range(min_size):
+            self._idle.append((_open_connection(), time.monotonic()))
+            self._size += 1
+
+    def getconn(self, timeout=None):
+        """Borrows a connection, waiting up to `timeout` seconds for one to free up."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            conn, last_used = None, None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError("connection pool is closed")
+                    self._reap_idle()
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1  # Reserve a slot; the connection is opened outside the lock
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolError(f"timed out after {timeout}s waiting for a database connection")
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                try:
+                    return _open_connection()
+                except Exception:
+                    self._release_slot()
+                    raise
+
+            if self._is_healthy(conn, last_used):
+                return conn
+
+            # Stale connection (server restart, idle timeout on the server side...): drop it and retry
+            self._discard(conn)
+
+    def putconn(self, conn):
+        """Returns a borrowed connection, rolling back anything left uncommitted."""
+        if conn.closed or self._closed:
+            self._discard(conn)
+            return
+
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Closes every idle connection; borrowed ones are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _reap_idle(self):
+        # Called with the lock held. Oldest idle connections sit at the front of the list.
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.pop(0)
+            self._size -= 1
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def init_pool():
+    """Creates the process-wide connection pool and verifies the schema once."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            try:
+                pool = ConnectionPool()
+                conn = pool.getconn()
+                try:
+                    ensure_schema(conn)
+                finally:
+                    pool.putconn(conn)
+                _pool = pool
+                logger.info("Connection pool ready (min=%d, max=%d)", pool.min_size, pool.max_size)
+            except (Exception, psycopg2.Error) as error:
+                logger.error("Error creating connection pool: %s", error)
+    return _pool
+
+
+def close_pool():
+    """Closes the process-wide connection pool (e.g. on application shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+@contextmanager
+def borrow_connection(timeout=None):
+    """Borrows a connection from the shared pool for the duration of a `with` block.
+
+    Yields None when the database is unavailable, mirroring `connect()`.
+    """
+    pool = init_pool()
+    conn = None
+    if pool is not None:
+        try:
+            conn = pool.getconn(timeout)
+        except (Exception, psycopg2.Error) as error:
+            logger.error("Error acquiring database connection: %s", error)
+    try:
+        yield conn
+    finally:
+        if conn is not None:
+            pool.putconn(conn)
+
+def insert_article(conn, data):
+    """Inserts a single news article (an Article or a legacy tuple in Article field order).
+
+    A one-row insert_articles(), so the URL registry, the daily stats rollup
+    and the ingest generation stay in step; returns True if it was inserted.
+    """
+    article = data if isinstance(data, Article) else Article(*data)
+    stats = insert_articles(conn, [article])
+    return bool(stats) and stats[0]['inserted'] == 1
+
+
+def insert_articles(conn, articles, batch_size: int = INSERT_BATCH_SIZE):
+    """Bulk-inserts Article records (clustered by StoryClusterer.assign()) with a single commit.
+
+    Rows are sent as multi-row INSERTs of `batch_size` rows that skip URLs
+    already in the article_url registry. Each batch runs inside a savepoint; if it
+    fails, that batch is retried row by row so one bad row is skipped instead of
+    taking its neighbours down with it. If anything was inserted, the daily
+    stats rollup and the ingest generation are updated in the same transaction,
+    after promoting a stored member of any cluster whose representative was
+    not stored (its is_representative is updated on the Article too).
+
+    Returns one {'inserted', 'skipped', 'failed', 'inserted_urls'} dict per batch.
+    """
+    if conn is None:
+        return []
+
+    articles = list(articles)
+    batch_stats = []
+    cur = None
+    try:
+        cur = conn.cursor()
+        batch = []
+        for article in articles:
+            batch.append(article.row())
+            if len(batch) >= batch_size:
+                batch_stats.append(_insert_batch(cur, batch))
+                batch = []
+        if batch:
+            batch_stats.append(_insert_batch(cur, batch))
+
+        # New rows are counted in the daily rollup and invalidate API caches;
+        # both commit atomically with them
+        inserted_urls = [url for stats in batch_stats for url in stats['inserted_urls']]
+        if inserted_urls:
+            cur.execute(PROMOTE_CLUSTER_REPRESENTATIVES_QUERY, (inserted_urls,))
+            promoted = {row[0] for row in cur.fetchall()}
+            if promoted:
+                logger.debug("Promoted %d articles to cluster representative", len(promoted))
+                for article in articles:
+                    if article.source_url in promoted:
+                        article.is_representative = True
+            cur.execute(UPDATE_DAILY_STATS_QUERY, (inserted_urls,))
+            cur.execute(BUMP_INGEST_GENERATION_QUERY)
+
+        conn.commit()
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error during bulk insert: %s", error)
+        conn.rollback()
+        return []
+    finally:
+        if cur:
+            cur.close()
+
+    inserted = sum(stats['inserted'] for stats in batch_stats)
+    skipped = sum(stats['skipped'] for stats in batch_stats)
+    failed = sum(stats['failed'] for stats in batch_stats)
+    logger.info("Bulk insert: %d inserted, %d duplicates skipped, %d failed (%d batches)",
+                inserted, skipped, failed, len(batch_stats),
+                extra={'inserted': inserted, 'skipped': skipped, 'failed': failed, 'batches': len(batch_stats)})
+    return batch_stats
+
+
+def _insert_batch(cur, batch):
+    """Inserts one batch inside a savepoint, falling back to row-by-row on error."""
+    cur.execute("SAVEPOINT article_batch")
+    try:
+        # Normally a no-op (ingest_articles() creates partitions up front)
+        cur.execute(ENSURE_PARTITIONS_QUERY, ([row[2] for row in batch],))
+        rows = psycopg2.extras.execute_values(
+            cur, INSERT_ARTICLES_BATCH_QUERY, batch, template=INSERT_ARTICLES_BATCH_TEMPLATE,
+            page_size=len(batch), fetch=True
+        )
+        cur.execute("RELEASE SAVEPOINT article_batch")
+        return {'inserted': len(rows), 'skipped': len(batch) - len(rows), 'failed': 0,
+                'inserted_urls': [row[0] for row in rows]}
+    except psycopg2.Error as error:
+        cur.execute("ROLLBACK TO SAVEPOINT article_batch")
+        logger.warning("Batch of %d failed (%s); retrying row by row", len(batch), error)
+
+    stats = {'inserted': 0, 'skipped': 0, 'failed': 0, 'inserted_urls': []}
+    for row in batch:
+        cur.execute("SAVEPOINT article_row")
+        try:
+            cur.execute(ENSURE_PARTITIONS_QUERY, ([row[2]],))
+            cur.execute(INSERT_ARTICLE_QUERY, row)
+            if cur.rowcount == 1:
+                stats['inserted'] += 1
+                stats['inserted_urls'].append(row[1])
+            else:
+                stats['skipped'] += 1
+            cur.execute("RELEASE SAVEPOINT article_row")
+        except psycopg2.Error as error:
+            cur.execute("ROLLBACK TO SAVEPOINT article_row")
+            stats['failed'] += 1
+            logger.warning("Skipping bad row '%s': %s", row[0], error)
+    return stats
+
+def fetch_ingest_generation(conn):
+    """Returns the ingest generation counter, or None if it can't be read."""
+    if conn is None:
+        return None
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(SELECT_INGEST_GENERATION_QUERY)
+        row = cur.fetchone()
+        return row[0] if row else None
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error reading ingest generation: %s", error)
+        conn.rollback()
+        return None
+    finally:
+        if cur:
+            cur.close()
+
+
+def count_articles(conn):
+    """Returns the number of registered article URLs, archived ones included (0 on error)."""
+    if conn is None:
+        return 0
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(COUNT_ARTICLES_QUERY)
+        return cur.fetchone()[0]
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error counting articles: %s", error)
+        conn.rollback()
+        return 0
+    finally:
+        if cur:
+            cur.close()
+
+
+def iter_source_urls(conn, itersize: int = 10000):
+    """Streams every stored source_url through a server-side cursor."""
+    if conn is None:
+        return
+
+    cur = conn.cursor(name='source_url_scan')
+    cur.itersize = itersize
+    try:
+        cur.execute(SELECT_SOURCE_URLS_QUERY)
+        for (url,) in cur:
+            yield url
+    finally:
+        cur.close()
+
+
+def iter_recent_fingerprints(conn, since, itersize: int = 10000):
+    """Streams (minhash, cluster_id, publication_date) of fingerprinted articles published since `since`."""
+    if conn is None:
+        return
+
+    cur = conn.cursor(name='fingerprint_scan')
+    cur.itersize = itersize
+    try:
+        cur.execute(SELECT_RECENT_FINGERPRINTS_QUERY, (since,))
+        yield from cur
+    finally:
+        cur.close()
+
+
+def fetch_existing_urls(conn, urls):
+    """Returns the subset of `urls` already stored, in one round trip."""
+    if conn is None or not urls:
+        return set()
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(SELECT_EXISTING_URLS_QUERY, (list(urls),))
+        return {row[0] for row in cur.fetchall()}
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error checking existing URLs: %s", error)
+        conn.rollback()
+        return set()
+    finally:
+        if cur:
+            cur.close()
+
+
+def fetch_feed_cache(conn, feed_urls):
+    """Returns {feed_url: (etag, last_modified, content_hash)} for the given feeds."""
+    if conn is None or not feed_urls:
+        return {}
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(SELECT_FEED_CACHE_QUERY, (list(feed_urls),))
+        return {row[0]: tuple(row[1:]) for row in cur.fetchall()}
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error loading feed cache: %s", error)
+        conn.rollback()
+        return {}
+    finally:
+        if cur:
+            cur.close()
+
+
+def save_feed_cache(conn, entries):
+    """Upserts (feed_url, etag, last_modified, content_hash) rows.
+
+    Does not commit: the cache update rides along with the collector's
+    insert_articles() commit, so a failed ingest leaves the feed uncached.
+    A failed upsert is undone to a savepoint, leaving the rest of the
+    caller's transaction intact.
+    """
+    if conn is None or not entries:
+        return
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute("SAVEPOINT feed_cache")
+        try:
+            psycopg2.extras.execute_values(cur, UPSERT_FEED_CACHE_QUERY, list(entries))
+        except psycopg2.Error:
+            cur.execute("ROLLBACK TO SAVEPOINT feed_cache")
+            raise
+        cur.execute("RELEASE SAVEPOINT feed_cache")
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error saving feed cache: %s", error)
+    finally:
+        if cur:
+            cur.close()
+
+
+def fetch_watermarks(conn, source_keys):
+    """Returns {source_key: (last_published_at, last_url)} for the given sources."""
+    if conn is None or not source_keys:
+        return {}
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(SELECT_WATERMARKS_QUERY, (list(source_keys),))
+        return {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error loading watermarks: %s", error)
+        conn.rollback()
+        return {}
+    finally:
+        if cur:
+            cur.close()
+
+
+def save_watermarks(conn, entries):
+    """Upserts (source_key, last_published_at, last_url) rows.
+
+    Like save_feed_cache(), does not commit (watermarks only advance if the
+    collector's insert_articles() commit succeeds) and only undoes its own
+    upsert on error.
+    """
+    if conn is None or not entries:
+        return
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute("SAVEPOINT watermarks")
+        try:
+            psycopg2.extras.execute_values(cur, UPSERT_WATERMARKS_QUERY, list(entries))
+        except psycopg2.Error:
+            cur.execute("ROLLBACK TO SAVEPOINT watermarks")
+            raise
+        cur.execute("RELEASE SAVEPOINT watermarks")
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error saving watermarks: %s", error)
+    finally:
+        if cur:
+            cur.close()
+
+
+def fetch_source_health(conn):
+    """Returns the persisted breaker and rate state of every known feed host.
+
+    {host: (state, consecutive_failures, opened_until, open_seconds, rate_per_second, latency_ms, last_error)}
+    """
+    if conn is None:
+        return {}
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(SELECT_SOURCE_HEALTH_QUERY)
+        return {row[0]: tuple(row[1:]) for row in cur.fetchall()}
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error loading source health: %s", error)
+        conn.rollback()
+        return {}
+    finally:
+        if cur:
+            cur.close()
+
+
+def save_source_health(conn, entries):
+    """Upserts source_health rows and commits.
+
+    Unlike the feed cache, this commits on its own: what a run learned
+    about a failing host must survive even if its ingest fails.
+    """
+    if conn is None or not entries:
+        return
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        psycopg2.extras.execute_values(cur, UPSERT_SOURCE_HEALTH_QUERY, list(entries))
+        conn.commit()
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error saving source health: %s", error)
+        conn.rollback()
+    finally:
+        if cur:
+            cur.close()
+
+
+# --- PARTITION MAINTENANCE ---
+
+def ensure_partitions(conn, dates):
+    """Creates the monthly partitions `dates` fall into (None meaning now) and commits.
+
+    Called before an ingest transaction writes anything, so a new partition
+    (which briefly locks news_article) is committed right away instead of
+    at the end of a long insert.
+    """
+    if conn is None or not dates:
+        return 0
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(ENSURE_PARTITIONS_QUERY, (list(dates),))
+        created = cur.fetchone()[0]
+        conn.commit()
+        if created:
+            logger.info("Created %d monthly partition(s)", created)
+        return created
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error creating partitions: %s", error)
+        conn.rollback()
+        return 0
+    finally:
+        if cur:
+            cur.close()
+
+
+def ensure_future_partitions(conn, months_ahead: int = PARTITION_MONTHS_AHEAD):
+    """Creates partitions for the current month and the next `months_ahead`."""
+    if conn is None:
+        return 0
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(ENSURE_FUTURE_PARTITIONS_QUERY, (months_ahead,))
+        created = cur.fetchone()[0]
+        conn.commit()
+        if created:
+            logger.info("Created %d upcoming monthly partition(s)", created)
+        return created
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error creating upcoming partitions: %s", error)
+        conn.rollback()
+        return 0
+    finally:
+        if cur:
+            cur.close()
+
+
+def fetch_partitions(conn):
+    """Returns [(partition_name, attached)] for every news_article_pYYYYMM table, oldest first."""
+    if conn is None:
+        return []
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(SELECT_PARTITIONS_QUERY)
+        results = cur.fetchall()
+        conn.commit()
+        return results
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error listing partitions: %s", error)
+        conn.rollback()
+        return []
+    finally:
+        if cur:
+            cur.close()
+
+
+def detach_partition(conn, partition_name: str):
+    """Detaches a partition from news_article and commits; raises on failure.
+
+    Its rows stop being visible, so the ingest generation is bumped in the
+    same transaction to invalidate cached API pages.
+    """
+    with conn.cursor() as cur:
+        cur.execute(psycopg2.sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+            psycopg2.sql.Identifier(TABLE_NAME), psycopg2.sql.Identifier(partition_name)))
+        cur.execute(BUMP_INGEST_GENERATION_QUERY)
+    conn.commit()
+
+
+def copy_partition(conn, partition_name: str, out):
+    """Writes a (detached) partition to the text stream `out` as CSV with a header (ARTICLE_COLUMNS); raises on failure."""
+    query = psycopg2.sql.SQL(
+        "COPY (SELECT {} FROM {} ORDER BY publication_date, id) TO STDOUT WITH (FORMAT csv, HEADER)"
+    ).format(
+        psycopg2.sql.SQL(', ').join(map(psycopg2.sql.Identifier, ARTICLE_COLUMNS)),
+        psycopg2.sql.Identifier(partition_name))
+    with conn.cursor() as cur:
+        cur.copy_expert(query, out)
+    conn.commit()
+
+
+def drop_partition(conn, partition_name: str):
+    """Drops a detached partition table and commits; raises on failure."""
+    with conn.cursor() as cur:
+        cur.execute(psycopg2.sql.SQL("DROP TABLE {}").format(psycopg2.sql.Identifier(partition_name)))
+    conn.commit()
+
+
+def claim_run(conn, trigger: str, lease_seconds: float):
+    """Registers a new scraper run unless one is already in flight.
+
+    Returns (run_id, None) when this caller owns the new run, or
+    (None, running_id) when another run holds the lease. Runs whose lease
+    expired (crashed workers) are marked abandoned first.
+    """
+    if conn is None:
+        return None, None
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(EXPIRE_RUN_LEASES_QUERY)
+        cur.execute(CLAIM_RUN_QUERY, (trigger, lease_seconds))
+        row = cur.fetchone()
+        if row:
+            conn.commit()
+            return row[0], None
+
+        cur.execute(SELECT_RUNNING_RUN_QUERY)
+        running = cur.fetchone()
+        conn.commit()
+        return None, running[0] if running else None
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error claiming scraper run: %s", error)
+        conn.rollback()
+        return None, None
+    finally:
+        if cur:
+            cur.close()
+
+
+def record_run_stage(conn, run_id: int, stage: dict, lease_seconds: float):
+    """Appends a stage timing to the run and renews its lease."""
+    if conn is None:
+        return
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(RECORD_RUN_STAGE_QUERY, (json.dumps([stage]), lease_seconds, run_id))
+        conn.commit()
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error recording run stage: %s", error)
+        conn.rollback()
+    finally:
+        if cur:
+            cur.close()
+
+
+def renew_run_lease(conn, run_id: int, lease_seconds: float) -> bool:
+    """Extends a running run's lease; returns False if the run is no longer running (or on error)."""
+    if conn is None:
+        return False
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(RENEW_RUN_LEASE_QUERY, (lease_seconds, run_id))
+        renewed = cur.rowcount == 1
+        conn.commit()
+        return renewed
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error renewing run lease: %s", error)
+        conn.rollback()
+        return False
+    finally:
+        if cur:
+            cur.close()
+
+
+def finish_run(conn, run_id: int, status: str, summary=None, error_message=None):
+    """Marks a run finished ('succeeded' or 'failed'), releasing the single-flight slot."""
+    if conn is None:
+        return
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(FINISH_RUN_QUERY, (status, json.dumps(summary, default=str), error_message, run_id))
+        conn.commit()
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error finishing scraper run: %s", error)
+        conn.rollback()
+    finally:
+        if cur:
+            cur.close()
+
+
+def fetch_run(conn, run_id: int):
+    """Returns a scraper run as a dict, or None if it doesn't exist."""
+    if conn is None:
+        return None
+
+    cursor = None
+    try:
+        cursor = conn.cursor(cursor_factory=InstrumentedDictCursor)
+        cursor.execute(SELECT_RUN_QUERY, (run_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error fetching scraper run: %s", error)
+        conn.rollback()
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def upsert_subscriber(conn, email: str, name=None, categories=(), keywords=()):
+    """Adds a subscriber (or updates and reactivates an existing one); returns its id."""
+    if conn is None:
+        return None
+
+    cur = None
+    try:
         cur = conn.cursor()
-        cur.execute(CREATE_TABLE_QUERY)
+        cur.execute(UPSERT_SUBSCRIBER_QUERY, (email, name, list(categories), list(keywords)))
+        subscriber_id = cur.fetchone()[0]
         conn.commit()
-        cur.close()
-        
-        print("✅ Table structure verified")
-        return conn
-        
+        return subscriber_id
     except (Exception, psycopg2.Error) as error:
-        print(f"❌ Error connecting to PostgreSQL: {error}")
+        logger.error("Error saving subscriber %s: %s", email, error)
+        conn.rollback()
         return None
+    finally:
+        if cur:
+            cur.close()
 
-def insert_article(conn, data):
-    """Inserts a single news article, preventing duplicates based on URL."""
+
+def deactivate_subscriber(conn, email: str) -> bool:
+    """Stops future digests for `email`; returns False if it isn't subscribed."""
+    if conn is None:
+        return False
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(DEACTIVATE_SUBSCRIBER_QUERY, (email,))
+        conn.commit()
+        return cur.rowcount > 0
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error deactivating subscriber %s: %s", email, error)
+        conn.rollback()
+        return False
+    finally:
+        if cur:
+            cur.close()
+
+
+def count_active_subscribers(conn) -> int:
+    """Number of active digest subscribers (0 on error)."""
+    if conn is None:
+        return 0
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(COUNT_ACTIVE_SUBSCRIBERS_QUERY)
+        return cur.fetchone()[0]
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error counting subscribers: %s", error)
+        conn.rollback()
+        return 0
+    finally:
+        if cur:
+            cur.close()
+
+
+def fetch_pending_deliveries(conn, digest_key: str):
+    """Registers active subscribers for `digest_key` and returns those not yet sent it.
+
+    Each subscriber is a dict (id, email, name, categories, keywords).
+    """
     if conn is None:
+        return []
+
+    cursor = None
+    try:
+        cursor = conn.cursor(cursor_factory=InstrumentedDictCursor)
+        cursor.execute(PENDING_DELIVERIES_QUERY, {'digest_key': digest_key})
+        results = [dict(row) for row in cursor.fetchall()]
+        conn.commit()
+        return results
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error loading digest deliveries: %s", error)
+        conn.rollback()
+        return []
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def record_deliveries(conn, digest_key: str, subscriber_ids, status: str, message_id=None, error_message=None):
+    """Marks one SendGrid request's recipients 'sent' or 'failed' (sent rows are never touched again)."""
+    if conn is None or not subscriber_ids:
         return
 
-    title, url, date, content, category = data
+    cur = None
     try:
         cur = conn.cursor()
-        cur.execute(INSERT_ARTICLE_QUERY, (title, url, date, content, category))
+        cur.execute(RECORD_DELIVERIES_QUERY, (status, message_id, error_message, digest_key, list(subscriber_ids)))
         conn.commit()
-        if cur.rowcount == 1:
-            print(f"✅ Successfully inserted: {title}")
-        else:
-            print(f"⏭️  Skipped duplicate (URL exists): {title}")
-        cur.close()
     except (Exception, psycopg2.Error) as error:
-        print(f"❌ Error during insert: {error}")
+        logger.error("Error recording digest deliveries: %s", error)
+        conn.rollback()
+    finally:
+        if cur:
+            cur.close()
+
+
+def fetch_sent_subscribers(conn, digest_key: str, subscriber_ids):
+    """Returns the ids among `subscriber_ids` that were already sent `digest_key`."""
+    if conn is None or not subscriber_ids:
+        return set()
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(SELECT_SENT_SUBSCRIBERS_QUERY, (digest_key, list(subscriber_ids)))
+        return {row[0] for row in cur.fetchall()}
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error loading digest deliveries: %s", error)
+        conn.rollback()
+        return set()
+    finally:
+        if cur:
+            cur.close()
+
+
+# --- JOB QUEUE ---
+
+def enqueue_jobs(conn, jobs, commit: bool = True):
+    """Queues (job_type, payload, batch, dedupe_key, max_attempts, delay_seconds) tuples.
+
+    Returns the ids of the jobs queued (jobs whose dedupe_key already has an
+    unfinished job are left out), or None on error. With commit=False the
+    jobs are only staged, so a handler's follow-up jobs commit together with
+    its own completion.
+    """
+    if conn is None:
+        return None
+    jobs = [(job_type, json.dumps(payload, default=str), batch, dedupe_key, max_attempts, delay)
+            for job_type, payload, batch, dedupe_key, max_attempts, delay in jobs]
+    if not jobs:
+        return []
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        rows = psycopg2.extras.execute_values(cur, ENQUEUE_JOBS_QUERY, jobs, template=ENQUEUE_JOBS_TEMPLATE,
+                                              fetch=True)
+        if commit:
+            conn.commit()
+        return [row[0] for row in rows]
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error enqueuing jobs: %s", error)
+        conn.rollback()
+        return None
+    finally:
+        if cur:
+            cur.close()
+
+
+def claim_jobs(conn, worker: str, lease_seconds: float, job_types=None, limit: int = 1):
+    """Claims up to `limit` ready jobs for `worker` and commits.
+
+    Expired leases are returned to the queue first. Each job is a dict (id,
+    job_type, payload, batch, attempts, max_attempts); `attempts` already
+    counts this one.
+    """
+    if conn is None:
+        return []
+
+    cursor = None
+    try:
+        cursor = conn.cursor(cursor_factory=InstrumentedDictCursor)
+        cursor.execute(EXPIRE_JOB_LEASES_QUERY)
+        cursor.execute(CLAIM_JOBS_QUERY, {
+            'worker': worker, 'lease_seconds': lease_seconds,
+            'job_types': list(job_types) if job_types else None, 'limit': limit,
+        })
+        results = [dict(row) for row in cursor.fetchall()]
+        conn.commit()
+        return results
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error claiming jobs: %s", error)
+        conn.rollback()
+        return []
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def complete_job(conn, job_id: int, worker: str) -> bool:
+    """Marks a claimed job succeeded and commits, together with anything its handler staged.
+
+    Returns False if the job is no longer this worker's (its lease expired).
+    """
+    if conn is None:
+        return False
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(COMPLETE_JOB_QUERY, (job_id, worker))
+        completed = cur.rowcount == 1
+        conn.commit()
+        return completed
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error completing job %d: %s", job_id, error)
+        conn.rollback()
+        return False
+    finally:
+        if cur:
+            cur.close()
+
+
+def retry_job(conn, job_id: int, worker: str, delay_seconds: float, error_message: str):
+    """Records a failed attempt; returns the job's new status ('queued' or 'dead'), or None."""
+    if conn is None:
+        return None
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(RETRY_JOB_QUERY, (delay_seconds, error_message, job_id, worker))
+        row = cur.fetchone()
+        conn.commit()
+        return row[0] if row else None
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error recording failure of job %d: %s", job_id, error)
+        conn.rollback()
+        return None
+    finally:
+        if cur:
+            cur.close()
+
+
+def defer_job(conn, job_id: int, worker: str, delay_seconds: float):
+    """Puts a claimed job back without using up an attempt (it is waiting on other jobs)."""
+    if conn is None:
+        return
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(DEFER_JOB_QUERY, (delay_seconds, job_id, worker))
+        conn.commit()
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error deferring job %d: %s", job_id, error)
+        conn.rollback()
+    finally:
+        if cur:
+            cur.close()
+
+
+def count_unfinished_jobs(conn, batch: str, job_types) -> int:
+    """Number of queued or running jobs of `job_types` in `batch` (None on error)."""
+    if conn is None:
+        return None
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(COUNT_UNFINISHED_BATCH_JOBS_QUERY, (batch, list(job_types)))
+        return cur.fetchone()[0]
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error counting jobs of batch %s: %s", batch, error)
+        conn.rollback()
+        return None
+    finally:
+        if cur:
+            cur.close()
+
+
+def fetch_job_counts(conn):
+    """Returns {(job_type, status): count} over the whole queue."""
+    if conn is None:
+        return {}
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(SELECT_JOB_COUNTS_QUERY)
+        return {(row[0], row[1]): row[2] for row in cur.fetchall()}
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error counting jobs: %s", error)
+        conn.rollback()
+        return {}
+    finally:
+        if cur:
+            cur.close()
+
+
+def fetch_dead_jobs(conn, limit: int = 50):
+    """Returns the most recent dead-lettered jobs as dicts, newest first."""
+    if conn is None:
+        return []
+
+    cursor = None
+    try:
+        cursor = conn.cursor(cursor_factory=InstrumentedDictCursor)
+        cursor.execute(SELECT_DEAD_JOBS_QUERY, (limit,))
+        return [dict(row) for row in cursor.fetchall()]
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error fetching dead jobs: %s", error)
+        conn.rollback()
+        return []
+    finally:
+        if cursor:
+            cursor.close()
+
+
+def requeue_dead_jobs(conn, job_ids=(), requeue_all: bool = False):
+    """Sends dead jobs (the given ids, or all of them) back to the queue; returns their ids."""
+    if conn is None:
+        return []
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(REQUEUE_DEAD_JOBS_QUERY, {'all': requeue_all, 'ids': list(job_ids)})
+        requeued = [row[0] for row in cur.fetchall()]
+        conn.commit()
+        return requeued
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error requeuing dead jobs: %s", error)
+        conn.rollback()
+        return []
+    finally:
+        if cur:
+            cur.close()
+
+
+def purge_succeeded_jobs(conn, older_than_days: float) -> int:
+    """Deletes succeeded jobs finished more than `older_than_days` ago; returns how many."""
+    if conn is None:
+        return 0
+
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(PURGE_SUCCEEDED_JOBS_QUERY, (older_than_days,))
+        conn.commit()
+        return cur.rowcount
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error purging finished jobs: %s", error)
         conn.rollback()
+        return 0
+    finally:
+        if cur:
+            cur.close()
+
 
-def fetch_latest_news(conn, limit: int = 20, category_filter=None):
-    """Fetches the latest news articles, optionally filtered by category."""
+def fetch_latest_news(conn, limit: int = 20, category_filter=None, after=None, representatives_only=False):
+    """Fetches the latest news articles as Article records, optionally filtered by category.
+
+    `after` is the (publication_date, id) of the last row of the previous page;
+    the next page is found with an index seek, so deep pages cost the same as
+    the first one. `representatives_only` returns one article per
+    near-duplicate cluster. Returns None if the query fails, so callers can
+    tell an error from an empty page.
+    """
     if conn is None:
-        print("ERROR: No database connection provided to fetch_latest_news")
+        logger.error("No database connection provided to fetch_latest_news")
         return []
     
     cursor = None
     results = []
     
     try:
-        # Use DictCursor to return results as dictionaries
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor) 
+        # Plain tuples, built straight into Article records (no per-row dicts)
+        cursor = conn.cursor(cursor_factory=InstrumentedCursor)
         
         # Build the query dynamically
-        query = "SELECT id, title, source_url, publication_date, content, source_category, created_at FROM news_article"
+        query = f"SELECT {', '.join(ARTICLE_COLUMNS)} FROM news_article"
+        conditions = []
         params = []
 
         if category_filter:
-            query += " WHERE source_category LIKE %s"
+            conditions.append("source_category LIKE %s")
             params.append(f'{category_filter}%')
 
-        query += " ORDER BY publication_date DESC LIMIT %s"
+        if representatives_only:
+            conditions.append("is_representative")
+
+        if after:
+            # The plain bound lets the planner skip newer partitions
+            conditions.append("publication_date <= %s AND (publication_date, id) < (%s, %s)")
+            params.extend((after[0], *after))
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        query += " ORDER BY publication_date DESC, id DESC LIMIT %s"
         params.append(limit)
 
         cursor.execute(query, params)
         
-        # Fetch results and convert to list of dictionaries
-        for row in cursor.fetchall():
-            results.append(dict(row))
+        results = [Article.from_row(row) for row in cursor.fetchall()]
         
-        print(f"📰 Fetched {len(results)} articles from database")
+        logger.debug("Fetched %d articles from database", len(results))
             
     except (Exception, psycopg2.Error) as error:
-        print(f"❌ Error fetching news: {error}")
+        logger.error("Error fetching news: %s", error)
+        conn.rollback()
+        results = None
     finally:
         if cursor:
             cursor.close()
@@ -104,35 +1233,45 @@ def fetch_latest_news(conn, limit: int = 20, category_filter=None):
     return results
 
 
-def fetch_news_by_date_range(conn, start_date, limit: int = 50):
-    """Fetches news articles from a specific date range."""
+def fetch_news_by_date_range(conn, start_date, limit: int = 50, after=None, representatives_only=False):
+    """Fetches news articles from a specific date range, paged like fetch_latest_news (None if the query fails)."""
     if conn is None:
-        print("ERROR: No database connection provided")
+        logger.error("No database connection provided to fetch_news_by_date_range")
         return []
     
     cursor = None
     results = []
     
     try:
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor) 
+        cursor = conn.cursor(cursor_factory=InstrumentedCursor)
         
-        query = """
-            SELECT id, title, source_url, publication_date, content, source_category, created_at 
+        query = f"""
+            SELECT {', '.join(ARTICLE_COLUMNS)}
             FROM news_article
             WHERE publication_date >= %s
-            ORDER BY publication_date DESC 
-            LIMIT %s
         """
+        params = [start_date]
+
+        if representatives_only:
+            query += " AND is_representative"
+
+        if after:
+            query += " AND publication_date <= %s AND (publication_date, id) < (%s, %s)"
+            params.extend((after[0], *after))
+
+        query += " ORDER BY publication_date DESC, id DESC LIMIT %s"
+        params.append(limit)
         
-        cursor.execute(query, (start_date, limit))
+        cursor.execute(query, params)
         
-        for row in cursor.fetchall():
-            results.append(dict(row))
+        results = [Article.from_row(row) for row in cursor.fetchall()]
         
-        print(f"📰 Fetched {len(results)} articles from {start_date.strftime('%Y-%m-%d')} onwards")
+        logger.debug("Fetched %d articles from %s onwards", len(results), start_date.strftime('%Y-%m-%d'))
             
     except (Exception, psycopg2.Error) as error:
-        print(f"❌ Error fetching news: {error}")
+        logger.error("Error fetching news: %s", error)
+        conn.rollback()
+        results = None
     finally:
         if cursor:
             cursor.close()
@@ -140,6 +1279,158 @@ def fetch_news_by_date_range(conn, start_date, limit: int = 50):
     return results
 
 
+def search_news(conn, search_query: str, limit: int = 20, category_filter=None,
+                start_date=None, end_date=None, after=None, representatives_only=False):
+    """Full-text search over title and content, best matches first.
+
+    `search_query` uses web-search syntax ("quoted phrases", OR, -exclude).
+    Rows carry a `rank`; `after` is the (rank, id) of the last row of the
+    previous page. `representatives_only` drops near-duplicates. Returns None
+    if the query fails.
+    """
+    if conn is None:
+        logger.error("No database connection provided to search_news")
+        return []
+
+    cursor = None
+    results = []
+
+    # ts_rank returns float4; widen it so the cursor round-trips exactly
+    rank = "ts_rank(search_vector, q)::float8"
+
+    try:
+        cursor = conn.cursor(cursor_factory=InstrumentedDictCursor)
+
+        query = f"""
+            SELECT {', '.join(ARTICLE_COLUMNS)},
+                   {rank} AS rank
+            FROM news_article, websearch_to_tsquery('english', %s) AS q
+            WHERE search_vector @@ q
+        """
+        params = [search_query]
+
+        if category_filter:
+            query += " AND source_category LIKE %s"
+            params.append(f'{category_filter}%')
+        if start_date:
+            query += " AND publication_date >= %s"
+            params.append(start_date)
+        if end_date:
+            query += " AND publication_date < %s"
+            params.append(end_date)
+        if representatives_only:
+            query += " AND is_representative"
+        if after:
+            query += f" AND ({rank}, id) < (%s, %s)"
+            params.extend(after)
+
+        query += " ORDER BY rank DESC, id DESC LIMIT %s"
+        params.append(limit)
+
+        cursor.execute(query, params)
+
+        for row in cursor.fetchall():
+            results.append(dict(row))
+
+        logger.debug("Found %d articles matching '%s'", len(results), search_query)
+
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error searching news: %s", error)
+        conn.rollback()
+        results = None
+    finally:
+        if cursor:
+            cursor.close()
+
+    return results
+
+
+def fetch_daily_stats(conn, start_date, end_date, category_filter=None):
+    """Reads the daily rollup for [start_date, end_date] (dates, inclusive).
+
+    Returns {'categories': [{day, source_category, articles, representatives}],
+    'keywords': [{day, keyword, articles, representatives}]}, the keyword rows
+    summed over the matching categories. Cost depends on the number of days,
+    not of articles. Returns None if the rollup can't be read.
+    """
+    stats = {'categories': [], 'keywords': []}
+    if conn is None:
+        logger.error("No database connection provided to fetch_daily_stats")
+        return stats
+
+    cursor = None
+    params = (start_date, end_date, f'{category_filter or ""}%')
+    try:
+        cursor = conn.cursor(cursor_factory=InstrumentedDictCursor)
+        cursor.execute(SELECT_CATEGORY_STATS_QUERY, params)
+        stats['categories'] = [dict(row) for row in cursor.fetchall()]
+        cursor.execute(SELECT_KEYWORD_STATS_QUERY, params)
+        stats['keywords'] = [dict(row) for row in cursor.fetchall()]
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error fetching daily stats: %s", error)
+        conn.rollback()
+        stats = None
+    finally:
+        if cursor:
+            cursor.close()
+
+    return stats
+
+
+def iter_articles(conn, start_date=None, end_date=None, category_filter=None, itersize: int = EXPORT_ITERSIZE):
+    """Streams matching articles as plain tuples (ARTICLE_COLUMNS order), newest first.
+
+    Uses a server-side (named) cursor that pulls `itersize` rows per round
+    trip, so memory stays flat however many articles match.
+    """
+    if conn is None:
+        logger.error("No database connection provided to iter_articles")
+        return
+
+    query = f"SELECT {', '.join(ARTICLE_COLUMNS)} FROM news_article"
+    conditions = []
+    params = []
+
+    if start_date:
+        conditions.append("publication_date >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("publication_date < %s")
+        params.append(end_date)
+    if category_filter:
+        conditions.append("source_category LIKE %s")
+        params.append(f'{category_filter}%')
+
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY publication_date DESC, id DESC"
+
+    cursor = conn.cursor(name='news_export')
+    cursor.itersize = itersize
+    exported = 0
+    try:
+        cursor.execute(query, params)
+        for row in cursor:
+            exported += 1
+            yield row
+        logger.info("Exported %d articles", exported)
+    except (Exception, psycopg2.Error) as error:
+        logger.error("Error exporting news: %s", error)
+        raise
+    finally:
+        cursor.close()
+
+
+def next_page_cursor(results, limit: int, sort_key=('publication_date', 'id')):
+    """Opaque cursor for the page after `results`, or None when it was the last page."""
+    if len(results) < limit:
+        return None
+    last = results[-1]
+    if isinstance(last, dict):
+        return encode_cursor(*(last[column] for column in sort_key))
+    return encode_cursor(*(getattr(last, column) for column in sort_key))  # Article records
+
+
 if __name__ == '__main__':
     # --- Verification Step ---
     print("Attempting to connect and create table...")
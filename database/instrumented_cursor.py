@@ -0,0 +1,37 @@
+# database/instrumented_cursor.py
+
+import time
+
+import psycopg2.extensions
+import psycopg2.extras
+
+from utils.metrics import DB_QUERY_SECONDS
+
+
+def statement_type(query) -> str:
+    """Leading SQL keyword (SELECT, INSERT, SAVEPOINT, ...) as a low-cardinality metric label."""
+    if isinstance(query, bytes):
+        query = query[:64].decode('utf-8', 'replace')
+    else:
+        query = str(query)[:64]
+    words = query.split(None, 1)
+    return words[0].upper() if words else 'UNKNOWN'
+
+
+class _TimedExecuteMixin:
+    """Records each execute() (one server round trip) in DB_QUERY_SECONDS."""
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            DB_QUERY_SECONDS.labels(statement_type(query)).observe(time.perf_counter() - started)
+
+
+class InstrumentedCursor(_TimedExecuteMixin, psycopg2.extensions.cursor):
+    """Default cursor of every connection opened by db_connector."""
+
+
+class InstrumentedDictCursor(_TimedExecuteMixin, psycopg2.extras.DictCursor):
+    """DictCursor with the same timing, for the read queries."""
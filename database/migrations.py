@@ -0,0 +1,277 @@
+# database/migrations.py
+
+import logging
+
+import psycopg2
+from .models import (
+    TABLE_NAME, CREATE_TABLE_QUERY, CREATE_FEED_CACHE_TABLE_QUERY, CREATE_INGEST_GENERATION_TABLE_QUERY,
+    CREATE_RUN_TABLE_QUERY, CREATE_WATERMARK_TABLE_QUERY, CREATE_SUBSCRIBER_TABLES_QUERY,
+    URL_REGISTRY_TABLE_NAME, CREATE_ENSURE_PARTITIONS_FUNCTION_QUERY,
+    CREATE_DAILY_STATS_TABLE_QUERY, BUILD_DAILY_STATS_QUERY, CREATE_JOB_QUEUE_TABLE_QUERY,
+    CREATE_SOURCE_HEALTH_TABLE_QUERY, FEED_CACHE_TABLE_NAME, INGEST_GENERATION_TABLE_NAME, RUN_TABLE_NAME,
+    WATERMARK_TABLE_NAME, SOURCE_HEALTH_TABLE_NAME, SUBSCRIBER_TABLE_NAME, DELIVERY_TABLE_NAME,
+    DAILY_STATS_TABLE_NAME, JOB_TABLE_NAME,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_MIGRATIONS_TABLE = "schema_migrations"
+
+# Arbitrary constant: serializes migration runs across processes (API + scheduler starting together)
+MIGRATION_LOCK_ID = 73_510_001
+
+CREATE_SCHEMA_MIGRATIONS_TABLE_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {SCHEMA_MIGRATIONS_TABLE} (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Indexes backing fetch_latest_news (ORDER BY publication_date DESC, optional
+# source_category LIKE 'X%') and fetch_news_by_date_range (publication_date >= %s).
+# text_pattern_ops lets the planner use the index for LIKE prefix matches.
+READ_INDEXES_QUERY = f"""
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_publication_date
+    ON {TABLE_NAME} (publication_date DESC);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_category_publication_date
+    ON {TABLE_NAME} (source_category text_pattern_ops, publication_date DESC);
+ANALYZE {TABLE_NAME};
+"""
+
+# Keyset pagination seeks on (publication_date, id), which needs a non-null
+# sort key: undated rows take their collection time, and inserts default to it.
+KEYSET_PAGINATION_QUERY = f"""
+UPDATE {TABLE_NAME}
+SET publication_date = COALESCE(created_at, CURRENT_TIMESTAMP)
+WHERE publication_date IS NULL;
+ALTER TABLE {TABLE_NAME}
+    ALTER COLUMN publication_date SET DEFAULT CURRENT_TIMESTAMP,
+    ALTER COLUMN publication_date SET NOT NULL;
+DROP INDEX IF EXISTS idx_{TABLE_NAME}_publication_date;
+DROP INDEX IF EXISTS idx_{TABLE_NAME}_category_publication_date;
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_publication_date_id
+    ON {TABLE_NAME} (publication_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_category_publication_date_id
+    ON {TABLE_NAME} (source_category text_pattern_ops, publication_date DESC, id DESC);
+ANALYZE {TABLE_NAME};
+"""
+
+# Full-text search: a stored tsvector (title weighted above content) kept up to
+# date by Postgres on every insert/update, with a GIN index for @@ matches
+SEARCH_VECTOR_QUERY = f"""
+ALTER TABLE {TABLE_NAME}
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_search_vector
+    ON {TABLE_NAME} USING GIN (search_vector);
+ANALYZE {TABLE_NAME};
+"""
+
+# Keyword relevance computed by collectors/relevance.py at ingest time
+RELEVANCE_COLUMNS_QUERY = f"""
+ALTER TABLE {TABLE_NAME}
+    ADD COLUMN IF NOT EXISTS relevance_score REAL NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS matched_keywords TEXT[] NOT NULL DEFAULT '{{}}';
+"""
+
+# Near-duplicate clustering (collectors/near_duplicates.py): a MinHash
+# signature per article, the cluster it joined and a flag on the first article
+# of each cluster, with a partial index so the representatives-only listing is
+# still an index seek
+CLUSTER_COLUMNS_QUERY = f"""
+ALTER TABLE {TABLE_NAME}
+    ADD COLUMN IF NOT EXISTS minhash INTEGER[],
+    ADD COLUMN IF NOT EXISTS cluster_id BIGINT,
+    ADD COLUMN IF NOT EXISTS is_representative BOOLEAN NOT NULL DEFAULT TRUE;
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_cluster_id
+    ON {TABLE_NAME} (cluster_id);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_representative_publication_date_id
+    ON {TABLE_NAME} (publication_date DESC, id DESC) WHERE is_representative;
+"""
+
+# Monthly range partitions on publication_date. The old heap is renamed, its
+# rows are copied into a partitioned table with the same columns (primary key
+# widened to (id, publication_date), which partitioning requires) and every
+# URL goes into the article_url registry, which takes over the UNIQUE
+# (source_url) de-duplication. Partitions exist for every month with data and
+# the next three; later ones are created on demand (ensure_partitions).
+PARTITION_ARTICLES_QUERY = f"""
+ALTER TABLE {TABLE_NAME} RENAME TO {TABLE_NAME}_unpartitioned;
+ALTER TABLE {TABLE_NAME}_unpartitioned RENAME CONSTRAINT {TABLE_NAME}_pkey TO {TABLE_NAME}_unpartitioned_pkey;
+ALTER TABLE {TABLE_NAME}_unpartitioned
+    RENAME CONSTRAINT {TABLE_NAME}_source_url_key TO {TABLE_NAME}_unpartitioned_source_url_key;
+DROP INDEX IF EXISTS
+    idx_{TABLE_NAME}_publication_date_id,
+    idx_{TABLE_NAME}_category_publication_date_id,
+    idx_{TABLE_NAME}_search_vector,
+    idx_{TABLE_NAME}_cluster_id,
+    idx_{TABLE_NAME}_representative_publication_date_id;
+ALTER SEQUENCE {TABLE_NAME}_id_seq OWNED BY NONE;
+
+CREATE TABLE {TABLE_NAME} (
+    id INTEGER NOT NULL DEFAULT nextval('{TABLE_NAME}_id_seq'),
+    title TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    publication_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    content TEXT,
+    source_category TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED,
+    relevance_score REAL NOT NULL DEFAULT 0,
+    matched_keywords TEXT[] NOT NULL DEFAULT '{{}}',
+    minhash INTEGER[],
+    cluster_id BIGINT,
+    is_representative BOOLEAN NOT NULL DEFAULT TRUE,
+    PRIMARY KEY (id, publication_date)
+) PARTITION BY RANGE (publication_date);
+ALTER SEQUENCE {TABLE_NAME}_id_seq OWNED BY {TABLE_NAME}.id;
+
+CREATE TABLE {URL_REGISTRY_TABLE_NAME} (
+    source_url TEXT PRIMARY KEY,
+    article_id INTEGER NOT NULL,
+    publication_date TIMESTAMP NOT NULL,
+    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+{CREATE_ENSURE_PARTITIONS_FUNCTION_QUERY}
+SELECT ensure_{TABLE_NAME}_partitions(ARRAY(
+    SELECT DISTINCT date_trunc('month', publication_date) FROM {TABLE_NAME}_unpartitioned
+    UNION
+    SELECT generate_series(date_trunc('month', LOCALTIMESTAMP),
+                           date_trunc('month', LOCALTIMESTAMP) + interval '3 months', interval '1 month')
+));
+
+INSERT INTO {TABLE_NAME} (id, title, source_url, publication_date, content, source_category, created_at,
+                          relevance_score, matched_keywords, minhash, cluster_id, is_representative)
+SELECT id, title, source_url, publication_date, content, source_category, created_at,
+       relevance_score, matched_keywords, minhash, cluster_id, is_representative
+FROM {TABLE_NAME}_unpartitioned;
+INSERT INTO {URL_REGISTRY_TABLE_NAME} (source_url, article_id, publication_date)
+SELECT source_url, id, publication_date FROM {TABLE_NAME}_unpartitioned;
+DROP TABLE {TABLE_NAME}_unpartitioned;
+
+-- Declared on the parent, so every current and future partition gets them
+CREATE INDEX idx_{TABLE_NAME}_publication_date_id
+    ON {TABLE_NAME} (publication_date DESC, id DESC);
+CREATE INDEX idx_{TABLE_NAME}_category_publication_date_id
+    ON {TABLE_NAME} (source_category text_pattern_ops, publication_date DESC, id DESC);
+CREATE INDEX idx_{TABLE_NAME}_search_vector
+    ON {TABLE_NAME} USING GIN (search_vector);
+CREATE INDEX idx_{TABLE_NAME}_cluster_id
+    ON {TABLE_NAME} (cluster_id);
+CREATE INDEX idx_{TABLE_NAME}_representative_publication_date_id
+    ON {TABLE_NAME} (publication_date DESC, id DESC) WHERE is_representative;
+ANALYZE {TABLE_NAME};
+ANALYZE {URL_REGISTRY_TABLE_NAME};
+"""
+
+# Timestamps are naive UTC; column defaults used CURRENT_TIMESTAMP, which a
+# TIMESTAMP column stores in the session time zone. Existing values are left
+# as they are (identical on servers running in UTC). The partition function is
+# replaced so undated rows land in the UTC month.
+UTC_TIMESTAMP_DEFAULTS_QUERY = f"""
+ALTER TABLE {TABLE_NAME}
+    ALTER COLUMN publication_date SET DEFAULT timezone('UTC', now()),
+    ALTER COLUMN created_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {URL_REGISTRY_TABLE_NAME} ALTER COLUMN registered_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {FEED_CACHE_TABLE_NAME} ALTER COLUMN updated_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {INGEST_GENERATION_TABLE_NAME} ALTER COLUMN updated_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {RUN_TABLE_NAME} ALTER COLUMN started_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {WATERMARK_TABLE_NAME} ALTER COLUMN updated_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {SOURCE_HEALTH_TABLE_NAME} ALTER COLUMN updated_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {SUBSCRIBER_TABLE_NAME} ALTER COLUMN created_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {DELIVERY_TABLE_NAME} ALTER COLUMN updated_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {DAILY_STATS_TABLE_NAME} ALTER COLUMN updated_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {JOB_TABLE_NAME}
+    ALTER COLUMN run_after SET DEFAULT timezone('UTC', now()),
+    ALTER COLUMN created_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE {SCHEMA_MIGRATIONS_TABLE} ALTER COLUMN applied_at SET DEFAULT timezone('UTC', now());
+{CREATE_ENSURE_PARTITIONS_FUNCTION_QUERY}
+"""
+
+# Ordered, append-only list of (version, name, sql). Never edit an applied
+# migration; add a new one instead.
+MIGRATIONS = [
+    (1, "baseline news_article and feed_cache tables", CREATE_TABLE_QUERY + CREATE_FEED_CACHE_TABLE_QUERY),
+    (2, "indexes for the API read queries", READ_INDEXES_QUERY),
+    (3, "non-null publication_date and (publication_date, id) keyset indexes", KEYSET_PAGINATION_QUERY),
+    (4, "ingest generation counter for API cache invalidation", CREATE_INGEST_GENERATION_TABLE_QUERY),
+    (5, "stored tsvector and GIN index for full-text search", SEARCH_VECTOR_QUERY),
+    (6, "scraper_run table for single-flight run coordination", CREATE_RUN_TABLE_QUERY),
+    (7, "per-source collection watermarks", CREATE_WATERMARK_TABLE_QUERY),
+    (8, "relevance_score and matched_keywords columns", RELEVANCE_COLUMNS_QUERY),
+    (9, "minhash, cluster_id and is_representative for near-duplicate clustering", CLUSTER_COLUMNS_QUERY),
+    (10, "subscriber and digest_delivery tables for per-subscriber digests", CREATE_SUBSCRIBER_TABLES_QUERY),
+    (11, "monthly partitions on publication_date with an article_url registry", PARTITION_ARTICLES_QUERY),
+    (12, "article_daily_stats rollup, filled from the stored articles",
+     CREATE_DAILY_STATS_TABLE_QUERY + BUILD_DAILY_STATS_QUERY),
+    (13, "job_queue table for the decoupled fetch/ingest/digest workers", CREATE_JOB_QUEUE_TABLE_QUERY),
+    (14, "source_health table for per-host circuit breakers and rate limits", CREATE_SOURCE_HEALTH_TABLE_QUERY),
+    (15, "naive UTC timestamp defaults and partition routing", UTC_TIMESTAMP_DEFAULTS_QUERY),
+]
+
+
+def applied_versions(conn):
+    """Returns the set of migration versions already applied."""
+    cur = conn.cursor()
+    cur.execute(CREATE_SCHEMA_MIGRATIONS_TABLE_QUERY)
+    cur.execute(f"SELECT version FROM {SCHEMA_MIGRATIONS_TABLE}")
+    versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    cur.close()
+    return versions
+
+
+def apply_migrations(conn, migrations=MIGRATIONS):
+    """Applies pending migrations in order, one transaction per migration.
+
+    Returns the list of versions applied by this call. A session-level
+    advisory lock makes concurrent callers wait instead of racing.
+    """
+    applied = []
+    cur = conn.cursor()
+    cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+    try:
+        done = applied_versions(conn)
+        for version, name, sql in sorted(migrations):
+            if version in done:
+                continue
+            try:
+                cur.execute(sql)
+                cur.execute(
+                    f"INSERT INTO {SCHEMA_MIGRATIONS_TABLE} (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                conn.commit()
+            except psycopg2.Error:
+                conn.rollback()
+                logger.error("Migration %d (%s) failed", version, name)
+                raise
+            applied.append(version)
+            logger.info("Applied migration %d: %s", version, name)
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        conn.commit()
+        cur.close()
+    return applied
+
+
+if __name__ == '__main__':
+    # Usage: python -m database.migrations
+    from .db_connector import _open_connection
+    from utils.logging_config import configure_logging
+
+    configure_logging()
+    migration_conn = _open_connection()
+    try:
+        versions = apply_migrations(migration_conn)
+        print(f"Schema up to date ({len(versions)} migrations applied, latest is {MIGRATIONS[-1][0]})")
+    finally:
+        migration_conn.close()
@@ -15,9 +15,612 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
 );
 """
 
-# Defines the SQL command to insert data, skipping if the URL already exists
-INSERT_ARTICLE_QUERY = f"""
-INSERT INTO {TABLE_NAME} (title, source_url, publication_date, content, source_category)
-VALUES (%s, %s, %s, %s, %s)
-ON CONFLICT (source_url) DO NOTHING;
-"""
\ No newline at end of file
+# Every URL ever stored, with the (id, publication_date) primary key of its
+# article. A partitioned table can't enforce UNIQUE (source_url) across
+# partitions, so de-duplication goes through this table (see migration 11);
+# rows stay here when their partition is archived, so archived stories are
+# not collected again.
+URL_REGISTRY_TABLE_NAME = "article_url"
+
+# Per-row template for the VALUES below (undated entries are stamped with the
+# collection time; see migration 3). Timestamps are naive UTC throughout:
+# Python uses collectors.normalize.utcnow(), SQL timezone('UTC', now())
+INSERT_ARTICLES_BATCH_TEMPLATE = (
+    "(%s, %s, COALESCE(%s::timestamp, timezone('UTC', now())), %s, %s, %s::real, %s::text[], %s::integer[], "
+    "%s::bigint, %s)"
+)
+
+# Registers the new URLs (skipping known ones) and inserts only those rows,
+# reserving each article id up front so the registry points at it
+_INSERT_ARTICLES_QUERY = f"""
+WITH incoming (title, source_url, publication_date, content, source_category,
+               relevance_score, matched_keywords, minhash, cluster_id, is_representative) AS (
+    VALUES {{values}}
+),
+registered AS (
+    INSERT INTO {URL_REGISTRY_TABLE_NAME} (source_url, article_id, publication_date)
+    SELECT DISTINCT ON (source_url) source_url, nextval('{TABLE_NAME}_id_seq'), publication_date
+    FROM incoming
+    ORDER BY source_url, publication_date
+    ON CONFLICT (source_url) DO NOTHING
+    RETURNING source_url, article_id
+)
+INSERT INTO {TABLE_NAME} (id, title, source_url, publication_date, content, source_category,
+                          relevance_score, matched_keywords, minhash, cluster_id, is_representative)
+SELECT DISTINCT ON (i.source_url) r.article_id, i.title, i.source_url, i.publication_date, i.content,
+       i.source_category, i.relevance_score, i.matched_keywords, i.minhash, i.cluster_id, i.is_representative
+FROM incoming i
+JOIN registered r USING (source_url)
+ORDER BY i.source_url, i.publication_date
+RETURNING source_url;
+"""
+
+# Single article, skipping it if the URL is already registered
+INSERT_ARTICLE_QUERY = _INSERT_ARTICLES_QUERY.format(values=INSERT_ARTICLES_BATCH_TEMPLATE)
+
+# Multi-row variant used by bulk ingestion; execute_values expands the single VALUES %s
+INSERT_ARTICLES_BATCH_QUERY = _INSERT_ARTICLES_QUERY.format(values='%s')
+
+# A near-duplicate can join a cluster whose representative (earlier in the
+# same batch) was then skipped or failed; the earliest stored member of such a
+# cluster takes its place, so every cluster keeps one representative
+PROMOTE_CLUSTER_REPRESENTATIVES_QUERY = f"""
+UPDATE {TABLE_NAME} a
+SET is_representative = TRUE
+FROM (
+    SELECT DISTINCT ON (n.cluster_id) n.id, n.publication_date
+    FROM {URL_REGISTRY_TABLE_NAME} u
+    JOIN {TABLE_NAME} n ON n.id = u.article_id AND n.publication_date = u.publication_date
+    WHERE u.source_url = ANY(%s) AND n.cluster_id IS NOT NULL AND NOT n.is_representative
+      AND NOT EXISTS (SELECT 1 FROM {TABLE_NAME} r WHERE r.cluster_id = n.cluster_id AND r.is_representative)
+    ORDER BY n.cluster_id, n.publication_date, n.id
+) promoted
+WHERE a.id = promoted.id AND a.publication_date = promoted.publication_date
+RETURNING a.source_url;
+"""
+
+
+# Used to warm the in-memory seen-URL filter and to confirm its positives
+COUNT_ARTICLES_QUERY = f"SELECT count(*) FROM {URL_REGISTRY_TABLE_NAME};"
+
+SELECT_SOURCE_URLS_QUERY = f"SELECT source_url FROM {URL_REGISTRY_TABLE_NAME};"
+
+# Fingerprints of recent articles, used to warm the near-duplicate index
+SELECT_RECENT_FINGERPRINTS_QUERY = f"""
+SELECT minhash, cluster_id, publication_date
+FROM {TABLE_NAME}
+WHERE minhash IS NOT NULL AND publication_date >= %s;
+"""
+
+SELECT_EXISTING_URLS_QUERY = f"""
+SELECT source_url FROM {URL_REGISTRY_TABLE_NAME}
+WHERE source_url = ANY(%s);
+"""
+
+# --- MONTHLY PARTITIONS ---
+# news_article is range-partitioned by publication_date into news_article_pYYYYMM
+PARTITION_PREFIX = f"{TABLE_NAME}_p"
+
+# Creates any missing monthly partition for the given timestamps (NULL means
+# now, like the inserts). The advisory lock is only taken when something is
+# missing, so the common call is a few catalog lookups.
+CREATE_ENSURE_PARTITIONS_FUNCTION_QUERY = f"""
+CREATE OR REPLACE FUNCTION ensure_{TABLE_NAME}_partitions(dates TIMESTAMP[])
+RETURNS INTEGER LANGUAGE plpgsql AS $$
+DECLARE
+    month_start TIMESTAMP;
+    partition_name TEXT;
+    locked BOOLEAN := FALSE;
+    created INTEGER := 0;
+BEGIN
+    FOR month_start IN
+        SELECT DISTINCT date_trunc('month', COALESCE(d, timezone('UTC', now()))) FROM unnest(dates) AS d ORDER BY 1
+    LOOP
+        partition_name := '{PARTITION_PREFIX}' || to_char(month_start, 'YYYYMM');
+        CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+        IF NOT locked THEN
+            PERFORM pg_advisory_xact_lock(73510002);
+            locked := TRUE;
+            CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+        END IF;
+        EXECUTE format('CREATE TABLE %I PARTITION OF {TABLE_NAME} FOR VALUES FROM (%L) TO (%L)',
+                       partition_name, month_start, month_start + interval '1 month');
+        created := created + 1;
+    END LOOP;
+    RETURN created;
+END
+$$;
+"""
+
+ENSURE_PARTITIONS_QUERY = f"SELECT ensure_{TABLE_NAME}_partitions(%s::timestamp[]);"
+
+# The current month and the next %s months
+ENSURE_FUTURE_PARTITIONS_QUERY = f"""
+SELECT ensure_{TABLE_NAME}_partitions(ARRAY(
+    SELECT generate_series(date_trunc('month', timezone('UTC', now())),
+                           date_trunc('month', timezone('UTC', now())) + make_interval(months => %s),
+                           interval '1 month')
+));
+"""
+
+# Monthly partition tables, attached or not (a detached one is mid-archive)
+SELECT_PARTITIONS_QUERY = f"""
+SELECT c.relname, i.inhrelid IS NOT NULL AS attached
+FROM pg_class c
+LEFT JOIN pg_inherits i ON i.inhrelid = c.oid AND i.inhparent = '{TABLE_NAME}'::regclass
+WHERE c.relkind = 'r'
+  AND c.relnamespace = current_schema()::regnamespace
+  AND c.relname ~ '^{PARTITION_PREFIX}[0-9]{{6}}$'
+ORDER BY c.relname;
+"""
+
+
+# --- FEED CACHE ---
+# Conditional-GET validators and body hash per feed URL, so unchanged feeds are skipped
+FEED_CACHE_TABLE_NAME = "feed_cache"
+
+CREATE_FEED_CACHE_TABLE_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {FEED_CACHE_TABLE_NAME} (
+    feed_url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+SELECT_FEED_CACHE_QUERY = f"""
+SELECT feed_url, etag, last_modified, content_hash
+FROM {FEED_CACHE_TABLE_NAME}
+WHERE feed_url = ANY(%s);
+"""
+
+UPSERT_FEED_CACHE_QUERY = f"""
+INSERT INTO {FEED_CACHE_TABLE_NAME} (feed_url, etag, last_modified, content_hash)
+VALUES %s
+ON CONFLICT (feed_url) DO UPDATE SET
+    etag = EXCLUDED.etag,
+    last_modified = EXCLUDED.last_modified,
+    content_hash = EXCLUDED.content_hash,
+    updated_at = timezone('UTC', now());
+"""
+
+
+# --- INGEST GENERATION ---
+# Single-row counter bumped in the same transaction as every ingest that adds
+# rows; API response caches and ETags are keyed on it
+INGEST_GENERATION_TABLE_NAME = "ingest_generation"
+
+CREATE_INGEST_GENERATION_TABLE_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {INGEST_GENERATION_TABLE_NAME} (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    generation BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO {INGEST_GENERATION_TABLE_NAME} (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+"""
+
+SELECT_INGEST_GENERATION_QUERY = f"SELECT generation FROM {INGEST_GENERATION_TABLE_NAME} WHERE id = 1;"
+
+BUMP_INGEST_GENERATION_QUERY = f"""
+UPDATE {INGEST_GENERATION_TABLE_NAME}
+SET generation = generation + 1, updated_at = timezone('UTC', now())
+WHERE id = 1
+RETURNING generation;
+"""
+
+
+# --- SCRAPER RUNS ---
+# One row per collection run. The partial unique index allows a single
+# 'running' row at a time (single flight); a crashed run stops renewing its
+# lease and is marked abandoned by the next claim.
+RUN_TABLE_NAME = "scraper_run"
+
+CREATE_RUN_TABLE_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {RUN_TABLE_NAME} (
+    id SERIAL PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'running',  -- running | succeeded | failed | abandoned
+    trigger TEXT,                            -- E.g., 'cron', 'http', 'http-sync', 'cli'
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP,
+    lease_expires_at TIMESTAMP NOT NULL,
+    stages JSONB NOT NULL DEFAULT '[]'::jsonb,
+    summary JSONB,
+    error TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_{RUN_TABLE_NAME}_single_flight
+    ON {RUN_TABLE_NAME} ((true)) WHERE status = 'running';
+"""
+
+EXPIRE_RUN_LEASES_QUERY = f"""
+UPDATE {RUN_TABLE_NAME}
+SET status = 'abandoned', finished_at = timezone('UTC', now()), error = 'lease expired'
+WHERE status = 'running' AND lease_expires_at < timezone('UTC', now());
+"""
+
+CLAIM_RUN_QUERY = f"""
+INSERT INTO {RUN_TABLE_NAME} (trigger, lease_expires_at)
+VALUES (%s, timezone('UTC', now()) + %s * interval '1 second')
+ON CONFLICT DO NOTHING
+RETURNING id;
+"""
+
+SELECT_RUNNING_RUN_QUERY = f"SELECT id FROM {RUN_TABLE_NAME} WHERE status = 'running';"
+
+RECORD_RUN_STAGE_QUERY = f"""
+UPDATE {RUN_TABLE_NAME}
+SET stages = stages || %s::jsonb,
+    lease_expires_at = timezone('UTC', now()) + %s * interval '1 second'
+WHERE id = %s;
+"""
+
+# Heartbeat of a running run; no row means it was finished or its lease expired
+RENEW_RUN_LEASE_QUERY = f"""
+UPDATE {RUN_TABLE_NAME}
+SET lease_expires_at = timezone('UTC', now()) + %s * interval '1 second'
+WHERE id = %s AND status = 'running';
+"""
+
+FINISH_RUN_QUERY = f"""
+UPDATE {RUN_TABLE_NAME}
+SET status = %s, finished_at = timezone('UTC', now()), summary = %s::jsonb, error = %s
+WHERE id = %s AND status = 'running';
+"""
+
+SELECT_RUN_QUERY = f"""
+SELECT id, status, trigger, started_at, finished_at, lease_expires_at, stages, summary, error
+FROM {RUN_TABLE_NAME}
+WHERE id = %s;
+"""
+
+
+# --- COLLECTOR WATERMARKS ---
+# Newest publication_date (and its URL) seen per source, keyed like
+# 'google:<query>' or 'nitter:<handle>'; older entries are skipped next run
+WATERMARK_TABLE_NAME = "collector_watermark"
+
+CREATE_WATERMARK_TABLE_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE_NAME} (
+    source_key TEXT PRIMARY KEY,
+    last_published_at TIMESTAMP NOT NULL,
+    last_url TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+SELECT_WATERMARKS_QUERY = f"""
+SELECT source_key, last_published_at, last_url
+FROM {WATERMARK_TABLE_NAME}
+WHERE source_key = ANY(%s);
+"""
+
+# Never moves a watermark backwards, even if two runs overlap
+UPSERT_WATERMARKS_QUERY = f"""
+INSERT INTO {WATERMARK_TABLE_NAME} (source_key, last_published_at, last_url)
+VALUES %s
+ON CONFLICT (source_key) DO UPDATE SET
+    last_published_at = GREATEST({WATERMARK_TABLE_NAME}.last_published_at, EXCLUDED.last_published_at),
+    last_url = CASE WHEN EXCLUDED.last_published_at >= {WATERMARK_TABLE_NAME}.last_published_at
+                    THEN EXCLUDED.last_url ELSE {WATERMARK_TABLE_NAME}.last_url END,
+    updated_at = timezone('UTC', now());
+"""
+
+
+
+# --- SOURCE HEALTH ---
+# Circuit breaker and adaptive rate per feed host (collectors/source_health.py),
+# kept between runs so a host that is down isn't retried on every run.
+SOURCE_HEALTH_TABLE_NAME = "source_health"
+
+CREATE_SOURCE_HEALTH_TABLE_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {SOURCE_HEALTH_TABLE_NAME} (
+    host TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'closed',    -- closed | open | half_open
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    opened_until TIMESTAMP,
+    open_seconds REAL NOT NULL,
+    rate_per_second REAL NOT NULL,
+    latency_ms REAL,
+    last_error TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+SELECT_SOURCE_HEALTH_QUERY = f"""
+SELECT host, state, consecutive_failures, opened_until, open_seconds, rate_per_second, latency_ms, last_error
+FROM {SOURCE_HEALTH_TABLE_NAME};
+"""
+
+UPSERT_SOURCE_HEALTH_QUERY = f"""
+INSERT INTO {SOURCE_HEALTH_TABLE_NAME}
+    (host, state, consecutive_failures, opened_until, open_seconds, rate_per_second, latency_ms, last_error)
+VALUES %s
+ON CONFLICT (host) DO UPDATE SET
+    state = EXCLUDED.state,
+    consecutive_failures = EXCLUDED.consecutive_failures,
+    opened_until = EXCLUDED.opened_until,
+    open_seconds = EXCLUDED.open_seconds,
+    rate_per_second = EXCLUDED.rate_per_second,
+    latency_ms = EXCLUDED.latency_ms,
+    last_error = EXCLUDED.last_error,
+    updated_at = timezone('UTC', now());
+"""
+
+# --- DIGEST SUBSCRIBERS ---
+# categories are source_category prefixes ('External-GoogleNews', 'Social-X', 'Social'),
+# keywords are relevance terms (matched_keywords); an empty list means "all"
+SUBSCRIBER_TABLE_NAME = "subscriber"
+DELIVERY_TABLE_NAME = "digest_delivery"
+
+CREATE_SUBSCRIBER_TABLES_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {SUBSCRIBER_TABLE_NAME} (
+    id SERIAL PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT,
+    categories TEXT[] NOT NULL DEFAULT '{{}}',
+    keywords TEXT[] NOT NULL DEFAULT '{{}}',
+    active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- One row per (digest, subscriber); status 'sent' is never sent again
+CREATE TABLE IF NOT EXISTS {DELIVERY_TABLE_NAME} (
+    digest_key TEXT NOT NULL,
+    subscriber_id INTEGER NOT NULL REFERENCES {SUBSCRIBER_TABLE_NAME} (id) ON DELETE CASCADE,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    message_id TEXT,
+    error_message TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (digest_key, subscriber_id)
+);
+"""
+
+UPSERT_SUBSCRIBER_QUERY = f"""
+INSERT INTO {SUBSCRIBER_TABLE_NAME} (email, name, categories, keywords)
+VALUES (%s, %s, %s, %s)
+ON CONFLICT (email) DO UPDATE SET
+    name = EXCLUDED.name,
+    categories = EXCLUDED.categories,
+    keywords = EXCLUDED.keywords,
+    active = TRUE
+RETURNING id;
+"""
+
+DEACTIVATE_SUBSCRIBER_QUERY = f"UPDATE {SUBSCRIBER_TABLE_NAME} SET active = FALSE WHERE email = %s;"
+
+# Registers every active subscriber for the digest, then returns the ones it
+# still has to reach (a retry of the same digest_key skips 'sent' rows)
+PENDING_DELIVERIES_QUERY = f"""
+WITH registered AS (
+    INSERT INTO {DELIVERY_TABLE_NAME} (digest_key, subscriber_id)
+    SELECT %(digest_key)s, id FROM {SUBSCRIBER_TABLE_NAME} WHERE active
+    ON CONFLICT (digest_key, subscriber_id) DO NOTHING
+)
+SELECT s.id, s.email, s.name, s.categories, s.keywords
+FROM {SUBSCRIBER_TABLE_NAME} s
+LEFT JOIN {DELIVERY_TABLE_NAME} d ON d.subscriber_id = s.id AND d.digest_key = %(digest_key)s
+WHERE s.active AND d.status IS DISTINCT FROM 'sent'
+ORDER BY s.id;
+"""
+
+RECORD_DELIVERIES_QUERY = f"""
+UPDATE {DELIVERY_TABLE_NAME}
+SET status = %s, message_id = %s, error_message = %s,
+    attempts = attempts + 1, updated_at = timezone('UTC', now())
+WHERE digest_key = %s AND subscriber_id = ANY(%s) AND status <> 'sent';
+"""
+
+COUNT_ACTIVE_SUBSCRIBERS_QUERY = f"SELECT count(*) FROM {SUBSCRIBER_TABLE_NAME} WHERE active;"
+
+# Recipients of a queued send that already got the digest (a retried job skips them)
+SELECT_SENT_SUBSCRIBERS_QUERY = f"""
+SELECT subscriber_id FROM {DELIVERY_TABLE_NAME}
+WHERE digest_key = %s AND subscriber_id = ANY(%s) AND status = 'sent';
+"""
+
+
+# --- DAILY STATS ROLLUP ---
+# Articles per (day, source_category, keyword), maintained by insert_articles()
+# in the same transaction as the rows it counts. keyword '' is the row for all
+# articles of that day and category; the others count matched_keywords.
+# History is kept when partitions are archived.
+DAILY_STATS_TABLE_NAME = "article_daily_stats"
+
+CREATE_DAILY_STATS_TABLE_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {DAILY_STATS_TABLE_NAME} (
+    day DATE NOT NULL,
+    source_category TEXT NOT NULL,
+    keyword TEXT NOT NULL DEFAULT '',
+    articles INTEGER NOT NULL DEFAULT 0,
+    representatives INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, source_category, keyword)
+);
+"""
+
+# Rows -> (day, category, keyword) counts; {source} / {where} pick the articles
+_DAILY_STATS_ROLLUP = f"""
+INSERT INTO {DAILY_STATS_TABLE_NAME} (day, source_category, keyword, articles, representatives)
+SELECT a.publication_date::date, a.source_category, kw,
+       count(*), count(*) FILTER (WHERE a.is_representative)
+FROM {{source}}
+CROSS JOIN LATERAL unnest(array_prepend(''::text, a.matched_keywords)) AS kw
+{{where}}
+GROUP BY 1, 2, 3
+ORDER BY 1, 2, 3
+ON CONFLICT (day, source_category, keyword) DO UPDATE SET
+    articles = {DAILY_STATS_TABLE_NAME}.articles + EXCLUDED.articles,
+    representatives = {DAILY_STATS_TABLE_NAME}.representatives + EXCLUDED.representatives,
+    updated_at = timezone('UTC', now());
+"""
+
+# Initial fill from everything already stored (migration 12)
+BUILD_DAILY_STATS_QUERY = _DAILY_STATS_ROLLUP.format(source=f"{TABLE_NAME} a", where="")
+
+# Adds the articles just inserted for the given URLs (registry PK lookup, then
+# the article by its (id, publication_date) primary key)
+UPDATE_DAILY_STATS_QUERY = _DAILY_STATS_ROLLUP.format(
+    source=f"{URL_REGISTRY_TABLE_NAME} u JOIN {TABLE_NAME} a "
+           f"ON a.id = u.article_id AND a.publication_date = u.publication_date",
+    where="WHERE u.source_url = ANY(%s)",
+)
+
+SELECT_CATEGORY_STATS_QUERY = f"""
+SELECT day, source_category, articles, representatives
+FROM {DAILY_STATS_TABLE_NAME}
+WHERE keyword = '' AND day >= %s AND day <= %s AND source_category LIKE %s
+ORDER BY day, source_category;
+"""
+
+SELECT_KEYWORD_STATS_QUERY = f"""
+SELECT day, keyword, sum(articles)::integer AS articles, sum(representatives)::integer AS representatives
+FROM {DAILY_STATS_TABLE_NAME}
+WHERE keyword <> '' AND day >= %s AND day <= %s AND source_category LIKE %s
+GROUP BY day, keyword
+ORDER BY day, keyword;
+"""
+
+
+# --- JOB QUEUE ---
+# Durable work queue for the decoupled pipeline (utils/job_queue.py): one row
+# per feed fetch, ingest batch or digest send. Workers claim ready rows with
+# FOR UPDATE SKIP LOCKED, so any number of worker processes can poll the same
+# table without handing out a job twice. A claimed job carries a lease; if
+# its worker dies the lease expires and the job is queued again. Jobs that
+# run out of attempts stay in the table as status 'dead' (the dead letters).
+JOB_TABLE_NAME = "job_queue"
+
+CREATE_JOB_QUEUE_TABLE_QUERY = f"""
+CREATE TABLE IF NOT EXISTS {JOB_TABLE_NAME} (
+    id BIGSERIAL PRIMARY KEY,
+    job_type TEXT NOT NULL,                  -- fetch_feed | ingest_batch | build_digest | send_digest
+    payload JSONB NOT NULL DEFAULT '{{}}'::jsonb,
+    batch TEXT,                              -- Jobs enqueued by the same collection round
+    dedupe_key TEXT,                         -- At most one unfinished job per key
+    status TEXT NOT NULL DEFAULT 'queued',   -- queued | running | succeeded | dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by TEXT,
+    lease_expires_at TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+-- Partial indexes: only the rows workers poll for are indexed, so the
+-- finished backlog doesn't slow the claim down
+CREATE INDEX IF NOT EXISTS idx_{JOB_TABLE_NAME}_ready
+    ON {JOB_TABLE_NAME} (run_after, id) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_{JOB_TABLE_NAME}_leases
+    ON {JOB_TABLE_NAME} (lease_expires_at) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_{JOB_TABLE_NAME}_unfinished_batch
+    ON {JOB_TABLE_NAME} (batch, job_type) WHERE status IN ('queued', 'running');
+CREATE UNIQUE INDEX IF NOT EXISTS idx_{JOB_TABLE_NAME}_dedupe
+    ON {JOB_TABLE_NAME} (dedupe_key) WHERE status IN ('queued', 'running');
+"""
+
+# execute_values template: (job_type, payload, batch, dedupe_key, max_attempts, delay_seconds)
+ENQUEUE_JOBS_TEMPLATE = "(%s, %s::jsonb, %s, %s, %s, timezone('UTC', now()) + %s * interval '1 second')"
+
+ENQUEUE_JOBS_QUERY = f"""
+INSERT INTO {JOB_TABLE_NAME} (job_type, payload, batch, dedupe_key, max_attempts, run_after)
+VALUES %s
+ON CONFLICT (dedupe_key) WHERE status IN ('queued', 'running') DO NOTHING
+RETURNING id;
+"""
+
+# Jobs whose worker stopped renewing the lease: back to the queue, or dead
+# if that was their last attempt (a job that keeps killing workers must not
+# loop forever)
+EXPIRE_JOB_LEASES_QUERY = f"""
+UPDATE {JOB_TABLE_NAME}
+SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,
+    finished_at = CASE WHEN attempts >= max_attempts THEN timezone('UTC', now()) END,
+    last_error = 'lease expired on worker ' || coalesce(locked_by, '?'),
+    locked_by = NULL, lease_expires_at = NULL
+WHERE status = 'running' AND lease_expires_at < timezone('UTC', now());
+"""
+
+# SKIP LOCKED: rows another worker is claiming right now are passed over
+# instead of waited on
+CLAIM_JOBS_QUERY = f"""
+UPDATE {JOB_TABLE_NAME} j
+SET status = 'running', attempts = j.attempts + 1, locked_by = %(worker)s,
+    lease_expires_at = timezone('UTC', now()) + %(lease_seconds)s * interval '1 second'
+FROM (
+    SELECT id FROM {JOB_TABLE_NAME}
+    WHERE status = 'queued' AND run_after <= timezone('UTC', now())
+      AND (%(job_types)s::text[] IS NULL OR job_type = ANY(%(job_types)s::text[]))
+    ORDER BY run_after, id
+    LIMIT %(limit)s
+    FOR UPDATE SKIP LOCKED
+) ready
+WHERE j.id = ready.id
+RETURNING j.id, j.job_type, j.payload, j.batch, j.attempts, j.max_attempts;
+"""
+
+# The locked_by check keeps a worker whose lease already expired from
+# finishing a job that was handed to someone else
+COMPLETE_JOB_QUERY = f"""
+UPDATE {JOB_TABLE_NAME}
+SET status = 'succeeded', finished_at = timezone('UTC', now()), last_error = NULL,
+    locked_by = NULL, lease_expires_at = NULL
+WHERE id = %s AND locked_by = %s AND status = 'running';
+"""
+
+RETRY_JOB_QUERY = f"""
+UPDATE {JOB_TABLE_NAME}
+SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,
+    finished_at = CASE WHEN attempts >= max_attempts THEN timezone('UTC', now()) END,
+    run_after = timezone('UTC', now()) + %s * interval '1 second',
+    last_error = %s, locked_by = NULL, lease_expires_at = NULL
+WHERE id = %s AND locked_by = %s AND status = 'running'
+RETURNING status;
+"""
+
+# Waiting on other jobs isn't a failure: the attempt is given back
+DEFER_JOB_QUERY = f"""
+UPDATE {JOB_TABLE_NAME}
+SET status = 'queued', attempts = attempts - 1,
+    run_after = timezone('UTC', now()) + %s * interval '1 second',
+    locked_by = NULL, lease_expires_at = NULL
+WHERE id = %s AND locked_by = %s AND status = 'running';
+"""
+
+COUNT_UNFINISHED_BATCH_JOBS_QUERY = f"""
+SELECT count(*) FROM {JOB_TABLE_NAME}
+WHERE batch = %s AND job_type = ANY(%s) AND status IN ('queued', 'running');
+"""
+
+SELECT_JOB_COUNTS_QUERY = f"""
+SELECT job_type, status, count(*) FROM {JOB_TABLE_NAME}
+GROUP BY job_type, status
+ORDER BY job_type, status;
+"""
+
+SELECT_DEAD_JOBS_QUERY = f"""
+SELECT id, job_type, batch, attempts, last_error, created_at, finished_at
+FROM {JOB_TABLE_NAME}
+WHERE status = 'dead'
+ORDER BY finished_at DESC, id DESC
+LIMIT %s;
+"""
+
+# Dead jobs go back with a fresh set of attempts, unless a newer job with the
+# same dedupe_key is already waiting
+REQUEUE_DEAD_JOBS_QUERY = f"""
+UPDATE {JOB_TABLE_NAME} j
+SET status = 'queued', attempts = 0, run_after = timezone('UTC', now()), finished_at = NULL
+WHERE j.status = 'dead' AND (%(all)s OR j.id = ANY(%(ids)s))
+  AND NOT EXISTS (
+      SELECT 1 FROM {JOB_TABLE_NAME} q
+      WHERE q.dedupe_key = j.dedupe_key AND q.status IN ('queued', 'running')
+  )
+RETURNING j.id;
+"""
+
+PURGE_SUCCEEDED_JOBS_QUERY = f"""
+DELETE FROM {JOB_TABLE_NAME}
+WHERE status = 'succeeded' AND finished_at < timezone('UTC', now()) - %s * interval '1 day';
+"""
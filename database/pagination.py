@@ -0,0 +1,34 @@
+# database/pagination.py
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(*values) -> str:
+    """Packs the sort key of the last row on a page into an opaque, URL-safe token."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, *types):
+    """Unpacks a token from encode_cursor(), converting each value with `types`.
+
+    Raises ValueError for anything that isn't a cursor we issued.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}") from None
+
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise ValueError("Invalid cursor")
+
+    values = []
+    for value, value_type in zip(payload, types):
+        try:
+            values.append(datetime.fromisoformat(value) if value_type is datetime else value_type(value))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor") from None
+    return tuple(values)
@@ -0,0 +1,46 @@
+# database/records.py
+"""
+The article record shared by the collectors, the insert path and the readers.
+
+Parsers build Article objects, the clusterer fills in the fingerprint
+fields, insert_articles() sends row() to Postgres and both connectors build
+listing results with from_row(). Slots keep the many thousands of records
+a backfill or the digest holds compact, and attribute access replaces the
+positional tuple indexes and dict(row) copies used before.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+
+@dataclass(slots=True)
+class Article:
+    """One news article; the first ten fields are the INSERT column order."""
+    title: str
+    source_url: str
+    publication_date: Optional[datetime]
+    content: Optional[str]
+    source_category: str
+    relevance_score: float = 0.0
+    matched_keywords: List[str] = field(default_factory=list)
+    minhash: Optional[List[int]] = None
+    cluster_id: Optional[int] = None
+    is_representative: bool = True
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    def row(self):
+        """(title, url, date, content, category, relevance_score, matched_keywords, minhash, cluster_id,
+        is_representative), as INSERT_ARTICLE_QUERY and INSERT_ARTICLES_BATCH_TEMPLATE take it."""
+        return (self.title, self.source_url, self.publication_date, self.content, self.source_category,
+                self.relevance_score, self.matched_keywords, self.minhash, self.cluster_id,
+                self.is_representative)
+
+    @classmethod
+    def from_row(cls, row):
+        """Builds an Article from a row (tuple or asyncpg record) in ARTICLE_COLUMNS order."""
+        (id, title, source_url, publication_date, content, source_category, created_at,
+         relevance_score, matched_keywords, cluster_id, is_representative) = row
+        return cls(title, source_url, publication_date, content, source_category, relevance_score,
+                   matched_keywords, None, cluster_id, is_representative, id, created_at)
@@ -0,0 +1,122 @@
+# retention.py
+"""
+Retention and archival for the monthly news_article partitions.
+
+Creates the upcoming partitions, then archives every partition older than
+the retention window: it is detached from news_article (so queries and
+indexes no longer see it), dumped to ARCHIVE_DIR/news_article_pYYYYMM.csv.gz
+(ARTICLE_COLUMNS, CSV with a header) and dropped. A partition left detached
+by an interrupted run is picked up and finished by the next one.
+
+URLs of archived articles stay in the article_url registry, so the
+collectors do not store those stories again.
+
+Meant to run daily from cron or the platform scheduler:
+    python retention.py                      # keep RETENTION_MONTHS months
+    python retention.py --keep-months 12 --archive-dir /mnt/archive --dry-run
+"""
+
+import argparse
+import gzip
+import logging
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from database.db_connector import (
+    connect, ensure_future_partitions, fetch_partitions, detach_partition, copy_partition, drop_partition,
+    PARTITION_MONTHS_AHEAD,
+)
+from database.models import PARTITION_PREFIX
+from collectors.normalize import utcnow
+from utils.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# --- RETENTION CONFIGURATION ---
+RETENTION_MONTHS = int(os.getenv('RETENTION_MONTHS', '24'))  # Months kept online, current month included
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive'))
+
+
+def partition_month(partition_name: str) -> datetime:
+    """news_article_p202401 -> 2024-01-01."""
+    return datetime.strptime(partition_name[len(PARTITION_PREFIX):], '%Y%m')
+
+
+def retention_cutoff(keep_months: int, now: datetime = None) -> datetime:
+    """First day of the oldest month kept online."""
+    now = now or utcnow()
+    months = now.year * 12 + now.month - 1 - (keep_months - 1)
+    return datetime(months // 12, months % 12 + 1, 1)
+
+
+def archive_partition(conn, partition_name: str, archive_dir: str, attached: bool) -> str:
+    """Detaches (if needed), dumps and drops one partition; returns the archive path."""
+    if attached:
+        detach_partition(conn, partition_name)
+        logger.info("Detached %s", partition_name)
+
+    path = os.path.join(archive_dir, f"{partition_name}.csv.gz")
+    partial = f"{path}.partial"
+    with gzip.open(partial, 'wt', encoding='utf-8', newline='') as out:
+        copy_partition(conn, partition_name, out)
+    os.replace(partial, path)  # Only a complete dump gets the final name
+
+    drop_partition(conn, partition_name)
+    logger.info("Archived %s to %s (%d bytes)", partition_name, path, os.path.getsize(path),
+                extra={'partition': partition_name, 'archive': path})
+    return path
+
+
+def run_retention(conn, keep_months: int = RETENTION_MONTHS, archive_dir: str = ARCHIVE_DIR,
+                  months_ahead: int = PARTITION_MONTHS_AHEAD, dry_run: bool = False):
+    """Creates upcoming partitions and archives the expired ones; returns the archived names."""
+    if not dry_run:
+        ensure_future_partitions(conn, months_ahead)
+
+    cutoff = retention_cutoff(keep_months)
+    expired = [(name, attached) for name, attached in fetch_partitions(conn)
+               if not attached or partition_month(name) < cutoff]
+    if not expired:
+        logger.info("No partitions older than %s", cutoff.strftime('%Y-%m'))
+        return []
+    if dry_run:
+        for name, attached in expired:
+            logger.info("Would archive %s%s", name, "" if attached else " (already detached)")
+        return []
+
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = []
+    for name, attached in expired:
+        archive_partition(conn, name, archive_dir, attached)
+        archived.append(name)
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keep-months', type=int, default=RETENTION_MONTHS,
+                        help="months kept online, current month included")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help="where .csv.gz dumps are written")
+    parser.add_argument('--months-ahead', type=int, default=PARTITION_MONTHS_AHEAD,
+                        help="upcoming monthly partitions to create")
+    parser.add_argument('--dry-run', action='store_true', help="list what would be archived, change nothing")
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.keep_months < 1:
+        sys.exit("❌ --keep-months must be at least 1")
+
+    conn = connect()
+    if conn is None:
+        sys.exit("❌ No database connection, retention aborted")
+    try:
+        archived = run_retention(conn, args.keep_months, args.archive_dir, args.months_ahead, args.dry_run)
+    finally:
+        conn.close()
+    print(f"📦 Archived {len(archived)} partition(s) to {args.archive_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,163 +2,153 @@
 
 import sys
 import os
-from datetime import datetime, timedelta  # ← MOVED TO TOP, ADDED timedelta
+import logging
+from datetime import timedelta  # ← MOVED TO TOP, ADDED timedelta
 
 # Add the project root to the path for correct imports
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 # All imports together at the top (clean and organized)
-from database.db_connector import connect, fetch_news_by_date_range  # ← FIXED THIS
+from database.db_connector import borrow_connection, fetch_news_by_date_range, count_active_subscribers
 from collectors.external_api import scrape_google_news, scrape_twitter_nitter 
+from collectors.normalize import utcnow
 from utils.email_sender import send_news_digest
+from utils.digest_renderer import render_digest
+from utils.digest_fanout import (
+    fan_out_digest, DIGEST_CANDIDATE_LIMIT, DIGEST_MAX_ARTICLES, DIGEST_REPRESENTATIVES_ONLY,
+)
+from utils.run_coordinator import start_run, RunTracker
+from utils.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
 
 
 def format_news_to_html(news_list: list) -> str:
     """Creates a professional HTML email that avoids spam filters."""
-    if not news_list:
-        return """
-        <!DOCTYPE html>
-        <html lang="en">
-        <head><meta charset="UTF-8"></head>
-        <body style="font-family: Arial, sans-serif; padding: 10px;">
-            <h3>No new regulatory news found in this period.</h3>
-        </body>
-        </html>
-        """
-    
-    # Professional HTML structure with proper DOCTYPE
-    html = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Regulatory News Digest</title>
-    </head>
-    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; background-color: #f4f4f4; margin: 0; padding: 20px;">
-        
-            
-            <!-- Header -->
-            <div style="border-bottom: 3px solid #3498db; padding-bottom: 15px; margin-bottom: 25px;">
-                <h2 style="color: #2c3e50; margin: 0; font-size: 24px;">📰 Regulatory News Digest</h2>
-                <p style="color: #7f8c8d; margin: 5px 0 0 0; font-size: 14px;">Latest financial regulatory updates</p>
-            </div>
-            
-            <!-- Introduction -->
-            <p style="font-size: 12px; color: #555; margin-bottom: 20px;">
-                Here are the latest regulatory news articles from the past week:
-            </p>
-            
-            <!-- News Items -->
-    """
-    
-    for item in news_list:
-        title = item.get('title', 'No Title')
-        source = item.get('source_category', 'Unknown Source')
-        url = item.get('source_url', '#')
-        
-        # Format date nicely
-        pub_date = item.get('publication_date')
-        if pub_date:
-            pub_date_str = pub_date.strftime('%B %d, %Y')
-        else:
-            pub_date_str = 'Date unknown'
-
-        html += f"""
-            <div style="border: 1px solid #e0e0e0; padding: 17px; margin-bottom: 15px; border-radius: 5px; background-color: #fafafa;">
-                <div style="margin-bottom: 8px;">
-                    <a href="{url}" target="_blank" style="color: #2980b9; text-decoration: none; font-weight: bold; font-size: 14px; line-height: 1.4;">
-                        {title}
-                    </a>
-                </div>
-                <div style="font-size: 12px; color: #666;">
-                    <span style="color: #e74c3c; font-weight: 300;">📌 {source}</span>
-                    <span style="color: #95a5a6;"> • </span>
-                    <span style="color: #27ae60;"> {pub_date_str}</span>
-                </div>
-            </div>
-        """
-    
-    html += f"""
-            <!-- Footer -->
-            <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #e0e0e0; text-align: center;">
-                <p style="font-size: 12px; color: #999; margin: 5px 0;">
-                    This is an automated regulatory news digest
-                </p>
-                <p style="font-size: 12px; color: #999; margin: 5px 0;">
-                    You are receiving this because you subscribed to financial news updates
-                </p>
-                <p style="font-size: 11px; color: #bbb; margin: 15px 0 0 0;">
-                    Total articles: {len(news_list)} | Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
-                </p>
-            </div>
-            
-        
-    </body>
-    </html>
+    return render_digest(news_list).html
+
+def collector_totals(summary: dict) -> dict:
+    """Condenses a collector summary into the counts stored on the run."""
+    return {
+        'cache_hits': summary['cache_hits'],
+        'cache_misses': summary['cache_misses'],
+        'errors': summary['errors'],
+        'watermark_skipped': summary['watermark_skipped'],
+        'known_skipped': summary['known_skipped'],
+        'batch_duplicates': summary['batch_duplicates'],
+        'near_duplicates': summary['near_duplicates'],
+        'inserted': sum(stats['inserted'] for stats in summary['batches']),
+        'skipped': sum(stats['skipped'] for stats in summary['batches']),
+        'failed': sum(stats['failed'] for stats in summary['batches']),
+    }
+
+def log_collector_summary(name: str, summary: dict):
+    """Logs feed cache hits/misses and insert counts for one collector."""
+    totals = collector_totals(summary)
+    logger.info("%s: %d feeds unchanged (cache hit), %d changed (cache miss), %d failed; "
+                "%d entries below watermark, %d known URLs filtered, %d repeated within the run, "
+                "%d articles inserted (%d near-duplicates clustered), %d duplicates skipped",
+                name, totals['cache_hits'], totals['cache_misses'], totals['errors'],
+                totals['watermark_skipped'], totals['known_skipped'], totals['batch_duplicates'],
+                totals['inserted'], totals['near_duplicates'], totals['skipped'],
+                extra={'collector': name, **totals})
+    for feed, result in summary['feeds'].items():
+        logger.debug("%-5s %s", result, feed)
+
+def run_all_collectors(run_id=None, trigger: str = "cli"):
+    """Borrows a pooled DB connection, runs collectors, and logs the start/end time.
+
+    Only one run executes at a time. Callers that already claimed a run (the
+    web triggers) pass its `run_id`; otherwise the run is claimed here and the
+    call returns immediately if another run is in flight. Per-stage timings
+    are recorded on the run row (see /runs/{id}).
     """
-    return html
+    if run_id is None:
+        run_id, in_flight_id = start_run(trigger)
+        if run_id is None:
+            if in_flight_id:
+                logger.info("Run %d is already in progress. Skipping this trigger.", in_flight_id)
+            else:
+                logger.error("Could not register the run (database unavailable). Skipping scrape.")
+            return None
 
-def run_all_collectors():
-    """Connects to DB, runs collectors, and logs the start/end time."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"--- Scheduler: Starting Collection Run at {timestamp} ---")
+    tracker = RunTracker(run_id)
+    run_summary = {}
+    logger.info("Starting collection run %d", run_id, extra={'run_id': run_id})
     
-    db_conn = None
     try:
-        # 1. Connect to the database
-        db_conn = connect()
-        if not db_conn:
-            print("ERROR: Could not establish database connection. Skipping scrape.")
-            return
-
-        # 2. Run the collectors
-        print("Running Google News scraper...")
-        scrape_google_news(db_conn)
-        print("Google News scraper completed")
-        
-        print("Running Twitter/Nitter scraper...")
-        scrape_twitter_nitter(db_conn)
-        print("Twitter/Nitter scraper completed")
-
-        # 3. Fetch and send email - GET NEWS FROM LAST 7 DAYS
-        if db_conn:
+        # 1. Borrow a connection from the shared pool (returned automatically);
+        #    stage timings are recorded on it too
+        with borrow_connection() as db_conn, tracker.attached(db_conn):
+            if not db_conn:
+                logger.error("Could not establish database connection. Skipping scrape.")
+                tracker.finish("failed", error_message="database unavailable")
+                return run_id
+
+            # 2. Run the collectors
+            with tracker.stage("google_news"):
+                google_summary = scrape_google_news(db_conn)
+            
+            with tracker.stage("nitter"):
+                nitter_summary = scrape_twitter_nitter(db_conn)
+
+            log_collector_summary("Google News", google_summary)
+            log_collector_summary("Twitter/Nitter", nitter_summary)
+            run_summary['google_news'] = collector_totals(google_summary)
+            run_summary['nitter'] = collector_totals(nitter_summary)
+
+            # 3. Fetch and send email - GET NEWS FROM LAST 7 DAYS
             try:
-                print("Fetching news from the last 7 days...")
-                
                 # Calculate date 7 days ago
-                seven_days_ago = datetime.now() - timedelta(days=7)
+                seven_days_ago = utcnow() - timedelta(days=7)
+                current_date = utcnow().strftime("%Y-%m-%d")
+                subject = f"Regulatory News Digest for {current_date}"
+
+                # Subscribers get filtered digests from a wider candidate set;
+                # without any, the single RECIPIENT_EMAIL digest is sent as before
+                subscribers = count_active_subscribers(db_conn)
                 
                 # Fetch news from last 7 days
-                latest_news = fetch_news_by_date_range(db_conn, seven_days_ago, limit=50)
+                with tracker.stage("fetch_digest"):
+                    latest_news = fetch_news_by_date_range(
+                        db_conn, seven_days_ago, limit=DIGEST_CANDIDATE_LIMIT if subscribers else DIGEST_MAX_ARTICLES,
+                        representatives_only=DIGEST_REPRESENTATIVES_ONLY
+                    )
+                if latest_news is None:
+                    raise RuntimeError("could not load the digest articles")
                 
-                print(f"Found {len(latest_news)} articles from the last 7 days")
+                logger.info("Found %d articles from the last 7 days", len(latest_news))
+                run_summary['digest_articles'] = len(latest_news)
                 
                 if not latest_news:
-                    print("⚠️ No news found in database!")
+                    logger.warning("No news found in database, digest not sent")
+                elif subscribers:
+                    # One delivery per subscriber per day; a re-run skips those already sent
+                    with tracker.stage("send_digest"):
+                        run_summary['digest'] = fan_out_digest(db_conn, latest_news, current_date, subject)
                 else:
                     # Format email
-                    email_body = format_news_to_html(latest_news)
+                    with tracker.stage("render_digest"):
+                        digest = render_digest(latest_news)
                     
                     # Send email
-                    current_date = datetime.now().strftime("%Y-%m-%d")
-                    print(f"Sending email digest with {len(latest_news)} articles...")
-                    send_news_digest(f"Regulatory News Digest for {current_date}", email_body)
+                    logger.info("Sending email digest with %d articles", len(latest_news))
+                    with tracker.stage("send_digest"):
+                        send_news_digest(subject, digest.html, digest.text)
 
             except Exception as e:
-                print(f"ERROR: Failed to fetch/send email digest: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Failed to fetch/send email digest: %s", e)
+                run_summary['digest_error'] = str(e)
                 
-        print(f"--- Scheduler: Collection Run Finished at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ---")
+        tracker.finish("succeeded", run_summary)
+        logger.info("Collection run %d finished", run_id, extra={'run_id': run_id})
 
     except Exception as e:
-        print(f"FATAL ERROR during scheduled run: {e}")
-        import traceback
-        traceback.print_exc()
-    finally:
-        if db_conn:
-            db_conn.close()
+        logger.exception("Fatal error during scheduled run %d: %s", run_id, e)
+        tracker.finish("failed", run_summary, str(e))
+
+    return run_id
             
 if __name__ == '__main__':
-    run_all_collectors()
\ No newline at end of file
+    configure_logging()
+    run_all_collectors(trigger="cli")
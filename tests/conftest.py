@@ -0,0 +1,74 @@
+# tests/conftest.py
+"""
+Shared fixtures.
+
+The unit tests need nothing beyond the requirements. The database tests run
+against a real PostgreSQL server: set TEST_DATABASE_URL to a role that may
+create databases (e.g. postgresql://postgres@127.0.0.1:5432/postgres). A
+scratch database is created on that server for the session, migrated from
+scratch and dropped afterwards; without TEST_DATABASE_URL those tests are
+skipped.
+"""
+
+import os
+import sys
+from urllib.parse import urlparse, urlunparse
+
+import psycopg2
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.db_connector import _open_connection
+from database.migrations import apply_migrations
+from database.models import (
+    TABLE_NAME, URL_REGISTRY_TABLE_NAME, DAILY_STATS_TABLE_NAME, FEED_CACHE_TABLE_NAME, WATERMARK_TABLE_NAME,
+    JOB_TABLE_NAME, SUBSCRIBER_TABLE_NAME, DELIVERY_TABLE_NAME, SOURCE_HEALTH_TABLE_NAME, RUN_TABLE_NAME,
+)
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+# Emptied before every database test (the schema itself is kept)
+DATA_TABLES = [TABLE_NAME, URL_REGISTRY_TABLE_NAME, DAILY_STATS_TABLE_NAME, FEED_CACHE_TABLE_NAME,
+               WATERMARK_TABLE_NAME, JOB_TABLE_NAME, DELIVERY_TABLE_NAME, SUBSCRIBER_TABLE_NAME,
+               SOURCE_HEALTH_TABLE_NAME, RUN_TABLE_NAME]
+
+
+@pytest.fixture(scope='session')
+def migrated_database():
+    """Creates a scratch database, points DATABASE_URL at it and migrates it; yields the versions applied."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    name = f"news_test_{os.getpid()}"
+    admin = psycopg2.connect(TEST_DATABASE_URL)
+    admin.autocommit = True
+    admin.cursor().execute(f"CREATE DATABASE {name} ENCODING 'UTF8' TEMPLATE template0")  # Digests carry emoji
+    previous_url = os.environ.get('DATABASE_URL')
+    os.environ['DATABASE_URL'] = urlunparse(urlparse(TEST_DATABASE_URL)._replace(path=f"/{name}"))
+    try:
+        conn = _open_connection()
+        try:
+            applied = apply_migrations(conn)
+        finally:
+            conn.close()
+        yield applied
+    finally:
+        if previous_url is None:
+            os.environ.pop('DATABASE_URL', None)
+        else:
+            os.environ['DATABASE_URL'] = previous_url
+        admin.cursor().execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        admin.close()
+
+
+@pytest.fixture
+def conn(migrated_database):
+    """A connection to the scratch database, with every data table emptied."""
+    connection = _open_connection()
+    cur = connection.cursor()
+    cur.execute(f"TRUNCATE {', '.join(DATA_TABLES)} RESTART IDENTITY CASCADE")
+    connection.commit()
+    cur.close()
+    yield connection
+    connection.rollback()
+    connection.close()
@@ -0,0 +1,36 @@
+# tests/test_async_pool.py
+
+import asyncio
+
+from database import async_connector
+
+
+class FakePool:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def test_concurrent_first_callers_share_one_pool(monkeypatch):
+    created = []
+
+    async def slow_create_pool(*args, **kwargs):
+        await asyncio.sleep(0.05)  # Every caller reaches the await before the first pool exists
+        created.append(FakePool())
+        return created[-1]
+
+    monkeypatch.setenv('DATABASE_URL', 'postgresql://localhost/news')
+    monkeypatch.setattr(async_connector.asyncpg, 'create_pool', slow_create_pool)
+    monkeypatch.setattr(async_connector, '_pool', None)
+    monkeypatch.setattr(async_connector, '_pool_lock', asyncio.Lock())
+
+    async def scenario():
+        pools = await asyncio.gather(*(async_connector.init_async_pool() for _ in range(5)))
+        await async_connector.close_async_pool()
+        return pools
+
+    pools = asyncio.run(scenario())
+    assert len(created) == 1
+    assert all(pool is created[0] for pool in pools)
+    assert created[0].closed and async_connector._pool is None
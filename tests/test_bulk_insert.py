@@ -0,0 +1,56 @@
+# tests/test_bulk_insert.py
+"""insert_articles() against PostgreSQL (see conftest.py)."""
+
+from datetime import datetime
+
+from collectors.normalize import utcnow
+from database.db_connector import (
+    insert_articles, fetch_latest_news, fetch_ingest_generation, fetch_existing_urls, count_articles,
+)
+from database.records import Article
+
+
+def article(url, published, title="CBN issues circular", category="External-GoogleNews", keywords=('cbn',)):
+    return Article(title, url, published, "Summary", category, 3.0, list(keywords))
+
+
+def test_known_and_repeated_urls_are_skipped(conn):
+    generation = fetch_ingest_generation(conn)
+    first = insert_articles(conn, [
+        article("https://punchng.com/a", datetime(2024, 6, 1)),
+        article("https://punchng.com/a", datetime(2024, 6, 2), title="Repeated in the batch"),
+        article("https://punchng.com/b", datetime(2024, 6, 1)),
+    ])
+    assert sum(batch['inserted'] for batch in first) == 2
+    assert sum(batch['skipped'] for batch in first) == 1
+    assert fetch_ingest_generation(conn) == generation + 1
+
+    # Known URL, even under a publication date in another partition
+    second = insert_articles(conn, [article("https://punchng.com/a", datetime(2023, 3, 1))])
+    assert (second[0]['inserted'], second[0]['skipped']) == (0, 1)
+    assert fetch_ingest_generation(conn) == generation + 1  # Nothing new, caches stay valid
+
+    assert count_articles(conn) == 2
+    assert fetch_existing_urls(conn, ["https://punchng.com/a", "https://punchng.com/new"]) == {"https://punchng.com/a"}
+
+
+def test_bad_row_is_skipped_without_losing_its_batch(conn):
+    stats = insert_articles(conn, [
+        article("https://punchng.com/good-1", datetime(2024, 6, 1)),
+        article("https://punchng.com/bad", datetime(2024, 6, 1), category=None),  # source_category is NOT NULL
+        article("https://punchng.com/good-2", datetime(2024, 6, 1)),
+    ])
+    assert [(batch['inserted'], batch['skipped'], batch['failed']) for batch in stats] == [(2, 0, 1)]
+    assert fetch_existing_urls(conn, ["https://punchng.com/bad"]) == set()
+
+
+def test_undated_articles_are_stamped_with_the_insert_time(conn):
+    # Stamped in UTC whatever the session time zone (Lagos is UTC+1)
+    cur = conn.cursor()
+    cur.execute("SET TIME ZONE 'Africa/Lagos'")
+    cur.close()
+    before = utcnow()
+    insert_articles(conn, [article("https://x.com/cenbank/status/1", None, category="Social-X")])
+    stored = fetch_latest_news(conn, limit=1)[0]
+    assert stored.publication_date is not None
+    assert abs((stored.publication_date - before).total_seconds()) < 60
@@ -0,0 +1,82 @@
+# tests/test_cache.py
+
+import pytest
+
+from api import cache
+from api.cache import ResponseCache, make_etag, etag_matches
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces time.monotonic in api.cache with a settable clock."""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_hit_after_put_at_same_generation():
+    responses = ResponseCache(maxsize=4, ttl=60)
+    assert responses.get('latest', 1) is None
+    responses.put('latest', 1, ['page'])
+    assert responses.get('latest', 1) == ['page']
+    assert (responses.hits, responses.misses) == (1, 1)
+
+
+def test_newer_generation_misses_and_drops_the_entry():
+    responses = ResponseCache(maxsize=4, ttl=60)
+    responses.put('latest', 1, ['old page'])
+    assert responses.get('latest', 2) is None
+    assert responses.stats()['size'] == 0
+
+
+def test_entry_expires_after_ttl(clock):
+    responses = ResponseCache(maxsize=4, ttl=30)
+    responses.put('latest', 1, ['page'])
+    clock[0] += 29
+    assert responses.get('latest', 1) == ['page']
+    clock[0] += 2
+    assert responses.get('latest', 1) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    responses = ResponseCache(maxsize=2, ttl=60)
+    responses.put('a', 1, 'A')
+    responses.put('b', 1, 'B')
+    responses.get('a', 1)  # 'b' is now the least recently used
+    responses.put('c', 1, 'C')
+    assert responses.get('b', 1) is None
+    assert responses.get('a', 1) == 'A'
+    assert responses.get('c', 1) == 'C'
+    assert responses.evictions == 1
+
+
+def test_stats_report_hit_ratio():
+    responses = ResponseCache(maxsize=4, ttl=60)
+    responses.put('a', 1, 'A')
+    responses.get('a', 1)
+    responses.get('a', 1)
+    responses.get('b', 1)
+    responses.record_not_modified()
+    stats = responses.stats()
+    assert stats['hit_ratio'] == round(2 / 3, 4)
+    assert stats['not_modified'] == 1
+
+
+def test_etag_changes_with_generation_and_key():
+    etag = make_etag(('/api/news/latest', 20), 5)
+    assert etag.startswith('W/"5-')
+    assert etag == make_etag(('/api/news/latest', 20), 5)
+    assert etag != make_etag(('/api/news/latest', 20), 6)
+    assert etag != make_etag(('/api/news/latest', 50), 5)
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, False),
+    ('', False),
+    ('W/"5-abc"', True),
+    ('W/"4-abc", W/"5-abc"', True),
+    ('*', True),
+    ('W/"4-abc"', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, 'W/"5-abc"') is expected
@@ -0,0 +1,37 @@
+# tests/test_daily_stats.py
+"""The article_daily_stats rollup, against PostgreSQL (see conftest.py)."""
+
+from datetime import datetime, date
+
+from database.db_connector import insert_article, insert_articles, fetch_daily_stats, fetch_ingest_generation
+from database.records import Article
+
+
+def article(url, published, title="CBN issues circular", category="External-GoogleNews", keywords=('cbn',)):
+    return Article(title, url, published, "Summary", category, 3.0, list(keywords))
+
+
+def test_daily_rollup_counts_inserted_articles(conn):
+    insert_articles(conn, [
+        article("https://punchng.com/1", datetime(2024, 6, 1, 8), keywords=('cbn', 'circular')),
+        article("https://punchng.com/2", datetime(2024, 6, 1, 9), keywords=('cbn',)),
+        article("https://x.com/cenbank/status/9", datetime(2024, 6, 2, 9), category="Social-X"),
+    ])
+    stats = fetch_daily_stats(conn, date(2024, 6, 1), date(2024, 6, 2))
+
+    categories = {(row['day'], row['source_category']): row['articles'] for row in stats['categories']}
+    assert categories == {(date(2024, 6, 1), "External-GoogleNews"): 2, (date(2024, 6, 2), "Social-X"): 1}
+    keywords = {(row['day'], row['keyword']): row['articles'] for row in stats['keywords']}
+    assert keywords[(date(2024, 6, 1), 'cbn')] == 2
+    assert keywords[(date(2024, 6, 1), 'circular')] == 1
+
+
+def test_single_insert_goes_through_the_rollup_and_the_registry(conn):
+    generation = fetch_ingest_generation(conn)
+    assert insert_article(conn, article("https://punchng.com/1", datetime(2024, 6, 1, 8)))
+    # Legacy tuples still work; the URL registry rejects the repeat
+    assert not insert_article(conn, ("Repeat", "https://punchng.com/1", datetime(2024, 6, 3), None, "Social-X"))
+
+    stats = fetch_daily_stats(conn, date(2024, 6, 1), date(2024, 6, 3))
+    assert [(row['day'], row['articles']) for row in stats['categories']] == [(date(2024, 6, 1), 1)]
+    assert fetch_ingest_generation(conn) == generation + 1
@@ -0,0 +1,141 @@
+# tests/test_digest_fanout.py
+"""
+Per-subscriber digests: filtering, grouping and batching against PostgreSQL
+(see conftest.py), and the fan-out against the fake SendGrid endpoint of
+benchmarks/local_services.py.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from benchmarks.local_services import FeedFactory, LocalServices
+from database.db_connector import upsert_subscriber
+from database.models import DELIVERY_TABLE_NAME
+from database.records import Article
+from utils import email_sender
+from utils.digest_fanout import DigestFilter, fan_out_digest, plan_deliveries, select_articles, subscriber_filter
+
+PUBLISHED = datetime(2024, 6, 3, 8, 0)
+
+
+def article(title, category, keywords=()):
+    return Article(title, f"https://news.example.com/{title.replace(' ', '-')}", PUBLISHED, None, category,
+                   matched_keywords=list(keywords))
+
+
+NEWS = [
+    article("CBN circular on FX", 'External-GoogleNews', ['CBN', 'circular']),
+    article("SEC sanctions broker", 'External-GoogleNews', ['SEC']),
+    article("cenbank: new AML rules", 'Social-X', ['AML', 'CBN']),
+    article("Market wrap", 'External-GoogleNews'),
+]
+
+
+@pytest.mark.parametrize('digest_filter, expected', [
+    (DigestFilter((), ()), ["CBN circular on FX", "SEC sanctions broker", "cenbank: new AML rules", "Market wrap"]),
+    (DigestFilter(('Social',), ()), ["cenbank: new AML rules"]),
+    (DigestFilter((), ('cbn',)), ["CBN circular on FX", "cenbank: new AML rules"]),
+    (DigestFilter(('External-GoogleNews',), ('cbn', 'sec')), ["CBN circular on FX", "SEC sanctions broker"]),
+    (DigestFilter(('Social-X',), ('sec',)), []),
+])
+def test_select_articles(digest_filter, expected):
+    assert [item.title for item in select_articles(NEWS, digest_filter)] == expected
+
+
+def test_select_articles_keeps_the_first_matches():
+    assert [item.title for item in select_articles(NEWS, DigestFilter((), ()), limit=2)] == \
+        ["CBN circular on FX", "SEC sanctions broker"]
+
+
+def test_equal_preferences_share_a_filter():
+    first = subscriber_filter({'categories': ['Social-X', 'External-GoogleNews'], 'keywords': ['CBN', 'aml']})
+    second = subscriber_filter({'categories': ['External-GoogleNews', 'Social-X'], 'keywords': ['AML', 'cbn', 'Cbn']})
+    assert first == second == DigestFilter(('External-GoogleNews', 'Social-X'), ('aml', 'cbn'))
+    assert subscriber_filter({'categories': None, 'keywords': None}) == DigestFilter((), ())
+
+
+def delivery_statuses(conn, digest_key):
+    cur = conn.cursor()
+    cur.execute(f"""SELECT s.email, d.status FROM {DELIVERY_TABLE_NAME} d JOIN subscriber s ON s.id = d.subscriber_id
+                    WHERE d.digest_key = %s""", (digest_key,))
+    statuses = dict(cur.fetchall())
+    conn.commit()
+    cur.close()
+    return statuses
+
+
+def test_plan_groups_subscribers_and_batches_them(conn):
+    for i in range(3):
+        upsert_subscriber(conn, f"news{i}@example.com", f"News {i}", ['External-GoogleNews'])
+    upsert_subscriber(conn, "aml@example.com", None, ['Social'], ['aml'])
+    upsert_subscriber(conn, "none@example.com", None, ['Social-X'], ['sec'])
+
+    summary, batches = plan_deliveries(conn, NEWS, 'daily-2024-06-03', batch_size=2)
+
+    assert summary == {'subscribers': 5, 'groups': 3, 'requests': 0, 'sent': 0, 'failed': 0, 'empty': 1}
+    recipients = [[s['email'] for s in batch] for _, batch in batches]
+    assert recipients == [["news0@example.com", "news1@example.com"], ["news2@example.com"], ["aml@example.com"]]
+    # One rendering per filter group, shared by its batches
+    assert batches[0][0] is batches[1][0]
+    assert "SEC sanctions broker" in batches[0][0].text and "cenbank" not in batches[0][0].text
+    assert "cenbank: new AML rules" in batches[2][0].text and "Market wrap" not in batches[2][0].text
+    assert delivery_statuses(conn, 'daily-2024-06-03')["none@example.com"] == 'empty'
+
+
+@pytest.fixture
+def sendgrid(monkeypatch):
+    with LocalServices(FeedFactory(entries_per_feed=1)) as local:
+        monkeypatch.setattr(email_sender, 'SENDGRID_API_HOST', local.base_url)
+        monkeypatch.setattr(email_sender, '_client', None)
+        monkeypatch.setenv('SENDGRID_API_KEY', 'test-key')
+        monkeypatch.setenv('SENDER_EMAIL', 'digest@example.com')
+        yield local
+        email_sender._client = None
+
+
+def sent_personalizations(services):
+    """The recipients of each SendGrid request, one list per personalization (in address order)."""
+    requests = [json.loads(payload) for _, payload in services.emails]
+    return [sorted([to['email'] for to in p['to']] for p in request['personalizations']) for request in requests]
+
+
+def test_fan_out_sends_one_personalization_per_recipient(conn, sendgrid):
+    for i in range(3):
+        upsert_subscriber(conn, f"reader{i}@example.com", f"Reader {i}")
+
+    summary = fan_out_digest(conn, NEWS, 'daily-2024-06-03', "Digest", batch_size=2, concurrency=2)
+
+    assert summary == {'subscribers': 3, 'groups': 1, 'requests': 2, 'sent': 3, 'failed': 0, 'empty': 0}
+    assert sorted(sent_personalizations(sendgrid)) == [
+        [["reader0@example.com"], ["reader1@example.com"]], [["reader2@example.com"]],
+    ]
+    assert set(delivery_statuses(conn, 'daily-2024-06-03').values()) == {'sent'}
+
+
+def test_rerun_only_reaches_subscribers_not_sent_yet(conn, sendgrid):
+    upsert_subscriber(conn, "early@example.com")
+    fan_out_digest(conn, NEWS, 'daily-2024-06-03', "Digest")
+    upsert_subscriber(conn, "late@example.com")
+
+    summary = fan_out_digest(conn, NEWS, 'daily-2024-06-03', "Digest")
+    assert (summary['subscribers'], summary['sent']) == (1, 1)
+    assert sent_personalizations(sendgrid) == [[["early@example.com"]], [["late@example.com"]]]
+
+    # Nothing is owed any more; a new digest_key starts over
+    assert fan_out_digest(conn, NEWS, 'daily-2024-06-03', "Digest")['subscribers'] == 0
+    assert fan_out_digest(conn, NEWS, 'daily-2024-06-04', "Digest")['sent'] == 2
+    assert len(sendgrid.emails) == 3
+
+
+def test_failed_batches_are_retried_on_the_next_run(conn, sendgrid, monkeypatch):
+    upsert_subscriber(conn, "reader@example.com")
+    monkeypatch.delenv('SENDER_EMAIL')
+    summary = fan_out_digest(conn, NEWS, 'daily-2024-06-03', "Digest")
+    assert (summary['sent'], summary['failed']) == (0, 1)
+    assert delivery_statuses(conn, 'daily-2024-06-03') == {"reader@example.com": 'failed'}
+
+    monkeypatch.setenv('SENDER_EMAIL', 'digest@example.com')
+    assert fan_out_digest(conn, NEWS, 'daily-2024-06-03', "Digest")['sent'] == 1
+    assert delivery_statuses(conn, 'daily-2024-06-03') == {"reader@example.com": 'sent'}
@@ -0,0 +1,51 @@
+# tests/test_digest_renderer.py
+
+from datetime import datetime, date
+
+import pytest
+
+from database.records import Article
+from utils.digest_renderer import render_digest, safe_url, EMPTY_HTML, EMPTY_TEXT
+
+GENERATED = datetime(2024, 6, 3, 8, 5)
+
+
+@pytest.mark.parametrize('url, expected', [
+    ("https://punchng.com/a", "https://punchng.com/a"),
+    ("  HTTP://punchng.com/a ", "HTTP://punchng.com/a"),
+    ("javascript:alert(1)", "#"),
+    ("data:text/html,hi", "#"),
+    ("", "#"),
+    (None, "#"),
+])
+def test_safe_url(url, expected):
+    assert safe_url(url) == expected
+
+
+def test_empty_digest():
+    assert render_digest([], GENERATED) == (EMPTY_HTML, EMPTY_TEXT)
+
+
+def test_items_are_escaped_and_numbered():
+    news = [
+        Article('CBN <b>circular</b> & "FX"', "https://punchng.com/1", datetime(2024, 6, 1, 9, 30), None,
+                "External-GoogleNews"),
+        Article("Tweet\n  about   AML", "javascript:alert(1)", None, None, "Social-X"),
+    ]
+    body = render_digest(news, GENERATED)
+
+    assert 'CBN &lt;b&gt;circular&lt;/b&gt; &amp; &quot;FX&quot;' in body.html
+    assert '<b>circular</b>' not in body.html
+    assert 'href="https://punchng.com/1"' in body.html and 'href="#"' in body.html
+    assert 'June 01, 2024' in body.html and 'Date unknown' in body.html
+    assert 'Total articles: 2 | Generated on June 03, 2024 at 08:05 AM' in body.html
+
+    assert '1. CBN <b>circular</b> & "FX"\n   External-GoogleNews | June 01, 2024\n   https://punchng.com/1\n' \
+        in body.text
+    assert '2. Tweet about AML\n   Social-X | Date unknown\n   #\n' in body.text
+    assert 'Total articles: 2 | Generated on June 03, 2024 at 08:05 AM' in body.text
+
+
+def test_missing_fields_and_plain_dates():
+    body = render_digest([Article(None, "https://x.example", date(2024, 6, 1), None, None)], GENERATED)
+    assert '1. No Title\n   Unknown Source | June 01, 2024' in body.text
@@ -0,0 +1,75 @@
+# tests/test_feed_fetcher.py
+
+import time
+
+import feedparser
+import pytest
+
+from benchmarks.local_services import FeedFactory, LocalServices
+from collectors.feed_fetcher import FeedRequest, iter_feeds
+
+
+@pytest.fixture(scope='module')
+def services():
+    with LocalServices(FeedFactory(entries_per_feed=5, seed=11)) as local:
+        yield local
+
+
+@pytest.fixture(autouse=True)
+def reset(services):
+    services.delay, services.delays, services.max_in_flight = 0.0, {}, 0
+
+
+def timeline(services, handle, host='127.0.0.1'):
+    return FeedRequest(handle, f"{services.base_url.replace('127.0.0.1', host)}/{handle}/rss")
+
+
+def test_every_feed_is_returned_with_its_body(services):
+    feed_requests = [timeline(services, f"handle{i}") for i in range(5)]
+    responses = {response.key: response for response in iter_feeds(feed_requests)}
+
+    assert sorted(responses) == [f"handle{i}" for i in range(5)]
+    for response in responses.values():
+        assert (response.status, response.error) == (200, None)
+        assert response.etag
+        assert len(feedparser.parse(response.body).entries) == 5
+
+
+def test_downloads_overlap_up_to_the_per_host_limit(services):
+    services.delay = 0.2
+    # 127.0.0.1 and localhost are separate hosts to the limiter
+    feed_requests = ([timeline(services, f"a{i}") for i in range(4)]
+                     + [timeline(services, f"b{i}", host='localhost') for i in range(4)])
+    started = time.monotonic()
+    responses = list(iter_feeds(feed_requests, max_workers=8, per_host_limit=2))
+    elapsed = time.monotonic() - started
+
+    assert len(responses) == 8 and all(response.error is None for response in responses)
+    assert services.max_in_flight == 4  # Two per host
+    assert elapsed < 8 * 0.2 / 2  # Far below fetching one after the other (1.6s)
+
+
+def test_responses_arrive_as_they_complete(services):
+    services.delays = {'/slow/rss': 0.5}
+    feed_requests = [timeline(services, 'slow')] + [timeline(services, f"fast{i}") for i in range(3)]
+    keys = [response.key for response in iter_feeds(feed_requests, per_host_limit=4)]
+    assert keys[-1] == 'slow'
+    assert sorted(keys[:-1]) == ['fast0', 'fast1', 'fast2']
+
+
+def test_a_failing_feed_does_not_stop_the_others(services):
+    feed_requests = [timeline(services, 'ok'), FeedRequest('missing', f"{services.base_url}/missing"),
+                     FeedRequest('refused', "http://127.0.0.1:9/rss")]
+    responses = {response.key: response for response in iter_feeds(feed_requests, timeout=2)}
+
+    assert responses['ok'].error is None
+    assert (responses['missing'].status, responses['missing'].error) == (404, "HTTP 404")
+    assert responses['refused'].status is None and responses['refused'].error
+
+
+def test_unchanged_feed_answers_304_without_a_body(services):
+    [first] = iter_feeds([timeline(services, 'cenbank')])
+    [second] = iter_feeds([FeedRequest('cenbank', first.url, first.etag)])
+
+    assert (second.status, second.body, second.error) == (304, None, None)
+    assert second.etag == first.etag  # Validators carry over to the next run
@@ -0,0 +1,199 @@
+# tests/test_job_lifecycle.py
+"""
+Job queue lifecycle against a real PostgreSQL (see conftest.py): claim, run,
+complete / retry / defer / dead-letter / requeue, and a whole collection
+round through the pipeline handlers with the feeds and SendGrid served by
+benchmarks/local_services.py.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from benchmarks.local_services import FeedFactory, LocalServices
+from collectors import external_api, near_duplicates, seen_urls
+from collectors.normalize import utcnow
+from database.db_connector import (
+    enqueue_jobs, claim_jobs, complete_job, count_articles, fetch_dead_jobs, fetch_job_counts, requeue_dead_jobs,
+    insert_articles,
+)
+from database.models import JOB_TABLE_NAME
+from database.records import Article
+from utils import email_sender, job_queue, pipeline_jobs
+from utils.job_queue import Job, JobDeferred, NewJob, job_handler, run_job, run_worker
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Handlers registered during a test are dropped afterwards."""
+    monkeypatch.setattr(job_queue, 'HANDLERS', dict(job_queue.HANDLERS))
+    return job_queue.HANDLERS
+
+
+def claim_one(conn, worker='w1', lease_seconds=300):
+    claimed = claim_jobs(conn, worker, lease_seconds)
+    return Job(**claimed[0]) if claimed else None
+
+
+def job_row(conn, job_id):
+    cur = conn.cursor()
+    cur.execute(f"""SELECT status, attempts, run_after - timezone('UTC', now()), last_error
+                    FROM {JOB_TABLE_NAME} WHERE id = %s""", (job_id,))
+    row = cur.fetchone()
+    conn.commit()
+    cur.close()
+    return row
+
+
+def make_ready(conn, job_id):
+    """Skips the rest of a job's backoff or deferral."""
+    cur = conn.cursor()
+    cur.execute(f"UPDATE {JOB_TABLE_NAME} SET run_after = timezone('UTC', now()) WHERE id = %s", (job_id,))
+    conn.commit()
+    cur.close()
+
+
+def test_handler_writes_commit_with_the_completion(conn, handlers):
+    @job_handler('test_parent')
+    def parent(conn, job):
+        enqueue_jobs(conn, [NewJob('test_child', {'parent': job.id})], commit=False)
+        return {'ok': True}
+
+    [parent_id] = enqueue_jobs(conn, [NewJob('test_parent', {'n': 1}, 'batch-1')])
+    job = claim_one(conn)
+    assert (job.id, job.payload, job.batch, job.attempts) == (parent_id, {'n': 1}, 'batch-1', 1)
+    assert claim_one(conn, 'w2') is None  # Running jobs are not handed out twice
+
+    assert run_job(conn, job, 'w1') == 'succeeded'
+    assert job_row(conn, parent_id)[0] == 'succeeded'
+    child = claim_one(conn)
+    assert (child.job_type, child.payload) == ('test_child', {'parent': parent_id})
+
+
+def test_failures_back_off_then_dead_letter_and_requeue(conn, handlers):
+    @job_handler('test_flaky')
+    def flaky(conn, job):
+        enqueue_jobs(conn, [NewJob('test_child', {})], commit=False)  # Must not survive the failure
+        raise RuntimeError(f"attempt {job.attempts} failed")
+
+    [job_id] = enqueue_jobs(conn, [NewJob('test_flaky', {}, max_attempts=2)])
+    assert run_job(conn, claim_one(conn), 'w1') == 'retry'
+
+    status, attempts, backoff, error = job_row(conn, job_id)
+    assert (status, attempts, error) == ('queued', 1, "RuntimeError: attempt 1 failed")
+    base = job_queue.JOB_RETRY_BASE_SECONDS
+    assert 0.8 * base - 1 <= backoff.total_seconds() <= 1.2 * base
+    assert claim_one(conn) is None  # Backing off, and the staged child job was rolled back
+
+    make_ready(conn, job_id)
+    assert run_job(conn, claim_one(conn), 'w1') == 'dead'
+    [dead] = fetch_dead_jobs(conn)
+    assert (dead['id'], dead['attempts'], dead['last_error']) == (job_id, 2, "RuntimeError: attempt 2 failed")
+    assert fetch_job_counts(conn) == {('test_flaky', 'dead'): 1}
+
+    assert requeue_dead_jobs(conn, [job_id]) == [job_id]
+    job = claim_one(conn)
+    assert (job.id, job.attempts) == (job_id, 1)  # A fresh set of attempts
+
+
+def test_deferral_gives_the_attempt_back(conn, handlers):
+    @job_handler('test_waiting')
+    def waiting(conn, job):
+        raise JobDeferred(90, "upstream jobs unfinished")
+
+    [job_id] = enqueue_jobs(conn, [NewJob('test_waiting', {}, max_attempts=1)])
+    for _ in range(3):
+        assert run_job(conn, claim_one(conn), 'w1') == 'deferred'
+        status, attempts, delay, error = job_row(conn, job_id)
+        assert (status, attempts, error) == ('queued', 0, None)
+        assert 85 <= delay.total_seconds() <= 90
+        make_ready(conn, job_id)
+
+
+def test_expired_lease_hands_the_job_to_another_worker(conn, handlers):
+    [job_id] = enqueue_jobs(conn, [NewJob('test_slow', {})])
+    stalled = claim_one(conn, 'w1', lease_seconds=-1)  # Expired as soon as it is claimed
+
+    taken_over = claim_one(conn, 'w2')
+    assert (taken_over.id, taken_over.attempts) == (job_id, 2)
+    assert not complete_job(conn, stalled.id, 'w1')  # The first worker's result is discarded
+    assert complete_job(conn, taken_over.id, 'w2')
+
+
+def test_dedupe_key_allows_one_unfinished_job(conn):
+    assert len(enqueue_jobs(conn, [NewJob('fetch_feed', {}, 'b1', 'fetch_feed:google:cbn')])) == 1
+    assert enqueue_jobs(conn, [NewJob('fetch_feed', {}, 'b2', 'fetch_feed:google:cbn')]) == []
+
+
+def digest_job(batch, wait_until):
+    return Job(1, 'build_digest', {'digest_key': '2024-06-01', 'subject': 'Digest',
+                                   'wait_until': wait_until.isoformat()}, batch, 1, 5)
+
+
+def test_digest_waits_for_the_round_until_wait_until(conn):
+    insert_articles(conn, [Article("CBN issues circular", "https://punchng.com/1", utcnow(), None,
+                                   "External-GoogleNews")])
+    enqueue_jobs(conn, [NewJob('ingest_batch', {}, 'collect:1', None, 5, 3600)])  # Held back by its backoff
+
+    with pytest.raises(JobDeferred) as deferred:
+        pipeline_jobs.build_digest(conn, digest_job('collect:1', utcnow() + timedelta(minutes=5)))
+    assert deferred.value.delay_seconds == pipeline_jobs.DIGEST_WAIT_SECONDS
+
+    # Past wait_until the digest goes out without the straggler
+    result = pipeline_jobs.build_digest(conn, digest_job('collect:1', utcnow() - timedelta(seconds=1)))
+    assert (result['articles'], result['send_jobs']) == (1, 1)
+    conn.commit()
+    assert fetch_job_counts(conn)[('send_digest', 'queued')] == 1
+
+
+def test_digest_retries_when_the_articles_cannot_be_loaded(conn, monkeypatch):
+    monkeypatch.setattr(pipeline_jobs, 'fetch_news_by_date_range', lambda *args, **kwargs: None)
+    with pytest.raises(RuntimeError):
+        pipeline_jobs.build_digest(conn, digest_job(None, utcnow()))
+
+
+@pytest.fixture
+def services(monkeypatch):
+    """Feeds and SendGrid served locally; two search queries and one Nitter handle per round."""
+    with LocalServices(FeedFactory(entries_per_feed=20, seed=3)) as local:
+        monkeypatch.setattr(external_api, 'GOOGLE_NEWS_RSS_URL', f"{local.base_url}/rss/search")
+        monkeypatch.setattr(external_api, 'NITTER_INSTANCES', [f"{local.base_url}/"])
+        monkeypatch.setattr(pipeline_jobs, 'SEARCH_QUERIES', ['CBN circular', 'SEC Nigeria'])
+        monkeypatch.setattr(pipeline_jobs, 'NITTER_HANDLES', ['cenbank'])
+        monkeypatch.setattr(email_sender, 'SENDGRID_API_HOST', local.base_url)
+        monkeypatch.setattr(email_sender, '_client', None)
+        monkeypatch.setenv('SENDGRID_API_KEY', 'test-key')
+        monkeypatch.setenv('SENDER_EMAIL', 'digest@example.com')
+        monkeypatch.setenv('RECIPIENT_EMAIL', 'desk@example.com')
+        # Per-process indexes start empty, like in a fresh worker
+        monkeypatch.setattr(seen_urls, '_seen_filter', None)
+        monkeypatch.setattr(near_duplicates, '_clusterer', None)
+        yield local
+        email_sender._client = None
+
+
+def test_collection_round_runs_through_to_the_email(conn, services):
+    batch, job_ids = pipeline_jobs.enqueue_collection(conn)
+    assert len(job_ids) == 4
+    digest_id = job_ids[-1]
+
+    run_worker(drain=True)
+
+    counts = fetch_job_counts(conn)
+    assert counts[('fetch_feed', 'succeeded')] == 3
+    assert counts[('ingest_batch', 'succeeded')] >= 1
+    assert count_articles(conn) > 0
+    # The digest was claimed while ingest jobs were still queued: deferred, attempt given back
+    status, attempts, delay, _ = job_row(conn, digest_id)
+    assert (status, attempts) == ('queued', 0) and delay.total_seconds() > 0
+    assert services.emails == []
+
+    make_ready(conn, digest_id)
+    run_worker(drain=True)
+
+    counts = fetch_job_counts(conn)
+    assert counts[('build_digest', 'succeeded')] == 1
+    assert counts[('send_digest', 'succeeded')] == 1
+    assert all(status == 'succeeded' for _, status in counts)
+    [(path, payload)] = services.emails
+    assert path == '/v3/mail/send' and b'desk@example.com' in payload
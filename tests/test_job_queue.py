@@ -0,0 +1,95 @@
+# tests/test_job_queue.py
+
+import pytest
+
+from utils import job_queue
+from utils.job_queue import Job, JobDeferred, job_handler, retry_delay, run_job, HANDLERS
+
+
+@pytest.mark.parametrize('attempts, expected', [(0, 30), (1, 30), (2, 60), (3, 120), (7, 1920), (8, 3600), (20, 3600)])
+def test_retry_delay_doubles_up_to_the_cap(monkeypatch, attempts, expected):
+    monkeypatch.setattr(job_queue.random, 'uniform', lambda low, high: 1.0)
+    assert retry_delay(attempts, base=30, cap=3600) == expected
+
+
+def test_retry_delay_jitter_stays_within_twenty_percent():
+    delays = {retry_delay(3, base=30, cap=3600) for _ in range(200)}
+    assert all(96 <= delay <= 144 for delay in delays)
+    assert len(delays) > 1
+
+
+class FakeConnection:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    """Records the queue calls run_job() makes instead of sending them to Postgres."""
+    calls = []
+    state = {'retry_status': 'queued', 'completed': True}
+    monkeypatch.setattr(job_queue, 'complete_job', lambda conn, job_id, worker: calls.append(('complete', job_id))
+                        or state['completed'])
+    monkeypatch.setattr(job_queue, 'retry_job', lambda conn, job_id, worker, delay, error: calls.append(
+        ('retry', job_id, delay, error)) or state['retry_status'])
+    monkeypatch.setattr(job_queue, 'defer_job', lambda conn, job_id, worker, delay: calls.append(
+        ('defer', job_id, delay)))
+    monkeypatch.setattr(job_queue.random, 'uniform', lambda low, high: 1.0)
+    monkeypatch.setattr(job_queue, 'HANDLERS', dict(HANDLERS))
+    state['calls'] = calls
+    return state
+
+
+def job(job_type, attempts=1, max_attempts=5):
+    return Job(7, job_type, {}, 'batch-1', attempts, max_attempts)
+
+
+def test_success_completes_the_job(queue):
+    job_handler('ok')(lambda conn, job: {'done': True})
+    assert run_job(FakeConnection(), job('ok'), 'w1') == 'succeeded'
+    assert queue['calls'] == [('complete', 7)]
+
+
+def test_failure_rolls_back_and_retries_with_backoff(queue):
+    def fail(conn, job):
+        raise RuntimeError("feed down")
+    job_handler('fail')(fail)
+    conn = FakeConnection()
+
+    assert run_job(conn, job('fail', attempts=3), 'w1') == 'retry'
+    assert conn.rollbacks == 1
+    assert queue['calls'] == [('retry', 7, retry_delay(3), "RuntimeError: feed down")]
+
+
+def test_failure_on_the_last_attempt_is_dead(queue):
+    job_handler('fail')(lambda conn, job: 1 / 0)
+    queue['retry_status'] = 'dead'
+    assert run_job(FakeConnection(), job('fail', attempts=5), 'w1') == 'dead'
+
+
+def test_deferral_does_not_record_a_failure(queue):
+    def wait(conn, job):
+        raise JobDeferred(45, "collection still running")
+    job_handler('wait')(wait)
+    conn = FakeConnection()
+
+    assert run_job(conn, job('wait'), 'w1') == 'deferred'
+    assert conn.rollbacks == 1
+    assert queue['calls'] == [('defer', 7, 45)]
+
+
+def test_unknown_job_type_is_retried(queue):
+    assert run_job(FakeConnection(), job('nobody-handles-this'), 'w1') == 'retry'
+    assert "no handler registered" in queue['calls'][0][3]
+
+
+def test_expired_lease_is_reported_lost(queue):
+    job_handler('ok')(lambda conn, job: None)
+    queue['completed'] = False
+    assert run_job(FakeConnection(), job('ok'), 'w1') == 'lost'
+    queue['retry_status'] = None
+    job_handler('fail')(lambda conn, job: 1 / 0)
+    assert run_job(FakeConnection(), job('fail'), 'w1') == 'lost'
@@ -0,0 +1,24 @@
+# tests/test_migrations.py
+"""Migrations 1-15 on an empty PostgreSQL database (see conftest.py)."""
+
+from database.migrations import MIGRATIONS, applied_versions, apply_migrations
+from database.models import TABLE_NAME
+
+
+def test_migrations_apply_in_order_on_an_empty_database(migrated_database, conn):
+    assert migrated_database == list(range(1, 16))
+    assert applied_versions(conn) == {version for version, _, _ in MIGRATIONS}
+    assert apply_migrations(conn) == []  # Idempotent
+
+    cur = conn.cursor()
+    cur.execute("SELECT relkind FROM pg_class WHERE relname = %s", (TABLE_NAME,))
+    assert cur.fetchone()[0] == 'p'  # news_article is partitioned (migration 11)
+    cur.close()
+
+
+def test_timestamp_defaults_are_utc(migrated_database, conn):
+    cur = conn.cursor()
+    cur.execute("""SELECT table_name, column_name FROM information_schema.columns
+                   WHERE table_schema = current_schema() AND column_default ILIKE '%%current_timestamp%%'""")
+    assert cur.fetchall() == []
+    cur.close()
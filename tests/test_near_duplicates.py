@@ -0,0 +1,113 @@
+# tests/test_near_duplicates.py
+
+from datetime import datetime, timedelta
+
+from collectors.near_duplicates import (
+    MinHashIndex, StoryClusterer, shingles, minhash_signature, estimated_similarity, cluster_key,
+    MINHASH_PERMUTATIONS,
+)
+from collectors.normalize import utcnow
+from database.db_connector import insert_articles, fetch_latest_news
+from database.records import Article
+
+HEADLINE = "CBN issues circular on foreign exchange trading limits for deposit money banks"
+
+
+def article(title, url, published=None, content=None):
+    return Article(title, url, published, content, "External-GoogleNews")
+
+
+def signature(text):
+    return minhash_signature(shingles(text, None))
+
+
+def test_shingles_strip_source_decoration():
+    assert shingles(f"{HEADLINE} - Punch Newspapers", None) == shingles(f"[cenbank] {HEADLINE}.", None)
+    words = shingles("Title", '<a href="https://x.com/1">Read the rules</a> <font color="#666">Punch</font>')
+    assert words == {'title', 'read', 'rules'}
+
+
+def test_signature_of_nothing_is_none():
+    assert minhash_signature(set()) is None
+    assert len(signature(HEADLINE)) == MINHASH_PERMUTATIONS
+
+
+def test_similarity_tracks_word_overlap():
+    assert estimated_similarity(signature(HEADLINE), signature(HEADLINE)) == 1.0
+    assert estimated_similarity(signature(HEADLINE), signature("Super Eagles win the cup in Lagos")) < 0.2
+
+
+def test_index_finds_similar_signatures_only():
+    index = MinHashIndex(threshold=0.5)
+    index.add(signature(HEADLINE), 1)
+    index.add(signature("SEC Nigeria publishes exposure draft on crypto assets rules"), 2)
+    assert index.find(signature(HEADLINE.replace('issues', 'releases'))) == 1
+    assert index.find(signature("Super Eagles win the cup in Lagos")) is None
+
+
+def test_prune_drops_entries_published_before_the_cutoff():
+    index = MinHashIndex()
+    now = datetime(2024, 6, 30)
+    index.add(signature(HEADLINE), 1, now - timedelta(days=30))
+    index.add(signature("SEC Nigeria publishes exposure draft on crypto assets"), 2, now)
+    index.add(signature("NDIC raises deposit insurance cover for microfinance banks"), 3)  # Undated: kept
+
+    assert index.prune(now - timedelta(days=14)) == 1
+    assert index.size == 2
+    assert index.find(signature(HEADLINE)) is None
+    assert index.find(signature("NDIC raises deposit insurance cover for microfinance banks")) == 3
+
+
+def test_assign_clusters_near_duplicates_within_a_batch():
+    clusterer = StoryClusterer()
+    batch = [
+        article(f"{HEADLINE} - Punch", "https://punch.example/1"),
+        article(f"{HEADLINE} - Vanguard", "https://vanguard.example/2"),
+        article("Super Eagles win the cup in Lagos", "https://sports.example/3"),
+        article("", "https://empty.example/4"),
+    ]
+    articles, duplicates = clusterer.assign(batch)
+
+    assert duplicates == 1
+    first, second, other, empty = articles
+    assert first.cluster_id == second.cluster_id == cluster_key("https://punch.example/1")
+    assert (first.is_representative, second.is_representative) == (True, False)
+    assert other.cluster_id != first.cluster_id and other.is_representative
+    assert empty.minhash is None and empty.cluster_id is None
+
+
+def test_stored_articles_cluster_later_batches():
+    clusterer = StoryClusterer()
+    stored, _ = clusterer.assign([article(HEADLINE, "https://punch.example/1", utcnow())])
+    clusterer.add(stored)
+
+    later, duplicates = clusterer.assign([article(HEADLINE.upper(), "https://vanguard.example/2")])
+    assert duplicates == 1
+    assert later[0].cluster_id == stored[0].cluster_id
+
+
+def test_assign_evicts_fingerprints_outside_the_window():
+    clusterer = StoryClusterer(window_days=14, prune_seconds=0)
+    stored, _ = clusterer.assign([article(HEADLINE, "https://punch.example/1", utcnow() - timedelta(days=30))])
+    clusterer.add(stored)
+
+    later, duplicates = clusterer.assign([article(HEADLINE, "https://vanguard.example/2")])
+    assert duplicates == 0
+    assert later[0].is_representative
+
+
+def test_cluster_keeps_a_representative_when_its_first_member_is_not_stored(conn):
+    insert_articles(conn, [article("Unrelated story", "https://punch.example/1", datetime(2024, 6, 1))])
+    batch, _ = StoryClusterer().assign([
+        article(f"{HEADLINE} - Punch", "https://punch.example/1", datetime(2024, 6, 2)),  # URL already stored
+        article(f"{HEADLINE} - Vanguard", "https://vanguard.example/2", datetime(2024, 6, 2)),
+        article(f"{HEADLINE} - Guardian", "https://guardian.example/3", datetime(2024, 6, 3)),
+    ])
+    assert [item.is_representative for item in batch] == [True, False, False]
+
+    insert_articles(conn, batch)
+
+    assert [item.is_representative for item in batch] == [True, True, False]
+    representatives = fetch_latest_news(conn, representatives_only=True)
+    assert sorted(item.source_url for item in representatives) == \
+        ["https://punch.example/1", "https://vanguard.example/2"]
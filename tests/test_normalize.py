@@ -0,0 +1,75 @@
+# tests/test_normalize.py
+
+import time
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from collectors.normalize import normalize_date, entry_date, canonical_url, canonical_tweet_url, decode_google_news_id
+
+
+@pytest.mark.parametrize('value, expected', [
+    (time.struct_time((2024, 6, 1, 9, 30, 0, 5, 153, 0)), datetime(2024, 6, 1, 9, 30)),
+    ("Sat, 01 Jun 2024 10:30:00 +0100", datetime(2024, 6, 1, 9, 30)),
+    ("Sat, 01 Jun 2024 09:30:00 GMT", datetime(2024, 6, 1, 9, 30)),
+    ("2024-06-01T10:30:00+01:00", datetime(2024, 6, 1, 9, 30)),
+    ("2024-06-01T09:30:00Z", datetime(2024, 6, 1, 9, 30)),
+    ("  2024-06-01 09:30:00 ", datetime(2024, 6, 1, 9, 30)),
+    (datetime(2024, 6, 1, 10, 30, tzinfo=timezone(timedelta(hours=1))), datetime(2024, 6, 1, 9, 30)),
+    (datetime(2024, 6, 1, 9, 30), datetime(2024, 6, 1, 9, 30)),
+])
+def test_dates_become_naive_utc(value, expected):
+    result = normalize_date(value)
+    assert result == expected
+    assert result.tzinfo is None
+
+
+@pytest.mark.parametrize('value', [None, '', 'yesterday', 'Sat, 99 Foo 2024', 12345])
+def test_unparseable_dates_return_the_default(value):
+    assert normalize_date(value) is None
+    assert normalize_date(value, default=datetime(2000, 1, 1)) == datetime(2000, 1, 1)
+
+
+def test_entry_date_prefers_published_then_updated():
+    published = time.struct_time((2024, 6, 1, 9, 30, 0, 5, 153, 0))
+    assert entry_date({'published_parsed': published, 'updated': "2024-07-01"}) == datetime(2024, 6, 1, 9, 30)
+    assert entry_date({'published': 'not a date', 'updated': "2024-07-01T00:00:00Z"}) == datetime(2024, 7, 1)
+    assert entry_date({}) is None
+
+
+@pytest.mark.parametrize('url, expected', [
+    ("HTTPS://News.Example.COM/story?utm_source=rss&utm_medium=x#top", "https://news.example.com/story"),
+    ("https://news.example.com/story?id=4&fbclid=abc&page=2", "https://news.example.com/story?id=4&page=2"),
+    ("http://news.example.com:80/a", "http://news.example.com/a"),
+    ("https://news.example.com:8443/a", "https://news.example.com:8443/a"),
+    ("https://news.example.com.", "https://news.example.com/"),
+    ("https://news.example.com/s?c=%20x&UTM_Campaign=y", "https://news.example.com/s?c=%20x"),
+    ("https://news.example.com/s?q=a+b&gclid=1", "https://news.example.com/s?q=a+b"),
+    ("https://www.google.com/url?q=https://punchng.com/x?utm_source=g&sa=U", "https://punchng.com/x"),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+@pytest.mark.parametrize('url', ["", None, "mailto:desk@example.com", "https://news.example.com:99999/a",
+                                 "https://news.example.com:port/a", "https://[::1/a"])
+def test_non_http_and_malformed_urls_are_unchanged(url):
+    assert canonical_url(url) == url
+
+
+def test_canonical_url_is_stable_with_or_without_trackers():
+    assert canonical_url("https://n.example/a?b=1%2B2&c=%20x") == \
+        canonical_url("https://n.example/a?b=1%2B2&utm_source=t&c=%20x")
+
+
+def test_legacy_google_news_links_are_unwrapped():
+    article_id = "CBMiIWh0dHBzOi8vcHVuY2huZy5jb20vY2JuLWNpcmN1bGFyLw"
+    assert decode_google_news_id(article_id) == "https://punchng.com/cbn-circular/"
+    assert canonical_url(f"https://news.google.com/rss/articles/{article_id}?oc=5") == "https://punchng.com/cbn-circular/"
+    assert decode_google_news_id("AU_yqLOpaque") is None
+
+
+def test_nitter_status_links_become_x_links():
+    assert canonical_tweet_url("https://nitter.net/cenbank/status/1790000000000000000#m") == \
+        "https://x.com/cenbank/status/1790000000000000000"
+    assert canonical_tweet_url("https://nitter.net/cenbank") == "https://nitter.net/cenbank"
@@ -0,0 +1,69 @@
+# tests/test_pagination.py
+
+from datetime import datetime
+
+import pytest
+
+from database.db_connector import insert_articles, fetch_latest_news, fetch_news_by_date_range
+from database.pagination import encode_cursor, decode_cursor
+from database.records import Article
+
+
+def test_round_trip_restores_types():
+    published = datetime(2024, 6, 1, 9, 30, 15, 123456)
+    cursor = encode_cursor(published, 42)
+    assert decode_cursor(cursor, datetime, int) == (published, 42)
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor(datetime(2024, 1, 1), 7, 'Social-X/?&')
+    assert '=' not in cursor
+    assert set(cursor) <= set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_')
+
+
+def test_float_rank_survives_round_trip():
+    cursor = encode_cursor(0.0607927, datetime(2024, 1, 1), 3)
+    assert decode_cursor(cursor, float, datetime, int) == (0.0607927, datetime(2024, 1, 1), 3)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not a cursor', '!!!!', encode_cursor({'a': 1})[:-2]])
+def test_garbage_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, datetime, int)
+
+
+def test_wrong_arity_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(datetime(2024, 1, 1)), datetime, int)
+
+
+def test_wrong_value_type_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor('yesterday', 'seven'), datetime, int)
+
+
+def test_latest_news_pages_with_keyset_cursors(conn):
+    insert_articles(conn, [
+        Article("CBN issues circular", f"https://punchng.com/{day}", datetime(2024, 6, day), None, "External-GoogleNews")
+        for day in range(1, 6)
+    ])
+
+    first = fetch_latest_news(conn, limit=2)
+    assert all(isinstance(item, Article) for item in first)
+    assert [item.source_url for item in first] == ["https://punchng.com/5", "https://punchng.com/4"]
+
+    last = first[-1]
+    second = fetch_latest_news(conn, limit=2, after=(last.publication_date, last.id))
+    assert [item.source_url for item in second] == ["https://punchng.com/3", "https://punchng.com/2"]
+
+    assert fetch_latest_news(conn, limit=10, category_filter="Social") == []
+
+
+def test_failed_date_range_query_returns_none_and_rolls_back(conn):
+    insert_articles(conn, [Article("CBN issues circular", "https://punchng.com/1", datetime(2024, 6, 1), None,
+                                   "External-GoogleNews")])
+
+    assert fetch_news_by_date_range(conn, "not a date") is None
+    # The aborted transaction was rolled back, so the connection is still usable
+    assert [item.source_url for item in fetch_news_by_date_range(conn, datetime(2024, 5, 1))] == \
+        ["https://punchng.com/1"]
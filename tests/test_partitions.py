@@ -0,0 +1,43 @@
+# tests/test_partitions.py
+"""Monthly partitions and the article_url registry, against PostgreSQL (see conftest.py)."""
+
+from datetime import datetime
+
+from database.db_connector import insert_articles, fetch_partitions, ensure_partitions
+from database.models import TABLE_NAME, URL_REGISTRY_TABLE_NAME
+from database.records import Article
+
+
+def article(url, published, title="CBN issues circular", category="External-GoogleNews", keywords=('cbn',)):
+    return Article(title, url, published, "Summary", category, 3.0, list(keywords))
+
+
+def partition_of(conn, url):
+    cur = conn.cursor()
+    cur.execute(f"SELECT tableoid::regclass::text FROM {TABLE_NAME} WHERE source_url = %s", (url,))
+    row = cur.fetchone()
+    cur.close()
+    return row[0] if row else None
+
+
+def test_batch_insert_routes_rows_to_monthly_partitions(conn):
+    articles = [
+        article("https://punchng.com/jan", datetime(2023, 1, 15, 8)),
+        article("https://punchng.com/jun", datetime(2024, 6, 1, 9, 30)),
+    ]
+    # Partitions are normally created up front; the insert creates any still missing
+    assert ensure_partitions(conn, [datetime(2023, 1, 15)]) >= 0
+
+    stats = insert_articles(conn, articles, batch_size=10)
+
+    assert [(batch['inserted'], batch['skipped'], batch['failed']) for batch in stats] == [(2, 0, 0)]
+    assert partition_of(conn, "https://punchng.com/jan") == f"{TABLE_NAME}_p202301"
+    assert partition_of(conn, "https://punchng.com/jun") == f"{TABLE_NAME}_p202406"
+    assert {f"{TABLE_NAME}_p202301", f"{TABLE_NAME}_p202406"} <= {name for name, _ in fetch_partitions(conn)}
+
+    # The registry points at the stored rows
+    cur = conn.cursor()
+    cur.execute(f"""SELECT r.source_url FROM {URL_REGISTRY_TABLE_NAME} r
+                    JOIN {TABLE_NAME} a ON a.id = r.article_id AND a.publication_date = r.publication_date""")
+    assert sorted(row[0] for row in cur.fetchall()) == ["https://punchng.com/jan", "https://punchng.com/jun"]
+    cur.close()
@@ -0,0 +1,68 @@
+# tests/test_relevance.py
+
+import pytest
+
+from collectors.relevance import RelevanceMatcher, load_keywords, DEFAULT_KEYWORDS, DEFAULT_ENTITIES
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return RelevanceMatcher(DEFAULT_KEYWORDS, DEFAULT_ENTITIES)
+
+
+def test_scores_distinct_terms_once(matcher):
+    result = matcher.match("CBN circular: CBN issues another circular", "cbn")
+    assert result.terms == ['cbn', 'circular']
+    assert result.score == 5.0
+
+
+def test_ignores_case_punctuation_and_spacing(matcher):
+    assert 'central bank of nigeria' in matcher.match("The CENTRAL-Bank  of\nNigeria said").terms
+    assert 'open banking' in matcher.match("#Open_Banking? no: open/banking").terms
+
+
+def test_matches_plurals_of_the_last_word(matcher):
+    result = matcher.match("New guidelines and penalties for payment service banks")
+    assert result.terms == ['guideline', 'penalty', 'payment service bank']
+
+
+def test_prefix_terms_match_longer_words(matcher):
+    result = matcher.match("Fraudulent taxation schemes sanctioned")
+    assert result.terms == ['fraud', 'tax', 'sanction']
+
+
+def test_words_are_not_matched_inside_other_words(matcher):
+    assert matcher.match("The policyholder framed a cbnx post").terms == []
+
+
+def test_entity_alone_is_not_topical(matcher):
+    result = matcher.match("CBN governor attends a wedding")
+    assert result.terms == ['cbn']
+    assert result.score == 3.0
+    assert not result.topical
+    assert matcher.match("CBN issues circular").topical
+
+
+def test_no_match():
+    result = RelevanceMatcher({'circular': 2}).match("Football results", None, "")
+    assert (result.score, result.terms, result.topical) == (0, [], False)
+
+
+def test_load_keywords(tmp_path):
+    path = tmp_path / 'keywords.tsv'
+    path.write_text(
+        "# regulators\n"
+        "CBN\t3\tentity\n"
+        "exposure draft, 2\n"
+        "fraud*\n"
+        "\n"
+        "levy\t1.5   # new tax\n",
+        encoding='utf-8',
+    )
+    keywords, entities = load_keywords(path)
+    assert keywords == {'CBN': 3.0, 'exposure draft': 2.0, 'fraud*': 1.0, 'levy': 1.5}
+    assert entities == {'CBN'}
+
+    result = RelevanceMatcher(keywords, entities).match("cbn exposure drafts on fraudsters")
+    assert result.terms == ['cbn', 'exposure draft', 'fraud']
+    assert result.topical
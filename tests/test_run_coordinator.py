@@ -0,0 +1,47 @@
+# tests/test_run_coordinator.py
+"""Single-flight scraper runs against PostgreSQL (see conftest.py): lease heartbeat and stage recording."""
+
+import time
+
+import pytest
+
+from database.db_connector import claim_run, fetch_run
+from utils import run_coordinator
+from utils.run_coordinator import RunTracker, start_run
+
+
+def test_heartbeat_renews_the_lease_until_the_run_finishes(conn, monkeypatch):
+    monkeypatch.setattr(run_coordinator, 'RUN_LEASE_SECONDS', 60)
+    run_id, _ = start_run('test')
+    claimed_until = fetch_run(conn, run_id)['lease_expires_at']
+
+    tracker = RunTracker(run_id, heartbeat_seconds=0.05)
+    time.sleep(0.3)
+    assert fetch_run(conn, run_id)['lease_expires_at'] > claimed_until
+
+    tracker.finish('succeeded', {'ok': True})
+    assert not tracker._heartbeat.is_alive()
+    run = fetch_run(conn, run_id)
+    assert (run['status'], run['summary']) == ('succeeded', {'ok': True})
+    assert start_run('test')[0] is not None  # The slot is free again
+
+
+def test_stages_are_recorded_on_the_run_connection(conn, monkeypatch):
+    run_id, _ = claim_run(conn, 'test', 60)
+    tracker = RunTracker(run_id, heartbeat_seconds=3600)
+
+    def no_second_connection():
+        raise AssertionError("the run borrowed a second connection")
+
+    monkeypatch.setattr(run_coordinator, 'borrow_connection', no_second_connection)
+    with tracker.attached(conn):
+        with tracker.stage('google_news'):
+            pass
+        with pytest.raises(ValueError):
+            with tracker.stage('nitter'):
+                raise ValueError("feed down")
+        tracker.finish('failed', error_message="feed down")
+
+    run = fetch_run(conn, run_id)
+    assert [(stage['name'], stage['status']) for stage in run['stages']] == [('google_news', 'ok'), ('nitter', 'failed')]
+    assert (run['status'], run['error']) == ('failed', "feed down")
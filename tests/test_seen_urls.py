@@ -0,0 +1,77 @@
+# tests/test_seen_urls.py
+
+import pytest
+
+from collectors import seen_urls
+from collectors.seen_urls import BloomFilter, SeenUrlFilter
+from database.records import Article
+
+
+def article(url):
+    return Article("CBN issues circular", url, None, None, "External-GoogleNews")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    urls = [f"https://news.example.com/{i}" for i in range(1000)]
+    for url in urls:
+        bloom.add(url)
+    assert all(url in bloom for url in urls)
+
+
+def test_bloom_filter_false_positive_rate_at_capacity():
+    bloom = BloomFilter(5000, 0.01)
+    for i in range(5000):
+        bloom.add(f"https://news.example.com/stored/{i}")
+    false_positives = sum(f"https://news.example.com/new/{i}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+
+
+def test_bloom_filter_is_sized_from_capacity_and_rate():
+    bloom = BloomFilter(200000, 0.001)
+    assert bloom.num_hashes == 10
+    assert 350_000 < bloom.memory_bytes < 370_000  # ~1.8 bytes per URL
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """The URLs fetch_existing_urls() reports as stored, and the lookups it received."""
+    state = {'urls': set(), 'lookups': []}
+
+    def fetch_existing_urls(conn, urls):
+        state['lookups'].append(list(urls))
+        return state['urls'] & set(urls)
+
+    monkeypatch.setattr(seen_urls, 'fetch_existing_urls', fetch_existing_urls)
+    return state
+
+
+def test_filter_drops_stored_urls_and_keeps_false_positives(stored):
+    seen = SeenUrlFilter(capacity=100, fp_rate=0.01)
+    seen.add(['https://a', 'https://b'])
+    stored['urls'] = {'https://a'}  # 'https://b' is in the filter but was never stored
+
+    new, known, duplicates = seen.filter_new(None, [article('https://a'), article('https://b'), article('https://c')])
+
+    assert sorted(item.source_url for item in new) == ['https://b', 'https://c']
+    assert (known, duplicates) == (1, 0)
+    assert sorted(stored['lookups'][0]) == ['https://a', 'https://b']  # Only the filter's positives are checked
+
+
+def test_filter_reports_repeats_within_the_batch_separately(stored):
+    seen = SeenUrlFilter(capacity=100, fp_rate=0.01)
+    seen.add(['https://a'])
+    stored['urls'] = {'https://a'}
+    batch = [article(url) for url in ['https://a', 'https://a', 'https://c', 'https://c', 'https://c']]
+
+    new, known, duplicates = seen.filter_new(None, batch)
+
+    assert [item.source_url for item in new] == ['https://c']
+    assert new[0] is batch[2]  # The first occurrence is kept
+    assert (known, duplicates) == (1, 3)
+
+
+def test_urls_missing_from_the_filter_are_new(stored):
+    seen = SeenUrlFilter(capacity=100, fp_rate=0.01)
+    new, known, duplicates = seen.filter_new(None, [article('https://x'), article('https://y')])
+    assert len(new) == 2 and (known, duplicates) == (0, 0)
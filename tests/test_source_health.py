@@ -0,0 +1,108 @@
+# tests/test_source_health.py
+
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+import pytest
+
+from collectors import source_health
+from collectors.normalize import utcnow
+from collectors.source_health import (
+    HostHealth, SourceHealth, is_failure, parse_retry_after, CLOSED, OPEN, HALF_OPEN,
+    CIRCUIT_OPEN_ERROR, RATE_LIMITED_ERROR, FETCH_RATE_BURST, BREAKER_FAILURE_THRESHOLD, BREAKER_OPEN_SECONDS,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freezes the token bucket's clock (time.monotonic) at a settable value."""
+    now = [1000.0]
+    monkeypatch.setattr(source_health.time, 'monotonic', lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize('status, error, expected', [
+    (200, None, False), (304, None, False), (404, None, False), (403, None, True), (429, None, True),
+    (500, None, True), (503, None, True), (None, "timed out", True), (None, None, False),
+])
+def test_is_failure(status, error, expected):
+    assert is_failure(status, error) is expected
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("-5") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    in_a_minute = format_datetime(datetime.now().astimezone() + timedelta(seconds=60), usegmt=False)
+    assert 50 < parse_retry_after(in_a_minute) <= 60
+
+
+def test_bucket_allows_a_burst_then_spaces_requests(clock):
+    health = HostHealth('news.example.com', rate=2.0)
+    waits = [health.reserve().wait for _ in range(int(FETCH_RATE_BURST) + 2)]
+    assert waits[:int(FETCH_RATE_BURST)] == [0.0] * int(FETCH_RATE_BURST)
+    assert waits[-2:] == [0.5, 1.0]  # Each further request one interval (1 / rate) later
+
+    clock[0] += 10  # Rested: the bucket refills up to the burst, no further
+    assert [health.reserve().wait for _ in range(int(FETCH_RATE_BURST))] == [0.0] * int(FETCH_RATE_BURST)
+
+
+def test_retry_after_beyond_max_wait_is_refused_without_taking_a_slot(clock):
+    health = HostHealth('news.example.com', rate=1.0)
+    health.record(429, None, 0.1, retry_after=3600)
+    assert health.rate == 0.5  # Halved on throttling
+
+    refused = health.reserve(max_wait=60)
+    assert refused.error == RATE_LIMITED_ERROR
+    assert refused.wait == pytest.approx(3602)
+    assert health.reserve(max_wait=60).wait == refused.wait  # Refusals don't queue behind each other
+    assert health.wait_seconds() == pytest.approx(3602)
+
+
+def test_success_raises_the_rate_additively():
+    health = HostHealth('news.example.com', rate=1.0)
+    health.record(200, None, 0.2)
+    health.record(200, None, 0.4)
+    assert health.rate == pytest.approx(1.2)
+    assert health.latency_ms == pytest.approx(0.3 * 400 + 0.7 * 200)
+
+
+def test_breaker_opens_after_consecutive_failures():
+    health = HostHealth('news.example.com')
+    for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+        health.record(500, None, 0.1)
+    assert health.state == CLOSED
+    health.record(None, "connection refused", 0.1)
+
+    assert health.state == OPEN
+    assert health.opened_until > utcnow() + timedelta(seconds=BREAKER_OPEN_SECONDS - 5)
+    assert health.reserve() == (None, CIRCUIT_OPEN_ERROR)
+    assert not health.available(utcnow())
+
+
+def test_half_open_allows_one_probe_and_closes_on_success():
+    health = HostHealth('news.example.com', state=OPEN, failures=3, opened_until=utcnow() - timedelta(seconds=1))
+    assert health.reserve().error is None
+    assert health.state == HALF_OPEN
+    assert health.reserve() == (None, CIRCUIT_OPEN_ERROR)  # Probe still out
+
+    health.record(200, None, 0.1)
+    assert (health.state, health.failures, health.open_seconds) == (CLOSED, 0, BREAKER_OPEN_SECONDS)
+
+
+def test_failed_probe_reopens_for_twice_as_long():
+    health = HostHealth('news.example.com', state=OPEN, failures=3, opened_until=utcnow() - timedelta(seconds=1))
+    health.reserve()
+    health.record(503, None, 0.1)
+    assert health.state == OPEN
+    assert health.open_seconds == 2 * BREAKER_OPEN_SECONDS
+
+
+def test_pick_skips_open_hosts_and_excluded_mirrors():
+    health = SourceHealth()
+    health.host('down.example').state = OPEN
+    health.host('down.example').opened_until = utcnow() + timedelta(minutes=5)
+    mirrors = ['https://down.example', 'https://a.example', 'https://b.example']
+    assert health.pick(mirrors, exclude={'https://a.example'}) == 'https://b.example'
+    assert health.pick(mirrors[:1]) is None
@@ -0,0 +1,162 @@
+# utils/digest_fanout.py
+"""
+Per-subscriber digest delivery.
+
+Subscribers (database table `subscriber`) choose source categories and
+relevance keywords. The digest's candidate articles are fetched once; the
+subscribers still owed `digest_key` are grouped by identical filters, each
+group's body is rendered once, and its recipients are sent in batches of
+SendGrid personalizations from a small thread pool. Every batch outcome is
+written to `digest_delivery`, so re-running the same digest_key only
+reaches subscribers that were not sent it yet.
+
+Usage:
+    python -m utils.digest_fanout subscribe ops@example.com --category Social-X --keyword circular
+    python -m utils.digest_fanout unsubscribe ops@example.com
+"""
+
+import argparse
+import logging
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.db_connector import (
+    connect, upsert_subscriber, deactivate_subscriber, fetch_pending_deliveries, record_deliveries,
+)
+from collectors.normalize import utcnow
+from utils.digest_renderer import render_digest
+from utils.email_sender import send_digest_batch
+from utils.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# --- DIGEST FAN-OUT CONFIGURATION ---
+DIGEST_MAX_ARTICLES = int(os.getenv('DIGEST_MAX_ARTICLES', '50'))            # Articles per subscriber digest
+DIGEST_CANDIDATE_LIMIT = int(os.getenv('DIGEST_CANDIDATE_LIMIT', '1000'))    # Articles fetched once, filtered per group
+DIGEST_BATCH_SIZE = min(int(os.getenv('DIGEST_BATCH_SIZE', '500')), 1000)    # Personalizations per SendGrid request (API max 1000)
+DIGEST_SEND_CONCURRENCY = int(os.getenv('DIGEST_SEND_CONCURRENCY', '4'))     # SendGrid requests in flight
+# Send one article per near-duplicate cluster (the same circular from a dozen outlets counts once)
+DIGEST_REPRESENTATIVES_ONLY = os.getenv('DIGEST_REPRESENTATIVES_ONLY', 'true').lower() in ('1', 'true', 'yes')
+
+DigestFilter = namedtuple('DigestFilter', ['categories', 'keywords'])
+
+
+def subscriber_filter(subscriber) -> DigestFilter:
+    """Normalized filter, so subscribers with the same preferences land in the same group."""
+    return DigestFilter(
+        tuple(sorted(set(subscriber.get('categories') or ()))),
+        tuple(sorted({keyword.lower() for keyword in subscriber.get('keywords') or ()})),
+    )
+
+
+def select_articles(news_list, digest_filter: DigestFilter, limit: int = DIGEST_MAX_ARTICLES):
+    """The first `limit` articles (news_list order) matching a category prefix and a keyword."""
+    categories, keywords = digest_filter.categories, set(digest_filter.keywords)
+    selected = []
+    for item in news_list:
+        if categories and not (item.source_category or '').startswith(categories):
+            continue
+        if keywords and keywords.isdisjoint(term.lower() for term in item.matched_keywords or ()):
+            continue
+        selected.append(item)
+        if len(selected) >= limit:
+            break
+    return selected
+
+
+def plan_deliveries(conn, news_list, digest_key: str, batch_size: int = DIGEST_BATCH_SIZE):
+    """Groups the subscribers still owed `digest_key` and renders each group's body once.
+
+    Returns (summary, batches) where batches are (DigestBody, subscribers)
+    pairs of at most `batch_size` recipients, one SendGrid request each.
+    Subscribers whose filters match no article are recorded as 'empty' (and
+    retried on the next run of the same digest_key, in case news arrived).
+    """
+    summary = {'subscribers': 0, 'groups': 0, 'requests': 0, 'sent': 0, 'failed': 0, 'empty': 0}
+    pending = fetch_pending_deliveries(conn, digest_key)
+    summary['subscribers'] = len(pending)
+    if not pending:
+        return summary, []
+
+    groups = {}
+    for subscriber in pending:
+        groups.setdefault(subscriber_filter(subscriber), []).append(subscriber)
+    summary['groups'] = len(groups)
+
+    generated_at = utcnow()
+    batches = []
+    for digest_filter, subscribers in groups.items():
+        articles = select_articles(news_list, digest_filter)
+        if not articles:
+            record_deliveries(conn, digest_key, [s['id'] for s in subscribers], 'empty')
+            summary['empty'] += len(subscribers)
+            continue
+        body = render_digest(articles, generated_at)
+        for start in range(0, len(subscribers), batch_size):
+            batches.append((body, subscribers[start:start + batch_size]))
+    return summary, batches
+
+
+def fan_out_digest(conn, news_list, digest_key: str, subject: str,
+                   batch_size: int = DIGEST_BATCH_SIZE, concurrency: int = DIGEST_SEND_CONCURRENCY):
+    """Sends `digest_key` to every subscriber still owed it; returns a summary of counts."""
+    summary, jobs = plan_deliveries(conn, news_list, digest_key, batch_size)
+    if not summary['subscribers']:
+        return summary
+
+    # SendGrid requests go out in parallel; delivery rows are written from
+    # this thread, which owns the connection
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {
+            pool.submit(send_digest_batch, subject, body.html, body.text,
+                        [(s['email'], s['name']) for s in batch]): batch
+            for body, batch in jobs
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            message_id, error = future.result()
+            status = 'failed' if error else 'sent'
+            record_deliveries(conn, digest_key, [s['id'] for s in batch], status, message_id, error)
+            summary['requests'] += 1
+            summary[status] += len(batch)
+
+    logger.info("Digest %s: %d subscribers in %d filter groups, %d sent, %d failed, %d with no matching news "
+                "(%d SendGrid requests)", digest_key, summary['subscribers'], summary['groups'],
+                summary['sent'], summary['failed'], summary['empty'], summary['requests'],
+                extra={'digest_key': digest_key, **summary})
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    subscribe = commands.add_parser('subscribe', help="add or update a subscriber")
+    subscribe.add_argument('email')
+    subscribe.add_argument('--name')
+    subscribe.add_argument('--category', action='append', default=[], help="source_category prefix (repeatable)")
+    subscribe.add_argument('--keyword', action='append', default=[], help="relevance keyword (repeatable)")
+    unsubscribe = commands.add_parser('unsubscribe', help="stop sending digests to a subscriber")
+    unsubscribe.add_argument('email')
+    args = parser.parse_args()
+    configure_logging()
+
+    conn = connect()
+    if conn is None:
+        sys.exit("❌ No database connection")
+    try:
+        if args.command == 'subscribe':
+            subscriber_id = upsert_subscriber(conn, args.email, args.name, args.category, args.keyword)
+            print(f"✅ Subscriber {subscriber_id}: {args.email}" if subscriber_id else "❌ Could not save subscriber")
+        elif deactivate_subscriber(conn, args.email):
+            print(f"✅ Unsubscribed {args.email}")
+        else:
+            print(f"⚠️ {args.email} is not subscribed")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# utils/digest_renderer.py
+"""
+Digest email renderer.
+
+The templates below are prepared once at import (indentation stripped, split
+into header / item / footer format strings). render_digest() walks the
+article list once and writes each article's HTML and plain-text block to two
+buffers, so cost is linear in the number of articles and the text part no
+longer has to be recovered from the HTML with regexes.
+
+Every value taken from the database is escaped for HTML; URLs that are not
+http(s) are replaced with '#'.
+"""
+
+import io
+from collections import namedtuple
+from datetime import datetime
+from html import escape
+from textwrap import dedent
+
+from collectors.normalize import utcnow
+
+DigestBody = namedtuple('DigestBody', ['html', 'text'])
+
+
+def _template(text: str) -> str:
+    """Strips the source indentation and blank lines so the email isn't padded with whitespace."""
+    return '\n'.join(line for line in dedent(text).strip().splitlines() if line.strip()) + '\n'
+
+
+# --- TEMPLATES ---
+EMPTY_HTML = _template("""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head><meta charset="UTF-8"></head>
+    <body style="font-family: Arial, sans-serif; padding: 10px;">
+        <h3>No new regulatory news found in this period.</h3>
+    </body>
+    </html>
+""")
+
+HEADER_HTML = _template("""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Regulatory News Digest</title>
+    </head>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; background-color: #f4f4f4; margin: 0; padding: 20px;">
+        <!-- Header -->
+        <div style="border-bottom: 3px solid #3498db; padding-bottom: 15px; margin-bottom: 25px;">
+            <h2 style="color: #2c3e50; margin: 0; font-size: 24px;">📰 Regulatory News Digest</h2>
+            <p style="color: #7f8c8d; margin: 5px 0 0 0; font-size: 14px;">Latest financial regulatory updates</p>
+        </div>
+        <!-- Introduction -->
+        <p style="font-size: 12px; color: #555; margin-bottom: 20px;">
+            Here are the latest regulatory news articles from the past week:
+        </p>
+        <!-- News Items -->
+""")
+
+ITEM_HTML = _template("""
+        <div style="border: 1px solid #e0e0e0; padding: 17px; margin-bottom: 15px; border-radius: 5px; background-color: #fafafa;">
+            <div style="margin-bottom: 8px;">
+                <a href="{url}" target="_blank" style="color: #2980b9; text-decoration: none; font-weight: bold; font-size: 14px; line-height: 1.4;">{title}</a>
+            </div>
+            <div style="font-size: 12px; color: #666;">
+                <span style="color: #e74c3c; font-weight: 300;">📌 {source}</span>
+                <span style="color: #95a5a6;"> • </span>
+                <span style="color: #27ae60;"> {date}</span>
+            </div>
+        </div>
+""")
+
+FOOTER_HTML = _template("""
+        <!-- Footer -->
+        <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #e0e0e0; text-align: center;">
+            <p style="font-size: 12px; color: #999; margin: 5px 0;">
+                This is an automated regulatory news digest
+            </p>
+            <p style="font-size: 12px; color: #999; margin: 5px 0;">
+                You are receiving this because you subscribed to financial news updates
+            </p>
+            <p style="font-size: 11px; color: #bbb; margin: 15px 0 0 0;">
+                Total articles: {count} | Generated on {generated}
+            </p>
+        </div>
+    </body>
+    </html>
+""")
+
+RULE_TEXT = "=" * 50
+EMPTY_TEXT = f"REGULATORY NEWS DIGEST\n{RULE_TEXT}\n\nNo new regulatory news found in this period.\n"
+HEADER_TEXT = (f"REGULATORY NEWS DIGEST\n{RULE_TEXT}\n\n"
+               "Here are the latest regulatory news articles from the past week:\n\n")
+ITEM_TEXT = "{number}. {title}\n   {source} | {date}\n   {url}\n\n"
+FOOTER_TEXT = (f"{RULE_TEXT}\nTotal articles: {{count}} | Generated on {{generated}}\n"
+               "This is an automated news digest.\n"
+               "For best viewing, please enable HTML in your email client.\n")
+
+
+def safe_url(url) -> str:
+    """Only http(s) links make it into the email; anything else (javascript:, data:, empty) becomes '#'."""
+    if not url:
+        return '#'
+    url = str(url).strip()
+    if url[:7].lower() == 'http://' or url[:8].lower() == 'https://':
+        return url
+    return '#'
+
+
+def write_digest(news_list, html_out, text_out, generated_at: datetime = None):
+    """Streams the digest for `news_list` (Article records) to two writable text streams (HTML and plain text)."""
+    generated = (generated_at or utcnow()).strftime('%B %d, %Y at %I:%M %p')
+    if not news_list:
+        html_out.write(EMPTY_HTML)
+        text_out.write(EMPTY_TEXT)
+        return
+
+    html_out.write(HEADER_HTML)
+    text_out.write(HEADER_TEXT)
+    dates = {}  # Digests are dominated by a handful of days; format each one once
+    for number, item in enumerate(news_list, 1):
+        title = item.title or 'No Title'
+        source = item.source_category or 'Unknown Source'
+        url = safe_url(item.source_url)
+        pub_date = item.publication_date
+        if pub_date:
+            day = pub_date.date() if isinstance(pub_date, datetime) else pub_date
+            date = dates.get(day)
+            if date is None:
+                date = dates[day] = day.strftime('%B %d, %Y')
+        else:
+            date = 'Date unknown'
+
+        html_out.write(ITEM_HTML.format(url=escape(url), title=escape(title), source=escape(source), date=date))
+        text_out.write(ITEM_TEXT.format(number=number, title=' '.join(title.split()), source=source,
+                                        date=date, url=url))
+
+    html_out.write(FOOTER_HTML.format(count=len(news_list), generated=generated))
+    text_out.write(FOOTER_TEXT.format(count=len(news_list), generated=generated))
+
+
+def render_digest(news_list, generated_at: datetime = None) -> DigestBody:
+    """Renders the HTML and plain-text bodies of the digest in one pass over `news_list`."""
+    html_out, text_out = io.StringIO(), io.StringIO()
+    write_digest(news_list, html_out, text_out, generated_at)
+    return DigestBody(html_out.getvalue(), text_out.getvalue())
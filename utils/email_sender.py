@@ -1,33 +1,60 @@
+import logging
 import os
+import sys
+import threading
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Email, To, Content
 
-def send_news_digest(subject: str, body_html: str):
-    """Send email using SendGrid API with anti-spam optimizations"""
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.metrics import EMAILS_SENT_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# SENDGRID_API_HOST points at a local sink in benchmarks
+SENDGRID_API_HOST = os.getenv("SENDGRID_API_HOST", "https://api.sendgrid.com")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_sendgrid_client():
+    """One SendGridAPIClient per process (reused across sends and threads), or None without an API key."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            api_key = os.getenv("SENDGRID_API_KEY")
+            if api_key:
+                _client = SendGridAPIClient(api_key, host=SENDGRID_API_HOST)
+        return _client
+
+
+def send_news_digest(subject: str, body_html: str, body_text: str = None):
+    """Send email using SendGrid API with anti-spam optimizations
+
+    `body_text` is the plain-text part rendered alongside the HTML (see
+    utils/digest_renderer.py); it is derived from the HTML when omitted.
+    Returns True once SendGrid accepted the message.
+    """
     
     api_key = os.getenv("SENDGRID_API_KEY")
     sender_email = os.getenv("SENDER_EMAIL")
     sender_name = os.getenv("SENDER_NAME", "Financial News Alert")  # Add sender name
     recipient_email = os.getenv("RECIPIENT_EMAIL")
     
-    print(f"📧 Email Configuration Check:")
-    print(f"   SENDGRID_API_KEY: {'✓ Set' if api_key else '✗ MISSING'}")
-    print(f"   SENDER_EMAIL: {sender_email if sender_email else '✗ MISSING'}")
-    print(f"   SENDER_NAME: {sender_name}")
-    print(f"   RECIPIENT_EMAIL: {recipient_email if recipient_email else '✗ MISSING'}")
+    logger.debug("Email configuration: SENDGRID_API_KEY %s, SENDER_EMAIL %s, SENDER_NAME %s, RECIPIENT_EMAIL %s",
+                 'set' if api_key else 'MISSING', sender_email or 'MISSING', sender_name,
+                 recipient_email or 'MISSING')
     
     if not all([api_key, sender_email, recipient_email]):
-        print("❌ ERROR: Missing SendGrid configuration")
-        return
+        logger.error("Missing SendGrid configuration")
+        EMAILS_SENT_TOTAL.labels('misconfigured').inc()
+        return False
     
     try:
-        print(f"📤 Preparing email...")
-        print(f"   From: {sender_name} <{sender_email}>")
-        print(f"   To: {recipient_email}")
-        print(f"   Subject: {subject}")
+        logger.info("Preparing email '%s' from %s <%s> to %s", subject, sender_name, sender_email, recipient_email)
         
-        # Create plain text version (IMPORTANT for spam filters!)
-        plain_text_body = create_plain_text_version(body_html)
+        # Plain text version (IMPORTANT for spam filters!)
+        plain_text_body = body_text or create_plain_text_version(body_html)
         
         # Create the email message with improved headers
         message = Mail(
@@ -42,17 +69,50 @@ def send_news_digest(subject: str, body_html: str):
         message.reply_to = Email(sender_email)
         
         # Send via SendGrid API
-        sg = SendGridAPIClient(api_key)
-        response = sg.send(message)
+        response = get_sendgrid_client().send(message)
         
-        print(f"✅ SUCCESS: Email sent via SendGrid!")
-        print(f"   Status Code: {response.status_code}")
-        print(f"   Message ID: {response.headers.get('X-Message-Id', 'N/A')}")
+        logger.info("Email sent via SendGrid (status %s, message id %s)",
+                    response.status_code, response.headers.get('X-Message-Id', 'N/A'))
+        EMAILS_SENT_TOTAL.labels('sent').inc()
+        return True
         
     except Exception as e:
-        print(f"❌ ERROR sending email via SendGrid: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error sending email via SendGrid: %s", e)
+        EMAILS_SENT_TOTAL.labels('failed').inc()
+        return False
+
+
+def send_digest_batch(subject: str, body_html: str, body_text: str, recipients):
+    """Sends one body to up to 1000 recipients in a single SendGrid request.
+
+    Each (email, name) in `recipients` gets its own personalization, so
+    nobody sees the other addresses. Returns (message_id, None) on success
+    and (None, error) on failure.
+    """
+    sender_email = os.getenv("SENDER_EMAIL")
+    sender_name = os.getenv("SENDER_NAME", "Financial News Alert")
+    client = get_sendgrid_client()
+    if client is None or not sender_email:
+        EMAILS_SENT_TOTAL.labels('misconfigured').inc(len(recipients))
+        return None, "missing SendGrid configuration"
+
+    try:
+        message = Mail(
+            from_email=Email(sender_email, sender_name),
+            to_emails=[To(email, name) for email, name in recipients],
+            subject=subject,
+            plain_text_content=Content("text/plain", body_text),
+            html_content=Content("text/html", body_html),
+            is_multiple=True,
+        )
+        message.reply_to = Email(sender_email)
+        response = client.send(message)
+        EMAILS_SENT_TOTAL.labels('sent').inc(len(recipients))
+        return response.headers.get('X-Message-Id'), None
+    except Exception as e:
+        logger.error("Error sending digest batch of %d via SendGrid: %s", len(recipients), e)
+        EMAILS_SENT_TOTAL.labels('failed').inc(len(recipients))
+        return None, str(e)
 
 
 def create_plain_text_version(html_content: str) -> str:
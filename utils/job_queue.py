@@ -0,0 +1,168 @@
+# utils/job_queue.py
+"""
+Durable job queue on a PostgreSQL table (`job_queue`, migration 13).
+
+Producers queue NewJob tuples with enqueue_jobs(); workers (worker.py) claim
+ready jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any number of worker
+processes can share the table with no broker and no job handed out twice.
+
+- A claimed job holds a lease of JOB_LEASE_SECONDS. If its worker dies, the
+  lease expires and the next claim puts the job back in the queue.
+- A handler that raises is retried with exponential backoff (with jitter)
+  until the job's max_attempts are used up. The job is then dead-lettered:
+  it stays in the table with status 'dead' and its last error, for
+  `python worker.py dead` and `python worker.py retry`.
+- A handler that raises JobDeferred is put back without using an attempt
+  (it is waiting on other jobs, not failing).
+
+A handler's uncommitted writes commit together with its job's completion.
+Delivery is at least once (a job can run again after a crash), so handlers
+must be idempotent. The pipeline's handlers are in utils/pipeline_jobs.py.
+"""
+
+import logging
+import os
+import random
+import socket
+import sys
+import time
+from collections import namedtuple
+
+import psycopg2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.db_connector import connect, claim_jobs, complete_job, retry_job, defer_job
+from utils.metrics import JOB_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# --- JOB QUEUE CONFIGURATION ---
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '300'))            # A job running longer is handed out again
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))                  # Attempts before a job is dead-lettered
+JOB_RETRY_BASE_SECONDS = float(os.getenv('JOB_RETRY_BASE_SECONDS', '30'))   # Delay after the first failure, doubled per attempt
+JOB_RETRY_MAX_SECONDS = float(os.getenv('JOB_RETRY_MAX_SECONDS', '3600'))   # ...up to this
+JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '2'))                # Idle workers check for new jobs this often
+
+# A job to queue; enqueue_jobs() takes these as plain tuples
+NewJob = namedtuple('NewJob', ['job_type', 'payload', 'batch', 'dedupe_key', 'max_attempts', 'delay_seconds'],
+                    defaults=(None, None, JOB_MAX_ATTEMPTS, 0))
+
+# A claimed job; `attempts` includes the current one
+Job = namedtuple('Job', ['id', 'job_type', 'payload', 'batch', 'attempts', 'max_attempts'])
+
+
+class JobDeferred(Exception):
+    """Raised by a handler that can't run yet; the job is retried after `delay_seconds`."""
+
+    def __init__(self, delay_seconds: float, reason: str = ''):
+        super().__init__(reason)
+        self.delay_seconds = delay_seconds
+
+
+# job_type -> handler(conn, job) returning a small JSON-able result for the log
+HANDLERS = {}
+
+
+def job_handler(job_type: str):
+    """Registers the decorated function as the handler for `job_type`."""
+    def register(handler):
+        HANDLERS[job_type] = handler
+        return handler
+    return register
+
+
+def retry_delay(attempts: int, base: float = JOB_RETRY_BASE_SECONDS, cap: float = JOB_RETRY_MAX_SECONDS) -> float:
+    """Backoff before the next attempt: base * 2^(attempts - 1) with +/-20% jitter, at most `cap`.
+
+    The jitter keeps jobs that failed together (one host down) from all
+    retrying in the same second.
+    """
+    return min(cap, base * 2 ** max(0, attempts - 1) * random.uniform(0.8, 1.2))
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_job(conn, job: Job, worker: str) -> str:
+    """Runs one claimed job and records the outcome.
+
+    Returns 'succeeded', 'retry', 'dead', 'deferred' or 'lost' (the lease
+    expired before the job finished and it was handed to another worker).
+    """
+    started = time.perf_counter()
+    log_fields = {'job_id': job.id, 'job_type': job.job_type, 'batch': job.batch, 'attempt': job.attempts}
+    try:
+        handler = HANDLERS.get(job.job_type)
+        if handler is None:
+            raise LookupError(f"no handler registered for job type '{job.job_type}'")
+        result = handler(conn, job)
+    except JobDeferred as deferred:
+        conn.rollback()
+        defer_job(conn, job.id, worker, deferred.delay_seconds)
+        outcome = 'deferred'
+        logger.info("Job %d (%s) deferred %.0fs: %s", job.id, job.job_type, deferred.delay_seconds, deferred,
+                    extra=log_fields)
+    except Exception as e:
+        conn.rollback()
+        delay = retry_delay(job.attempts)
+        status = retry_job(conn, job.id, worker, delay, f"{type(e).__name__}: {e}")
+        if status == 'dead':
+            outcome = 'dead'
+            logger.error("Job %d (%s) failed on its last attempt (%d/%d), dead-lettered: %s",
+                         job.id, job.job_type, job.attempts, job.max_attempts, e, exc_info=True, extra=log_fields)
+        else:
+            outcome = 'retry' if status else 'lost'
+            logger.warning("Job %d (%s) attempt %d/%d failed, retrying in %.0fs: %s",
+                           job.id, job.job_type, job.attempts, job.max_attempts, delay, e, extra=log_fields)
+    else:
+        outcome = 'succeeded' if complete_job(conn, job.id, worker) else 'lost'
+        logger.info("Job %d (%s) %s: %s", job.id, job.job_type, outcome, result,
+                    extra={**log_fields, 'result': result})
+
+    elapsed = time.perf_counter() - started
+    JOB_SECONDS.labels(job.job_type, outcome).observe(elapsed)
+    return outcome
+
+
+def run_worker(job_types=None, drain: bool = False, stop=None, poll_seconds: float = JOB_POLL_SECONDS) -> int:
+    """Claims and runs jobs one at a time on a connection of its own.
+
+    Runs until `stop` (a threading/multiprocessing Event) is set, or with
+    drain=True until no job is ready. A lost connection is reopened; the
+    job it was running comes back when its lease expires. Returns the
+    number of jobs run.
+    """
+    worker = worker_name()
+    conn = None
+    processed = 0
+    logger.info("Worker %s started (job types: %s)", worker, ', '.join(job_types) if job_types else 'all')
+    try:
+        while not (stop and stop.is_set()):
+            if conn is None:
+                conn = connect()
+                if conn is None:
+                    time.sleep(poll_seconds)
+                    continue
+            try:
+                claimed = claim_jobs(conn, worker, JOB_LEASE_SECONDS, job_types)
+                if not claimed:
+                    if drain:
+                        break
+                    if stop:
+                        stop.wait(poll_seconds)
+                    else:
+                        time.sleep(poll_seconds)
+                    continue
+                run_job(conn, Job(**claimed[0]), worker)
+                processed += 1
+            except (psycopg2.InterfaceError, psycopg2.OperationalError) as error:
+                logger.error("Worker %s lost its database connection: %s", worker, error)
+                conn.close()
+                conn = None
+                time.sleep(poll_seconds)
+    finally:
+        if conn is not None:
+            conn.close()
+    logger.info("Worker %s stopped after %d jobs", worker, processed)
+    return processed
@@ -0,0 +1,73 @@
+# utils/metrics.py
+
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# --- COLLECTION ---
+FEED_FETCH_SECONDS = Histogram(
+    'news_feed_fetch_seconds', "Feed download latency", ['host', 'outcome'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 15, 30),
+)
+
+# Pipeline funnel per source: parsed -> (watermark | irrelevant | known | near_duplicate) -> inserted/skipped/failed
+ENTRIES_TOTAL = Counter('news_entries_total', "Feed entries by pipeline outcome", ['source', 'outcome'])
+
+# 1 while a feed host's circuit breaker is open or half-open (collectors/source_health.py)
+CIRCUIT_OPEN = Gauge('news_source_circuit_open', "Feed host circuit breaker not closed", ['host'])
+
+# --- DATABASE ---
+DB_QUERY_SECONDS = Histogram(
+    'news_db_query_seconds', "Database round trips by statement type", ['statement'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+# --- SCRAPER RUNS AND DIGEST ---
+RUN_STAGE_SECONDS = Histogram(
+    'news_run_stage_seconds', "Scraper run stage durations (collectors, digest fetch/render/send)",
+    ['stage', 'status'], buckets=(0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300),
+)
+EMAILS_SENT_TOTAL = Counter('news_digest_emails_total', "Digest emails by outcome", ['outcome'])
+
+# --- JOB QUEUE ---
+# outcome: succeeded | retry | dead | deferred | lost (lease expired before completion)
+JOB_SECONDS = Histogram(
+    'news_job_seconds', "Queue job run time by job type and outcome", ['job_type', 'outcome'],
+    buckets=(0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300),
+)
+
+# --- API ---
+API_REQUEST_SECONDS = Histogram(
+    'news_api_request_seconds', "API request latency by endpoint", ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+def count_entries(source: str, outcome: str, amount: int = 1):
+    if amount:
+        ENTRIES_TOTAL.labels(source, outcome).inc(amount)
+
+
+def instrument_app(app):
+    """Adds per-endpoint latency tracking and a /metrics endpoint to a FastAPI app."""
+    from fastapi import Response
+
+    @app.middleware("http")
+    async def record_request_latency(request, call_next):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # The route template (/runs/{run_id}) keeps the label set small
+            route = request.scope.get('route')
+            API_REQUEST_SECONDS.labels(
+                request.method, route.path if route else 'unmatched', str(status)
+            ).observe(time.perf_counter() - started)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus metrics for this process."""
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
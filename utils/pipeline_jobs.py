@@ -0,0 +1,227 @@
+# utils/pipeline_jobs.py
+"""
+The collection pipeline as job-queue stages (see utils/job_queue.py).
+
+    fetch_feed     One Google News query or Nitter handle: conditional GET and
+                   parse. The new articles are queued as ingest_batch jobs in
+                   the same commit as the feed's validators and watermark, so
+                   a feed is never marked seen before its articles are durable.
+    ingest_batch   Up to INGEST_JOB_ROWS parsed articles through
+                   ingest_articles() (seen-URL filter, clustering, bulk insert).
+    build_digest   Waits until the round's fetch/ingest jobs are finished, then
+                   renders the digest once per subscriber filter group and
+                   queues one send_digest job per SendGrid request.
+    send_digest    One SendGrid request. Recipients already sent the digest
+                   are skipped, so a retry doesn't email them twice.
+
+enqueue_collection() queues one round (every feed plus the day's digest)
+under a shared batch name. A slow or failing feed now only delays its own
+jobs; it is retried on its own backoff instead of failing the whole run.
+"""
+
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+import feedparser
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.records import Article
+from database.db_connector import (
+    enqueue_jobs, count_unfinished_jobs, count_active_subscribers, fetch_news_by_date_range,
+    fetch_sent_subscribers, record_deliveries,
+)
+from collectors.feed_fetcher import FeedRequest, iter_feeds
+from collectors.normalize import utcnow
+from collectors.feed_cache import FeedCache
+from collectors.watermarks import WatermarkStore
+from collectors.source_health import get_source_health, CIRCUIT_OPEN_ERROR, RATE_LIMITED_ERROR, BREAKER_OPEN_SECONDS
+from collectors.external_api import SEARCH_QUERIES, NITTER_HANDLES, FEED_PARSERS, FEED_URLS, ingest_articles
+from utils.digest_fanout import (
+    plan_deliveries, DIGEST_CANDIDATE_LIMIT, DIGEST_MAX_ARTICLES, DIGEST_REPRESENTATIVES_ONLY,
+)
+from utils.digest_renderer import render_digest
+from utils.email_sender import send_news_digest, send_digest_batch
+from utils.job_queue import NewJob, JobDeferred, job_handler
+
+logger = logging.getLogger(__name__)
+
+# --- PIPELINE JOB CONFIGURATION ---
+INGEST_JOB_ROWS = int(os.getenv('INGEST_JOB_ROWS', '500'))                 # Articles per ingest_batch job
+DIGEST_WAIT_SECONDS = float(os.getenv('DIGEST_WAIT_SECONDS', '30'))        # build_digest re-check interval while feeds are pending
+DIGEST_MAX_WAIT_SECONDS = float(os.getenv('DIGEST_MAX_WAIT_SECONDS', '1800'))  # ...after which it goes out without the stragglers
+
+COLLECTION_JOB_TYPES = ('fetch_feed', 'ingest_batch')
+
+
+def encode_articles(articles):
+    """Parsed Article records as JSON-able lists (publication dates as ISO strings).
+
+    Only the parser's fields travel; clustering happens in ingest_batch.
+    """
+    return [[article.title, article.source_url,
+             article.publication_date.isoformat() if article.publication_date else None,
+             article.content, article.source_category, article.relevance_score, article.matched_keywords]
+            for article in articles]
+
+
+def decode_articles(rows):
+    """Inverse of encode_articles()."""
+    return [Article(title, url, datetime.fromisoformat(date) if date else None, *rest)
+            for title, url, date, *rest in rows]
+
+
+def enqueue_collection(conn, digest: bool = True):
+    """Queues a fetch_feed job per search query and Nitter handle, plus the day's build_digest.
+
+    Feeds (and the digest) that still have an unfinished job from an earlier
+    round are not queued twice. Returns (batch, job ids), job ids being None
+    if the jobs could not be queued.
+    """
+    now = utcnow()
+    batch = f"collect:{now:%Y-%m-%dT%H:%M:%S}"
+    jobs = [
+        NewJob('fetch_feed', {'source': source, 'key': key}, batch, f"fetch_feed:{source}:{key}")
+        for source, keys in (('google', SEARCH_QUERIES), ('nitter', NITTER_HANDLES))
+        for key in keys
+    ]
+    if digest:
+        digest_key = now.strftime("%Y-%m-%d")
+        jobs.append(NewJob('build_digest', {
+            'digest_key': digest_key,
+            'subject': f"Regulatory News Digest for {digest_key}",
+            'wait_until': (now + timedelta(seconds=DIGEST_MAX_WAIT_SECONDS)).isoformat(),
+        }, batch, f"build_digest:{digest_key}"))
+    return batch, enqueue_jobs(conn, jobs)
+
+
+@job_handler('fetch_feed')
+def fetch_feed(conn, job):
+    """Downloads and parses one feed; queues its new articles for ingestion."""
+    source, key = job.payload['source'], job.payload['key']
+    source_key = f"{source}:{key}"
+    health = get_source_health()
+    health.load(conn)
+    feed_cache = FeedCache(conn)
+    # Nitter URLs are picked among the healthy instances, so a retry can land on another mirror
+    feed_requests = feed_cache.conditional([FeedRequest(key, FEED_URLS[source](key))])
+    watermarks = WatermarkStore(conn)
+    watermarks.load([source_key])
+
+    response = next(iter_feeds(feed_requests, health=health))
+    health.save(conn)
+    host = urlparse(response.url).netloc
+    # Waiting out the breaker or the host's Retry-After doesn't use up the job's attempts
+    if response.error == CIRCUIT_OPEN_ERROR:
+        opened_until = health.host(host).opened_until
+        raise JobDeferred(max(1.0, (opened_until - utcnow()).total_seconds()) if opened_until
+                          else BREAKER_OPEN_SECONDS, f"circuit open for {host}")
+    if response.error == RATE_LIMITED_ERROR:
+        raise JobDeferred(max(1.0, health.host(host).wait_seconds()), f"rate limited by {host}")
+    if response.error:
+        raise RuntimeError(f"{response.url}: {response.error}")
+
+    articles = []
+    if feed_cache.is_changed(response):
+        # A parse error propagates: nothing is staged and the job is retried
+        feed = feedparser.parse(response.body)
+        articles = FEED_PARSERS[source](key, feed, watermarks.get(source_key))
+
+    feed_cache.save()
+    watermarks.save()
+    jobs = [
+        NewJob('ingest_batch', {'source': source, 'feed': key,
+                                'articles': encode_articles(articles[start:start + INGEST_JOB_ROWS])}, job.batch)
+        for start in range(0, len(articles), INGEST_JOB_ROWS)
+    ]
+    if enqueue_jobs(conn, jobs, commit=False) is None:
+        raise RuntimeError("could not queue the feed's ingest batches")
+    return {'cache': feed_cache.results.get(key), 'articles': len(articles), 'ingest_jobs': len(jobs)}
+
+
+@job_handler('ingest_batch')
+def ingest_batch(conn, job):
+    """Stores one batch of parsed articles (URLs already stored are skipped, so re-runs are harmless)."""
+    summary = ingest_articles(conn, decode_articles(job.payload['articles']), source=job.payload['source'])
+    if summary['new_articles'] and not summary['batches']:
+        raise RuntimeError("bulk insert failed")
+    return {
+        'known_skipped': summary['known_skipped'],
+        'batch_duplicates': summary['batch_duplicates'],
+        'near_duplicates': summary['near_duplicates'],
+        'inserted': sum(stats['inserted'] for stats in summary['batches']),
+        'skipped': sum(stats['skipped'] for stats in summary['batches']),
+        'failed': sum(stats['failed'] for stats in summary['batches']),
+    }
+
+
+@job_handler('build_digest')
+def build_digest(conn, job):
+    """Renders the digest once the round's articles are in and queues its SendGrid requests."""
+    if job.batch:
+        unfinished = count_unfinished_jobs(conn, job.batch, COLLECTION_JOB_TYPES)
+        if unfinished is None or unfinished:
+            # Feeds held back by retries or open circuit breakers only delay the digest so long
+            wait_until = job.payload.get('wait_until')
+            if not wait_until or utcnow() < datetime.fromisoformat(wait_until):
+                raise JobDeferred(DIGEST_WAIT_SECONDS, f"{unfinished} collection jobs of {job.batch} unfinished")
+            logger.warning("Sending digest of %s with %s collection jobs still unfinished", job.batch, unfinished)
+
+    digest_key, subject = job.payload['digest_key'], job.payload['subject']
+    subscribers = count_active_subscribers(conn)
+    latest_news = fetch_news_by_date_range(
+        conn, utcnow() - timedelta(days=7), limit=DIGEST_CANDIDATE_LIMIT if subscribers else DIGEST_MAX_ARTICLES,
+        representatives_only=DIGEST_REPRESENTATIVES_ONLY
+    )
+    if latest_news is None:
+        raise RuntimeError("could not load the digest articles")
+    if not latest_news:
+        logger.warning("No news found in database, digest not sent")
+        return {'articles': 0}
+
+    if subscribers:
+        summary, batches = plan_deliveries(conn, latest_news, digest_key)
+        jobs = [
+            NewJob('send_digest', {'digest_key': digest_key, 'subject': subject, 'html': body.html,
+                                   'text': body.text, 'recipients': [[s['id'], s['email'], s['name']] for s in batch]},
+                   job.batch)
+            for body, batch in batches
+        ]
+    else:
+        # No subscribers: the single RECIPIENT_EMAIL digest, as scheduler.py sends it
+        summary = {}
+        body = render_digest(latest_news)
+        jobs = [NewJob('send_digest', {'digest_key': digest_key, 'subject': subject, 'html': body.html,
+                                       'text': body.text, 'recipients': None},
+                       job.batch, f"send_digest:{digest_key}")]
+
+    # Committed together with this job's completion, so a retry can't queue the sends twice
+    if enqueue_jobs(conn, jobs, commit=False) is None:
+        raise RuntimeError("could not queue the digest sends")
+    return {'articles': len(latest_news), 'send_jobs': len(jobs), **summary}
+
+
+@job_handler('send_digest')
+def send_digest(conn, job):
+    """Sends one batch of a digest and records the deliveries."""
+    payload = job.payload
+    digest_key, subject = payload['digest_key'], payload['subject']
+    if payload['recipients'] is None:
+        if not send_news_digest(subject, payload['html'], payload['text']):
+            raise RuntimeError("digest email was not sent")
+        return {'sent': 1}
+
+    recipients = {subscriber_id: (email, name) for subscriber_id, email, name in payload['recipients']}
+    already_sent = fetch_sent_subscribers(conn, digest_key, recipients)
+    pending = [subscriber_id for subscriber_id in recipients if subscriber_id not in already_sent]
+    if not pending:
+        return {'sent': 0, 'already_sent': len(already_sent)}
+
+    message_id, error = send_digest_batch(subject, payload['html'], payload['text'],
+                                          [recipients[subscriber_id] for subscriber_id in pending])
+    record_deliveries(conn, digest_key, pending, 'failed' if error else 'sent', message_id, error)
+    if error:
+        raise RuntimeError(f"SendGrid request failed: {error}")
+    return {'sent': len(pending), 'already_sent': len(already_sent), 'message_id': message_id}
@@ -0,0 +1,100 @@
+# utils/run_coordinator.py
+
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from database.db_connector import borrow_connection, claim_run, record_run_stage, renew_run_lease, finish_run
+from utils.metrics import RUN_STAGE_SECONDS
+from collectors.normalize import utcnow
+
+logger = logging.getLogger(__name__)
+
+# A run must renew its lease within this many seconds, otherwise the next
+# trigger treats it as crashed; a heartbeat renews it every RUN_HEARTBEAT_SECONDS
+RUN_LEASE_SECONDS = float(os.getenv('RUN_LEASE_SECONDS', '900'))
+RUN_HEARTBEAT_SECONDS = float(os.getenv('RUN_HEARTBEAT_SECONDS', str(RUN_LEASE_SECONDS / 3)))
+
+
+def start_run(trigger: str):
+    """Claims the single-flight slot. Returns (run_id, None) or (None, in_flight_run_id).
+
+    (None, None) means the database is unavailable.
+    """
+    with borrow_connection() as conn:
+        return claim_run(conn, trigger, RUN_LEASE_SECONDS)
+
+
+class RunTracker:
+    """Records per-stage timings for a claimed run, keeps its lease alive and closes it out.
+
+    A daemon thread renews the lease every `heartbeat_seconds` until
+    finish(), so a stage may run longer than RUN_LEASE_SECONDS while the
+    process is alive. Each renewal borrows a pool connection for a moment:
+    committing on the run's own connection from another thread would commit
+    the run's work in progress. Stages are recorded on the connection the
+    run works with (see attached()), so a run holds one connection.
+    """
+
+    def __init__(self, run_id: int, heartbeat_seconds: float = RUN_HEARTBEAT_SECONDS):
+        self.run_id = run_id
+        self.conn = None
+        self._finished = threading.Event()
+        self._heartbeat = threading.Thread(target=self._renew_lease, args=(heartbeat_seconds,),
+                                           name=f"run-{run_id}-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _renew_lease(self, interval: float):
+        while not self._finished.wait(interval):
+            with borrow_connection() as conn:
+                if not renew_run_lease(conn, self.run_id, RUN_LEASE_SECONDS) and not self._finished.is_set():
+                    logger.warning("Could not renew the lease of run %d", self.run_id, extra={'run_id': self.run_id})
+
+    @contextmanager
+    def attached(self, conn):
+        """Records stages on `conn`, the connection the run works with, inside the block."""
+        self.conn = conn
+        try:
+            yield conn
+        finally:
+            self.conn = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times a block and appends it to the run's stages."""
+        started_at = utcnow()
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "failed"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            RUN_STAGE_SECONDS.labels(name, status).observe(elapsed)
+            stage = {
+                "name": name,
+                "status": status,
+                "started_at": started_at.isoformat(),
+                "duration_ms": round(elapsed * 1000, 1),
+            }
+            if self.conn is not None:
+                record_run_stage(self.conn, self.run_id, stage, RUN_LEASE_SECONDS)
+            else:
+                with borrow_connection() as conn:
+                    record_run_stage(conn, self.run_id, stage, RUN_LEASE_SECONDS)
+
+    def finish(self, status: str, summary=None, error_message=None):
+        """Stops the heartbeat and marks the run finished."""
+        self._finished.set()
+        self._heartbeat.join()
+        if self.conn is not None:
+            finish_run(self.conn, self.run_id, status, summary, error_message)
+        else:
+            with borrow_connection() as conn:
+                finish_run(conn, self.run_id, status, summary, error_message)
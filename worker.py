@@ -0,0 +1,131 @@
+# worker.py
+"""
+Job queue workers for the decoupled pipeline (fetch, ingest and digest stages).
+
+Each collection round is queued as one fetch_feed job per feed plus a
+build_digest job; fetches queue ingest_batch jobs and the digest queues
+send_digest jobs (see utils/pipeline_jobs.py). Workers claim jobs from the
+Postgres job_queue table with FOR UPDATE SKIP LOCKED, so any number of
+worker processes, on one machine or several, can run side by side. Failed
+jobs are retried with exponential backoff and dead-lettered after
+JOB_MAX_ATTEMPTS. Nothing but PostgreSQL is needed.
+
+Each process keeps its own near-duplicate index, so run ingest_batch on a
+single process (--types ingest_batch) when clustering must see every article.
+
+Usage:
+    python worker.py enqueue                     # queue a collection round (e.g. from cron)
+    python worker.py run --processes 4           # work until SIGTERM / Ctrl-C
+    python worker.py run --types ingest_batch    # a dedicated ingest worker
+    python worker.py run --drain                 # exit once no job is ready
+    python worker.py status
+    python worker.py dead
+    python worker.py retry 42 57                 # or: retry --all
+    python worker.py purge --days 7
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from database.db_connector import (
+    connect, fetch_job_counts, fetch_dead_jobs, requeue_dead_jobs, purge_succeeded_jobs,
+)
+from utils.job_queue import HANDLERS, run_worker
+from utils.pipeline_jobs import enqueue_collection  # Also registers the pipeline's job handlers
+from utils.logging_config import configure_logging
+
+# --- WORKER CONFIGURATION ---
+WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', '2'))
+JOB_RETENTION_DAYS = float(os.getenv('JOB_RETENTION_DAYS', '7'))  # Succeeded jobs kept this long by `purge`
+
+
+def worker_process(job_types, drain, stop):
+    """Entry point of one worker process; SIGTERM/SIGINT finish the current job, then exit."""
+    configure_logging()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    run_worker(job_types, drain=drain, stop=stop)
+
+
+def run_processes(processes: int, job_types, drain: bool):
+    """Runs `processes` workers and waits for them (in this process when there is only one)."""
+    stop = multiprocessing.Event()
+    if processes <= 1:
+        worker_process(job_types, drain, stop)
+        return
+
+    children = [
+        multiprocessing.Process(target=worker_process, args=(job_types, drain, stop), name=f"worker-{number}")
+        for number in range(processes)
+    ]
+    for child in children:
+        child.start()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    for child in children:
+        child.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help="claim and run jobs")
+    run.add_argument('--processes', type=int, default=WORKER_PROCESSES, help="worker processes")
+    run.add_argument('--types', nargs='+', choices=sorted(HANDLERS), help="only run these job types")
+    run.add_argument('--drain', action='store_true', help="exit once no job is ready")
+    enqueue = commands.add_parser('enqueue', help="queue a collection round")
+    enqueue.add_argument('--no-digest', action='store_true', help="collect only, don't queue the digest")
+    commands.add_parser('status', help="job counts by type and status")
+    dead = commands.add_parser('dead', help="list dead-lettered jobs")
+    dead.add_argument('--limit', type=int, default=20)
+    retry = commands.add_parser('retry', help="send dead jobs back to the queue")
+    retry.add_argument('job_ids', type=int, nargs='*')
+    retry.add_argument('--all', action='store_true', help="every dead job")
+    purge = commands.add_parser('purge', help="delete old succeeded jobs")
+    purge.add_argument('--days', type=float, default=JOB_RETENTION_DAYS)
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.command == 'run':
+        run_processes(args.processes, args.types, args.drain)
+        return
+    if args.command == 'retry' and not (args.job_ids or args.all):
+        parser.error("retry needs job ids or --all")
+
+    conn = connect()
+    if conn is None:
+        sys.exit("❌ No database connection")
+    try:
+        if args.command == 'enqueue':
+            batch, job_ids = enqueue_collection(conn, digest=not args.no_digest)
+            if job_ids is None:
+                sys.exit("❌ Could not queue the collection round")
+            print(f"✅ Queued {len(job_ids)} jobs as {batch}")
+        elif args.command == 'status':
+            counts = fetch_job_counts(conn)
+            if not counts:
+                print("Queue is empty")
+            for (job_type, status), count in counts.items():
+                print(f"{job_type:<14} {status:<10} {count:>8}")
+        elif args.command == 'dead':
+            jobs = fetch_dead_jobs(conn, args.limit)
+            if not jobs:
+                print("✅ No dead jobs")
+            for job in jobs:
+                print(f"#{job['id']} {job['job_type']} ({job['batch']}) after {job['attempts']} attempts, "
+                      f"{job['finished_at']:%Y-%m-%d %H:%M}: {job['last_error']}")
+        elif args.command == 'retry':
+            requeued = requeue_dead_jobs(conn, args.job_ids, requeue_all=args.all)
+            print(f"✅ Requeued {len(requeued)} jobs" + (f": {', '.join(map(str, requeued))}" if requeued else ""))
+        elif args.command == 'purge':
+            print(f"✅ Deleted {purge_succeeded_jobs(conn, args.days)} succeeded jobs older than {args.days:g} days")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()